@@ -45,25 +45,69 @@ DELTA_CHOICES = [
 
 import json
 import re
+import asyncio
+import functools
 import os
+import math
+import pickle
+import hashlib
 import datetime
-from typing import Dict, List
+from typing import Dict, List, Tuple
+from collections import defaultdict
 import logging
 import logging.config
 
+import numpy as np
 import pandas as pd
 import pytz
 
 EUROPE_TIMEZONE = pytz.timezone("Europe/Paris")
-
-from flask import Flask, request
+TWELVEDATA_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Seconds between two refreshes of the market states
+MARKET_REFRESH_INTERVAL = 15 * 60
+# Seconds between two checks for symbols to schedule
+SYMBOLS_SYNC_INTERVAL = 60
+# Bars a batch may download again for its symbols with a newer last bar
+BATCH_MAX_LAST_BAR_SPREAD = 10
+# Memory cap of the cached stats informations
+STATS_CACHE_MAX_BYTES = 1024 * 1024
+# Memory cap of the cached rolling analytics
+ANALYTICS_CACHE_MAX_BYTES = 32 * 1024 * 1024
+ANALYTICS_METRICS = ["sma", "ema", "volatility", "sharpe", "drawdown"]
+# Memory cap of the cached correlation matrices
+CORRELATION_CACHE_MAX_BYTES = 16 * 1024 * 1024
+# Memory cap of the cached portfolio values
+PORTFOLIO_CACHE_MAX_BYTES = 16 * 1024 * 1024
+# Points of the charts of the frontend, precomputed beside the full series (0)
+CHART_MAX_POINTS = 500
+PRECOMPUTED_MAX_POINTS = (0, CHART_MAX_POINTS)
+# Version of the stored payloads, increased when their content changes
+SYMBOL_PAYLOAD_VERSION = 1
+
+from flask import (
+    Blueprint,
+    Flask,
+    Response,
+    current_app,
+    request,
+    stream_with_context,
+)
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from flask_marshmallow import Marshmallow
 from flask_cors import CORS
 from flask_swagger import swagger
 from flask_swagger_ui import get_swaggerui_blueprint
 
 from src import request_twelvedata_api, stock_stats, utils
+from src.async_request_twelvedata_api import AsyncTwelveDataApi
+from src.json_provider import FastJSONProvider
+from src.lru_cache import LRUCache
+from src.credit_scheduler import INTERACTIVE, BACKGROUND
+from src.refresh_scheduler import RefreshScheduler
+from src.single_flight import SingleFlight
 
 from config import API_KEY, API_PLAN, FRONTEND_URL
 
@@ -74,61 +118,44 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 # =================================================================================================
 
 
-logging.config.fileConfig(os.path.join(basedir, LOG_CONFIG_FILE))
+# Configured by create_app
 logger = logging.getLogger(__logger__)
-logger.info("Logger initialized.")
 
 
 # =================================================================================================
 #     Flask App
 # =================================================================================================
 
-app = Flask(__name__)
-app.config.from_object(__name__)
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(
-    basedir, "db.sqlite"
-)
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-app.app_context().push()
-
-# enable CORS
-cors = CORS(
-    app,
-    resources={
-        r"/symbols/*": {"origins": FRONTEND_URL},
-        r"/market": {"origins": FRONTEND_URL},
-    },
-)
-logger.info("Backend server initialized.")
+# Routes of the app, registered by create_app
+api = Blueprint("api", __name__)
 
 # =================================================================================================
 #     Database
 # =================================================================================================
 
-db = SQLAlchemy(app)
-ma = Marshmallow(app)
+# Bound to the app by create_app
+db = SQLAlchemy()
+ma = Marshmallow()
 
 SYMBOL_LENGTH = 20
 EXCHANGE_LENGTH = 30
 COUNTRY_LENGTH = 30
 
+BAR_COLUMNS = ["open", "high", "low", "close", "volume"]
+
 
 class StockTimeSeries(db.Model):
     symbol = db.Column(db.String(SYMBOL_LENGTH), primary_key=True)
     timeDelta = db.Column(db.String(6), primary_key=True)
     exchange = db.Column(db.String(EXCHANGE_LENGTH))
     timezone = db.Column(db.String(100))
-    timeseries = db.Column(db.PickleType(comparator=pd.Series.equals))
     marketChecked = db.Column(db.Boolean)
 
-    def __init__(
-        self, symbol, timeDelta, exchange, timezone, timeseries, marketChecked
-    ):
+    def __init__(self, symbol, timeDelta, exchange, timezone, marketChecked):
         self.symbol = symbol
         self.timeDelta = timeDelta
         self.exchange = exchange
         self.timezone = timezone
-        self.timeseries = timeseries
         self.marketChecked = marketChecked
 
 
@@ -139,7 +166,6 @@ class StockTimeSeriesSchema(ma.Schema):
             "timeDelta",
             "exchange",
             "timezone",
-            "timeseries",
             "marketChecked",
         )
 
@@ -148,6 +174,30 @@ stock_timeseries_schema = StockTimeSeriesSchema()
 stocks_timeseries_schema = StockTimeSeriesSchema(many=True)
 
 
+class StockBar(db.Model):
+    # The composite primary key is also the (symbol, timeDelta, datetime) index
+    # used by range reads and appends.
+    symbol = db.Column(db.String(SYMBOL_LENGTH), primary_key=True)
+    timeDelta = db.Column(db.String(6), primary_key=True)
+    datetime = db.Column(db.DateTime, primary_key=True)
+    open = db.Column(db.Float)
+    high = db.Column(db.Float)
+    low = db.Column(db.Float)
+    close = db.Column(db.Float)
+    volume = db.Column(db.BigInteger)
+
+
+class SymbolPayload(db.Model):
+    # Serialized GET /symbols/<symbol> response, deleted when bars are stored
+    symbol = db.Column(db.String(SYMBOL_LENGTH), primary_key=True)
+    timeDelta = db.Column(db.String(6), primary_key=True)
+    performance = db.Column(db.Boolean, primary_key=True)
+    # 0 for the full series
+    maxPoints = db.Column(db.Integer, primary_key=True)
+    body = db.Column(db.LargeBinary)
+    etag = db.Column(db.String(32))
+
+
 class MarketState(db.Model):
     exchange = db.Column(db.String(EXCHANGE_LENGTH), primary_key=True)
     country = db.Column(db.String(COUNTRY_LENGTH))
@@ -206,143 +256,772 @@ class AvailableSymbolsSchema(ma.Schema):
 available_symbols_schema = AvailableSymbolsSchema()
 available_symbols_many_schema = AvailableSymbolsSchema(many=True)
 
-db.create_all()
 
-logger.info("Database initialized.")
+def read_symbol_timeseries(
+    symbol: str,
+    time_delta: str,
+    column: str = "close",
+    start: datetime.datetime | None = None,
+    end: datetime.datetime | None = None,
+    before: datetime.datetime | None = None,
+    limit: int | None = None,
+) -> pd.Series:
+    """Read one column of the stored bars of a symbol.
+
+    The time range and the limit are applied by the database on the
+    (symbol, timeDelta, datetime) index, so that reading a window costs
+    proportionally to the window and not to the whole history.
+
+    Parameters
+    ----------
+    symbol : str
+        The symbol.
+    time_delta : str
+        The time interval of the bars.
+    column : str, optional
+        The bar column to read, by default "close".
+    start : datetime.datetime | None, optional
+        The first datetime to read, included, by default None (no lower bound).
+    end : datetime.datetime | None, optional
+        The last datetime to read, included, by default None (no upper bound).
+    before : datetime.datetime | None, optional
+        The datetime to read before, excluded, by default None (no upper bound).
+    limit : int | None, optional
+        If given, only the most recent bars of the range are read, by default None.
+
+    Returns
+    -------
+    pd.Series
+        The values indexed by datetime, sorted in ascending time.
+    """
+    query = db.select(StockBar.datetime, getattr(StockBar, column)).where(
+        StockBar.symbol == symbol, StockBar.timeDelta == time_delta
+    )
+    if start is not None:
+        query = query.where(StockBar.datetime >= start)
+    if end is not None:
+        query = query.where(StockBar.datetime <= end)
+    if before is not None:
+        query = query.where(StockBar.datetime < before)
+
+    if limit is None:
+        query = query.order_by(StockBar.datetime)
+    else:
+        query = query.order_by(StockBar.datetime.desc()).limit(limit)
+
+    data = pd.read_sql(
+        query,
+        db.session.connection(),
+        index_col="datetime",
+        parse_dates=["datetime"],
+    )
+
+    if limit is not None:
+        data = data.iloc[::-1]
+
+    return data[column].astype("float64")
+
+
+def read_symbols_timeseries(
+    symbols: List[str],
+    time_delta: str,
+    column: str = "close",
+    start: datetime.datetime | None = None,
+    end: datetime.datetime | None = None,
+) -> pd.DataFrame:
+    """Read one column of the stored bars of several symbols in one query.
+
+    Parameters
+    ----------
+    symbols : List[str]
+        The symbols.
+    time_delta : str
+        The time interval of the bars.
+    column : str, optional
+        The bar column to read, by default "close".
+    start : datetime.datetime | None, optional
+        The first datetime to read, included, by default None (no lower bound).
+    end : datetime.datetime | None, optional
+        The last datetime to read, included, by default None (no upper bound).
+
+    Returns
+    -------
+    pd.DataFrame
+        The values, one column per symbol in the given order, aligned on
+        the datetimes of all the bars in ascending time. A symbol without
+        bar at a datetime has a NaN value.
+    """
+    query = db.select(
+        StockBar.symbol, StockBar.datetime, getattr(StockBar, column)
+    ).where(StockBar.symbol.in_(symbols), StockBar.timeDelta == time_delta)
+    if start is not None:
+        query = query.where(StockBar.datetime >= start)
+    if end is not None:
+        query = query.where(StockBar.datetime <= end)
+
+    data = pd.read_sql(query, db.session.connection(), parse_dates=["datetime"])
+    data = data.pivot(index="datetime", columns="symbol", values=column)
+
+    return data.reindex(columns=symbols).sort_index().astype("float64")
+
+
+def read_last_bar_datetime(symbol: str, time_delta: str) -> datetime.datetime | None:
+    """Get the datetime of the most recent stored bar of a symbol.
+
+    Parameters
+    ----------
+    symbol : str
+        The symbol.
+    time_delta : str
+        The time interval of the bars.
+
+    Returns
+    -------
+    datetime.datetime | None
+        The datetime of the last bar, None if no bar is stored.
+    """
+    return db.session.execute(
+        db.select(db.func.max(StockBar.datetime)).where(
+            StockBar.symbol == symbol, StockBar.timeDelta == time_delta
+        )
+    ).scalar()
+
+
+def read_symbols_versions(
+    symbols: List[str], time_delta: str
+) -> Tuple[Tuple[datetime.datetime | None, int], ...]:
+    """Get the datetime of the last bar and the number of bars of stored symbols.
+
+    They change when bars of a symbol are stored, so they give the
+    version of the stored data in cache keys, also from other workers.
+
+    Parameters
+    ----------
+    symbols : List[str]
+        The symbols.
+    time_delta : str
+        The time interval of the bars.
+
+    Returns
+    -------
+    Tuple[Tuple[datetime.datetime | None, int], ...]
+        The datetime of the last bar and the number of bars of each
+        symbol, (None, 0) if no bar is stored.
+    """
+    rows = db.session.execute(
+        db.select(StockBar.symbol, db.func.max(StockBar.datetime), db.func.count())
+        .where(StockBar.symbol.in_(symbols), StockBar.timeDelta == time_delta)
+        .group_by(StockBar.symbol)
+    ).all()
+    versions = {symbol: (last_bar, bars) for symbol, last_bar, bars in rows}
+
+    return tuple(versions.get(symbol, (None, 0)) for symbol in symbols)
+
+
+def store_symbol_bars(symbol: str, time_delta: str, bars: pd.DataFrame) -> None:
+    """Insert or update bars of a symbol.
+
+    Only the given bars are written: new ones are inserted and
+    already stored ones are overwritten with the given values.
+    The session is not committed, the cached stats informations of
+    the symbol are invalidated when it is.
+
+    Parameters
+    ----------
+    symbol : str
+        The symbol.
+    time_delta : str
+        The time interval of the bars.
+    bars : pd.DataFrame
+        The bars indexed by datetime, with some or all of the
+        open, high, low, close and volume columns.
+    """
+    if bars.empty:
+        return
+
+    db.session.info.setdefault("stored_symbols", set()).add((symbol, time_delta))
+    db.session.execute(
+        db.delete(SymbolPayload).where(
+            SymbolPayload.symbol == symbol, SymbolPayload.timeDelta == time_delta
+        )
+    )
+
+    bars = bars.reindex(columns=BAR_COLUMNS).astype(object)
+    bars = bars.where(bars.notna(), None)
+    records = [
+        {"symbol": symbol, "timeDelta": time_delta, "datetime": date, **values}
+        for date, values in zip(
+            bars.index.to_pydatetime(), bars.to_dict(orient="records")
+        )
+    ]
+
+    statement = sqlite_insert(StockBar)
+    statement = statement.on_conflict_do_update(
+        index_elements=["symbol", "timeDelta", "datetime"],
+        set_={column: statement.excluded[column] for column in BAR_COLUMNS},
+    )
+    db.session.execute(statement, records)
+
+
+def migrate_pickled_timeseries() -> None:
+    """Move the pickled series of an older database to the bars table.
+
+    Older databases stored each series as a pickled pd.Series in
+    stock_time_series.timeseries. Those series only hold close values,
+    so the other columns of the migrated bars are left empty.
+    """
+    columns = {
+        column["name"]
+        for column in db.inspect(db.engine).get_columns("stock_time_series")
+    }
+    if "timeseries" not in columns:
+        return
+
+    rows = db.session.execute(
+        db.text("SELECT symbol, timeDelta, timeseries FROM stock_time_series")
+    ).all()
+    for symbol, time_delta, pickled_timeseries in rows:
+        if pickled_timeseries is not None:
+            timeseries: pd.Series = pickle.loads(pickled_timeseries)
+            store_symbol_bars(symbol, time_delta, timeseries.to_frame("close"))
+
+    db.session.execute(db.text("ALTER TABLE stock_time_series DROP COLUMN timeseries"))
+    db.session.commit()
+
+    logger.info(f"Migrated {len(rows)} pickled timeseries to the bars table.")
+
+
+def migrate_symbol_payloads() -> None:
+    """Rebuild the payloads table of an older database.
+
+    The payloads are only serialized bars and stats, they are built
+    again by the next GET requests. The version of the stored payloads
+    is kept as the SQLite user version of the database.
+    """
+    columns = {
+        column["name"] for column in db.inspect(db.engine).get_columns("symbol_payload")
+    }
+    version = db.session.execute(db.text("PRAGMA user_version")).scalar()
+    if "maxPoints" in columns and version >= SYMBOL_PAYLOAD_VERSION:
+        return
+
+    SymbolPayload.__table__.drop(db.engine)
+    SymbolPayload.__table__.create(db.engine)
+    db.session.execute(db.text(f"PRAGMA user_version = {SYMBOL_PAYLOAD_VERSION}"))
+    db.session.commit()
+
+    logger.info("Rebuilt the symbol payloads table.")
+
+
+def init_db() -> None:
+    """Create the missing tables and migrate the ones of an older database.
+
+    To be called in an app context.
+    """
+    db.create_all()
+    migrate_symbol_payloads()
+    migrate_pickled_timeseries()
+
+    logger.info("Database initialized.")
+
 
 # =================================================================================================
-#     Routes
+#     Stats cache
 # =================================================================================================
 
+# Keyed on symbol, time delta, first and last bar datetimes
+stats_cache = LRUCache(max_bytes=STATS_CACHE_MAX_BYTES)
+# Keyed on symbol, time delta, window and last bar datetime
+analytics_cache = LRUCache(max_bytes=ANALYTICS_CACHE_MAX_BYTES)
+# Keyed on time delta, symbols, time range, minimum periods and symbols versions
+correlation_cache = LRUCache(max_bytes=CORRELATION_CACHE_MAX_BYTES)
+# Keyed on time delta, symbols and weights, time range, name and symbols versions
+portfolio_cache = LRUCache(max_bytes=PORTFOLIO_CACHE_MAX_BYTES)
+
+
+@event.listens_for(db.session, "after_commit")
+def invalidate_stored_symbols_stats(session) -> None:
+    # Stored bars may have revised the last bar, which does not change the key
+    for symbol, time_delta in session.info.pop("stored_symbols", set()):
+        stats_cache.invalidate(symbol, time_delta)
+        analytics_cache.invalidate(symbol, time_delta)
+
+
+@event.listens_for(db.session, "after_rollback")
+def forget_stored_symbols(session) -> None:
+    session.info.pop("stored_symbols", None)
+
+
+def evaluate_symbol_stats(
+    symbol: str, time_delta: str, timeseries: pd.Series
+) -> Dict[str, float | str]:
+    """Evaluate the stats informations of a stored symbol, or get them from the cache.
+
+    Parameters
+    ----------
+    symbol : str
+        The symbol.
+    time_delta : str
+        The time delta of the data.
+    timeseries : pd.Series
+        The stored timeseries, or a time range of it, sorted in ascending time.
+
+    Returns
+    -------
+    Dict[str, float | str]
+        The stats informations, see stock_stats.evaluate_stats_information.
+    """
+    if timeseries.empty:
+        # E.g. a time range without bars
+        return stock_stats.evaluate_stats_information(
+            timeseries, symbol, assume_sorted=True, time_delta=time_delta
+        )
 
-@app.route("/symbols", methods=["GET"])
-def get_all_symbols_data():
-    """Get all symbols at once.
+    return stats_cache.get_or_compute(
+        (symbol, time_delta, timeseries.index[0], timeseries.index[-1]),
+        lambda: stock_stats.evaluate_stats_information(
+            timeseries, symbol, assume_sorted=True, time_delta=time_delta
+        ),
+    )
 
-    Get the list of all the symbols data available in database.
-    ---
-    tags:
-        - SYMBOLS
-    responses:
-        200:
-            description: Request successful, returning all symbols data from database and the evaluated stats infomartions.
-            schema:
-                type: object
-                properties:
-                    timeseries:
-                        type: array
-                        description: The symbols timeseries.
-                        items:
-                            type: array
-                            description: One symbol timeseries.
-                            items:
-                                type: array
-                                items:
-                                    type: number
-                                    description: A data point (time and value).
-                                minItems: 2
-                                maxItems: 2
 
-                    stats:
-                        type: array
-                        description: The list of the stats informations of the stocks.
-                        items:
-                            type: object
-                            properties:
-                                symbol:
-                                    type: string
-                                    description: The symbol name.
-                                cumulativeReturn:
-                                    type: number
-                                    description: The cumulative return of the stock.
-                                annualizedCumulativeReturn:
-                                    type: number
-                                    description: The annualized cumulative return of the stock.
-                                annualizedVolatility:
-                                    type: number
-                                    description: The annualized volatility of the stock.
+def evaluate_symbols_stats(
+    symbols: List[Tuple[str, str, pd.Series]],
+) -> List[Dict[str, float | str]]:
+    """Evaluate the stats informations of several stored symbols, or get them from the cache.
+
+    The stats informations that are not cached are evaluated at once
+    for all the symbols of a time delta.
+
+    Parameters
+    ----------
+    symbols : List[Tuple[str, str, pd.Series]]
+        The symbol, time delta and stored timeseries, sorted in
+        ascending time, of each symbol.
+
+    Returns
+    -------
+    List[Dict[str, float | str]]
+        The stats informations of each symbol, see stock_stats.evaluate_stats_information.
+    """
+    stats_table = [None] * len(symbols)
+    missing: Dict[str, List[int]] = {}
+    for i, (symbol, time_delta, timeseries) in enumerate(symbols):
+        if not timeseries.empty:
+            stats_table[i] = stats_cache.get(
+                (symbol, time_delta, timeseries.index[0], timeseries.index[-1])
+            )
+
+        if stats_table[i] is None:
+            missing.setdefault(time_delta, []).append(i)
+
+    for time_delta, positions in missing.items():
+        data = stock_stats.align_series(
+            {symbols[i][0]: symbols[i][2] for i in positions}
+        )
+        for i, stats in zip(
+            positions, stock_stats.evaluate_stats_information_batch(data, time_delta)
+        ):
+            symbol, _, timeseries = symbols[i]
+            stats_table[i] = stats
+            if not timeseries.empty:
+                stats_cache.put(
+                    (symbol, time_delta, timeseries.index[0], timeseries.index[-1]),
+                    stats,
+                )
 
+    return stats_table
 
 
+def evaluate_symbol_analytics(
+    symbol: str, time_delta: str, window: int
+) -> Tuple[pd.DataFrame, float | str]:
+    """Evaluate the rolling analytics of a stored symbol, or get them from the cache.
 
+    Parameters
+    ----------
+    symbol : str
+        The symbol.
+    time_delta : str
+        The time delta of the data.
+    window : int
+        The number of points of the rolling window, at least 2.
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, float | str]
+        The rolling analytics, see stock_stats.evaluate_rolling_analytics,
+        and the maximum drawdown of the whole timeseries.
     """
-    target_data_format: str = request.args.get(
-        "dataFormat", default="apexcharts", type=str
+
+    def evaluate() -> Tuple[pd.DataFrame, float | str]:
+        timeseries = read_symbol_timeseries(symbol, time_delta)
+        return (
+            stock_stats.evaluate_rolling_analytics(
+                timeseries, window, assume_sorted=True
+            ),
+            stock_stats.evaluate_max_drawdown(timeseries, assume_sorted=True),
+        )
+
+    # The last bar is read on the index, the timeseries only on a miss
+    return analytics_cache.get_or_compute(
+        (symbol, time_delta, window, read_last_bar_datetime(symbol, time_delta)),
+        evaluate,
     )
-    localize: bool = request.args.get("localize", default=False, type=json.loads)
-    performance: bool = request.args.get("performance", default=True, type=json.loads)
 
-    data = StockTimeSeries.query.all()
 
-    all_timeseries: Dict[
-        str, str | List[List[float | int]]
-    ] = stocks_timeseries_schema.dump(data)
+def evaluate_symbols_correlation(
+    symbols: List[str],
+    time_delta: str,
+    start: datetime.datetime | None = None,
+    end: datetime.datetime | None = None,
+    min_periods: int = 2,
+) -> Dict[str, pd.DataFrame]:
+    """Evaluate the returns correlation of stored symbols, or get it from the cache.
+
+    The cached matrices are keyed on the versions of the symbols, see
+    read_symbols_versions, so they are evaluated again once bars of
+    one of the symbols are stored.
+
+    Parameters
+    ----------
+    symbols : List[str]
+        The symbols.
+    time_delta : str
+        The time delta of the data.
+    start : datetime.datetime | None, optional
+        The first datetime of the data, included, by default None (no lower bound).
+    end : datetime.datetime | None, optional
+        The last datetime of the data, included, by default None (no upper bound).
+    min_periods : int, optional
+        The minimum number of common returns of a pair, by default 2.
+
+    Returns
+    -------
+    Dict[str, pd.DataFrame]
+        The matrices, see stock_stats.evaluate_returns_correlation.
+    """
+    # The versions are read before the timeseries, so that bars stored
+    # meanwhile are not cached under the versions they are newer than
+    return correlation_cache.get_or_compute(
+        (
+            time_delta,
+            tuple(symbols),
+            start,
+            end,
+            min_periods,
+            read_symbols_versions(symbols, time_delta),
+        ),
+        lambda: stock_stats.evaluate_returns_correlation(
+            read_symbols_timeseries(symbols, time_delta, start=start, end=end),
+            min_periods=min_periods,
+        ),
+    )
+
 
-    stats_table = [
-        stock_stats.evaluate_stats_information(entry["timeseries"], entry["symbol"])
-        for entry in all_timeseries
-    ]
+def evaluate_portfolio(
+    symbols: List[str],
+    weights: List[float],
+    time_delta: str,
+    name: str,
+    start: datetime.datetime | None = None,
+    end: datetime.datetime | None = None,
+) -> Tuple[pd.Series, Dict[str, float | str]]:
+    """Evaluate the value of a portfolio of stored symbols, or get it from the cache.
+
+    The cached values are keyed on the versions of the symbols, see
+    read_symbols_versions, so they are evaluated again once bars of
+    one of the symbols are stored.
+
+    Parameters
+    ----------
+    symbols : List[str]
+        The symbols.
+    weights : List[float]
+        The weight of each symbol.
+    time_delta : str
+        The time delta of the data.
+    name : str
+        The name of the portfolio in its stats informations.
+    start : datetime.datetime | None, optional
+        The first datetime of the data, included, by default None (no lower bound).
+    end : datetime.datetime | None, optional
+        The last datetime of the data, included, by default None (no upper bound).
+
+    Returns
+    -------
+    Tuple[pd.Series, Dict[str, float | str]]
+        The value of the portfolio, see stock_stats.evaluate_portfolio_value,
+        and its stats informations.
+    """
 
-    for entry in all_timeseries:
-        entry["timeseries"] = utils.series_to_apexcharts(
-            entry["timeseries"], performance
+    def evaluate() -> Tuple[pd.Series, Dict[str, float | str]]:
+        value = stock_stats.evaluate_portfolio_value(
+            read_symbols_timeseries(symbols, time_delta, start=start, end=end),
+            weights,
+        )
+        return value, stock_stats.evaluate_stats_information(
+            value, name, assume_sorted=True, time_delta=time_delta
         )
 
-    return {"timeseries": all_timeseries, "stats": stats_table}, 200
+    # The versions are read before the timeseries, see evaluate_symbols_correlation
+    return portfolio_cache.get_or_compute(
+        (
+            time_delta,
+            tuple(zip(symbols, weights)),
+            start,
+            end,
+            name,
+            read_symbols_versions(symbols, time_delta),
+        ),
+        evaluate,
+    )
 
 
-@app.route("/symbols", methods=["POST"])
-def create_symbol_data():
-    """Add a new symbol.
+# =================================================================================================
+#     Payloads
+# =================================================================================================
 
-    Add a symbol timeseries to the database.
-    ---
-    tags:
-        - SYMBOLS
 
-    parameters:
-        - name: body
-          in: body
-          required: true
-          schema:
-            type: object
-            properties:
-                symbol:
-                    type: string
-                    description: The symbol we want to add to the database.
-                timeDelta:
-                    type: string
-                    description: The desired time delta for the data.
+def build_symbol_payload(
+    symbol: str,
+    time_delta: str,
+    timeseries: pd.Series,
+    performance: bool,
+    max_points: int,
+    page: Dict[str, int | None] | None = None,
+) -> SymbolPayload:
+    """Serialize the GET /symbols/<symbol> response of a symbol.
+
+    Parameters
+    ----------
+    symbol : str
+        The symbol.
+    time_delta : str
+        The time delta of the data.
+    timeseries : pd.Series
+        The stored timeseries.
+    performance : bool
+        If true, the timeseries is given as a percentage of its first value.
+    max_points : int
+        The number of points the timeseries is downsampled to, 0 for all.
+    page : Dict[str, int | None] | None, optional
+        The pagination fields of the response, see read_symbol_window, by default None.
+
+    Returns
+    -------
+    SymbolPayload
+        The payload, not added to the session.
+    """
+    body = (
+        current_app.json.dumps(
+            {
+                "timeseries": utils.series_to_apexcharts(
+                    timeseries, performance, max_points=max_points or None
+                ),
+                "stats": evaluate_symbol_stats(symbol, time_delta, timeseries),
+                **(page or {}),
+            }
+        ).encode()
+        + b"\n"
+    )
 
-    responses:
-        200:
-            description: Data already exists in the database, you can use directly the get method.
-        201:
-            description: Data successfully created in the database, you can use the get method to retrieve it.
-        500:
-            description: An error happened sever-side.
-            schema:
-                type: object
-                properties:
-                    status:
-                        type: string
-                        description: The status of the request, which will be 'error' in this case
-                    code:
-                        type: integer
-                        description: The associated error code.
-                    message:
-                        type: string
-                        description: The error message associated.
+    return SymbolPayload(
+        symbol=symbol,
+        timeDelta=time_delta,
+        performance=performance,
+        maxPoints=max_points,
+        body=body,
+        etag=hashlib.blake2b(body, digest_size=16).hexdigest(),
+    )
+
+
+def store_symbol_payloads(symbol: str, time_delta: str) -> None:
+    """Serialize and store the GET /symbols/<symbol> responses of a symbol.
+
+    The raw and performance responses are stored for each of
+    PRECOMPUTED_MAX_POINTS, with their ETag. To be called by the write
+    paths once new bars are committed.
+
+    Parameters
+    ----------
+    symbol : str
+        The symbol.
+    time_delta : str
+        The time delta of the data.
     """
-    requests_body = json.loads(request.data)
-    try:
-        symbol = requests_body["symbol"]
-        time_delta = requests_body["timeDelta"]
-    except KeyError:
-        return {
-            "message": "Body format wrong, should be {'symbol': 'abc', 'timeDelta': 'abc}"
-        }, 400
+    timeseries = read_symbol_timeseries(symbol, time_delta)
+
+    records = []
+    for performance in (False, True):
+        for max_points in PRECOMPUTED_MAX_POINTS:
+            payload = build_symbol_payload(
+                symbol, time_delta, timeseries, performance, max_points
+            )
+            records.append(
+                {
+                    "symbol": symbol,
+                    "timeDelta": time_delta,
+                    "performance": performance,
+                    "maxPoints": max_points,
+                    "body": payload.body,
+                    "etag": payload.etag,
+                }
+            )
+
+    # Concurrent refreshes of the symbol may store its payloads at once
+    statement = sqlite_insert(SymbolPayload)
+    statement = statement.on_conflict_do_update(
+        index_elements=["symbol", "timeDelta", "performance", "maxPoints"],
+        set_={
+            "body": statement.excluded["body"],
+            "etag": statement.excluded["etag"],
+        },
+    )
+    db.session.execute(statement, records)
+    db.session.commit()
+
 
+# =================================================================================================
+#     Routes
+# =================================================================================================
+
+
+def twelvedata_error_response(
+    result_from_twelve_data: Dict[str, str | int | float],
+) -> tuple:
+    """Build the response of a failed Twelve Data API request.
+
+    Exhausted API credits are answered with 429 and the estimated
+    wait in the Retry-After header, other errors with 500.
+
+    Parameters
+    ----------
+    result_from_twelve_data : Dict[str, str | int | float]
+        The error returned by request_twelvedata_api.
+
+    Returns
+    -------
+    tuple
+        The Flask response.
+    """
+    if "retryAfter" in result_from_twelve_data:
+        retry_after = math.ceil(result_from_twelve_data["retryAfter"])
+        return result_from_twelve_data, 429, {"Retry-After": str(retry_after)}
+
+    return result_from_twelve_data, 500
+
+
+def time_delta_to_timedelta(time_delta: str) -> datetime.timedelta:
+    """Convert a time delta of DELTA_CHOICES to a timedelta.
+
+    A month is counted as 30 days.
+
+    Parameters
+    ----------
+    time_delta : str
+        The time delta, e.g. 15min.
+
+    Returns
+    -------
+    datetime.timedelta
+        The time between two bars.
+    """
+    delta_size = int(re.findall("\d+", time_delta)[0])
+    delta_unit = convert_delta_unit[re.findall("\D+", time_delta)[0]]
+
+    if delta_unit == "months":
+        delta_unit = "days"
+        delta_size *= 30
+
+    return datetime.timedelta(**{delta_unit: delta_size})
+
+
+def check_symbol_update(
+    data: StockTimeSeries, last_bar_datetime: datetime.datetime
+) -> Tuple[int, Dict[str, str]]:
+    """Check if a stored symbol should be updated.
+
+    New data is requested when the last bar is older than the time
+    delta and the market is open, or closed but not checked yet since
+    it closed. The market check is recorded in data.marketChecked.
+
+    Parameters
+    ----------
+    data : StockTimeSeries
+        The stored symbol.
+    last_bar_datetime : datetime.datetime
+        The datetime of its last stored bar.
+
+    Returns
+    -------
+    Tuple[int, Dict[str, str]]
+        200 if the data should be updated. Otherwise the status code and
+        body to answer: 304 if no new data is available, 409 if there is
+        no market data for the exchange.
+    """
+    # Check if data is fresh enough
+    tz = pytz.timezone(data.timezone)
+    bar_interval = time_delta_to_timedelta(data.timeDelta)
+
+    data_time_delta = datetime.datetime.now(tz=tz) - tz.localize(last_bar_datetime)
+
+    if data_time_delta < bar_interval:
+        # Data is fresh enough
+        logger.warning(
+            f"Last data point is younger than {bar_interval}, no new data available. Last data is {data_time_delta} old."
+        )
+        return 304, {}
+
+    # Data is not fresh enough, now check if market is open
+    exchange_data = db.session.get(MarketState, data.exchange)
+
+    if not exchange_data:
+        return 409, {"message": f"No market data for {data.exchange}"}
+
+    if not exchange_data.isMarketOpen:
+        # Market is close
+
+        if not data.marketChecked:
+            logger.info(
+                f"{data.exchange} is closed, we verify one time for potential new data."
+            )
+            # Check at least one time because new data may have arrived
+            data.marketChecked = True
+
+        else:
+            logger.warning(
+                f"{data.exchange} is closed and verified, no new data available."
+            )
+            return 304, {}
+
+    else:
+        data.marketChecked = False
+
+    return 200, {}
+
+
+# Concurrent fetches of the same symbol share one Twelve Data API request,
+# keyed on the operation, symbol and time delta
+symbol_flights = SingleFlight()
+
+
+def create_symbol(symbol: str, time_delta: str) -> tuple:
+    """Fetch a symbol from Twelve Data API and store it, if it is not stored yet.
+
+    Parameters
+    ----------
+    symbol : str
+        The symbol.
+    time_delta : str
+        The time delta of the data.
+
+    Returns
+    -------
+    tuple
+        The Flask response: 201 if the data was created, 200 if it already
+        exists, or the error of Twelve Data API.
+    """
     if db.session.get(StockTimeSeries, [symbol, time_delta]) is not None:
         # Data already exist
         return {
@@ -354,7 +1033,7 @@ def create_symbol_data():
     else:
         # Data does not exists
         result_from_twelve_data = request_twelvedata_api.get_stock_timeseries(
-            symbol, time_delta, API_KEY
+            symbol, time_delta, current_app.config["API_KEY"]
         )
 
         if result_from_twelve_data["status"] == "ok":
@@ -371,37 +1050,1017 @@ def create_symbol_data():
                 time_delta,
                 exchange=result_from_twelve_data["exchange"],
                 timezone=result_from_twelve_data["timezone"],
-                timeseries=result_from_twelve_data["data"],
                 marketChecked=False,
             )
 
             db.session.add(new_timeseries)
+            store_symbol_bars(symbol, time_delta, result_from_twelve_data["data"])
             db.session.commit()
+            store_symbol_payloads(symbol, time_delta)
+
+            # Just fetched, next refresh in one bar interval
+            schedule_symbol_refresh(
+                symbol,
+                time_delta,
+                delay=time_delta_to_timedelta(time_delta).total_seconds(),
+            )
 
             return {
                 "message": f"Data created, use GET /symbols/{symbol}?timeDelta={time_delta}"
             }, 201
         else:
-            return result_from_twelve_data, 500
+            return twelvedata_error_response(result_from_twelve_data)
+
+
+def prepare_symbol_refresh(
+    symbol: str, time_delta: str
+) -> Tuple[tuple | None, str | None]:
+    """Check if a stored symbol should be refreshed, see refresh_symbol.
+
+    Parameters
+    ----------
+    symbol : str
+        The symbol.
+    time_delta : str
+        The time delta of the data.
+
+    Returns
+    -------
+    Tuple[tuple | None, str | None]
+        The Flask response if the symbol should not be refreshed, otherwise
+        None and the date to request the bars from.
+    """
+    old_data = db.session.get(StockTimeSeries, [symbol, time_delta])
+    if old_data is None:
+        # Data does not exist
+        return ({}, 204), None
 
+    last_bar_datetime = read_last_bar_datetime(symbol, time_delta)
+    status_code, body = check_symbol_update(old_data, last_bar_datetime)
 
-@app.route("/symbols/<symbol>", methods=["GET"])
-def get_symbol_data(symbol: str):
-    """Retrieve one specific symbol.
+    if status_code != 200:
+        return (body, status_code), None
 
-    Get timeseries and statistics informations of the given stock symbol.
-    ---
-    tags:
-        - SYMBOLS
-    parameters:
-        - in: path
-          name: symbol
-          schema:
-            type: string
-          required: true
-          description: The symbol we want to retrieve data from the database.
-        - in: query
-          name: timeDelta
+    # Only fetch from the last stored bar, which is fetched again in case it
+    # was revised since (e.g. it was still forming when it was stored)
+    return None, last_bar_datetime.strftime(TWELVEDATA_DATE_FORMAT)
+
+
+def store_symbol_refresh(
+    symbol: str, time_delta: str, result_from_twelve_data: Dict
+) -> tuple:
+    """Store the new bars of a refreshed symbol, see refresh_symbol.
+
+    Parameters
+    ----------
+    symbol : str
+        The symbol.
+    time_delta : str
+        The time delta of the data.
+    result_from_twelve_data : Dict
+        The result of get_stock_timeseries.
+
+    Returns
+    -------
+    tuple
+        The Flask response.
+    """
+    if result_from_twelve_data["status"] == "ok":
+        # Overlapping bars are overwritten, new ones appended
+        store_symbol_bars(symbol, time_delta, result_from_twelve_data["data"])
+
+        db.session.commit()
+        store_symbol_payloads(symbol, time_delta)
+
+        return {
+            "message": f"Data successfully updated, use GET /symbols/{symbol}?timeDelta={time_delta}"
+        }, 200
+
+    else:
+        db.session.rollback()
+        return twelvedata_error_response(result_from_twelve_data)
+
+
+def refresh_symbol(symbol: str, time_delta: str, priority: int = INTERACTIVE) -> tuple:
+    """Fetch the new bars of a stored symbol if it is stale.
+
+    Parameters
+    ----------
+    symbol : str
+        The symbol.
+    time_delta : str
+        The time delta of the data.
+    priority : int, optional
+        The priority of the Twelve Data API request, by default INTERACTIVE.
+
+    Returns
+    -------
+    tuple
+        The Flask response: 200 if the data was updated, 204 if it does not
+        exist, 304 if it was not stale, or the error of check_symbol_update
+        or Twelve Data API.
+    """
+    response, start_date = prepare_symbol_refresh(symbol, time_delta)
+    if response is not None:
+        return response
+
+    result_from_twelve_data = request_twelvedata_api.get_stock_timeseries(
+        symbol,
+        time_delta,
+        current_app.config["API_KEY"],
+        start_date=start_date,
+        priority=priority,
+    )
+
+    return store_symbol_refresh(symbol, time_delta, result_from_twelve_data)
+
+
+async def refresh_symbol_async(
+    symbol: str, time_delta: str, priority: int = INTERACTIVE
+) -> tuple:
+    """Fetch the new bars of a stored symbol if it is stale, see refresh_symbol.
+
+    The request to Twelve Data API is awaited, so that the refreshes of
+    several symbols overlap their network waits.
+    """
+    response, start_date = prepare_symbol_refresh(symbol, time_delta)
+    if response is not None:
+        return response
+
+    result_from_twelve_data = await async_twelvedata_api.get_stock_timeseries(
+        symbol,
+        time_delta,
+        current_app.config["API_KEY"],
+        start_date=start_date,
+        priority=priority,
+    )
+
+    return store_symbol_refresh(symbol, time_delta, result_from_twelve_data)
+
+
+def refresh_market_state(priority: int = INTERACTIVE) -> tuple:
+    """Fetch the state of the markets and store it.
+
+    Parameters
+    ----------
+    priority : int, optional
+        The priority of the Twelve Data API request, by default INTERACTIVE.
+
+    Returns
+    -------
+    tuple
+        The Flask response: 200 if the data was updated, or the error of
+        Twelve Data API.
+    """
+    result_from_twelve_data = request_twelvedata_api.get_markets_state(
+        current_app.config["API_KEY"], priority=priority
+    )
+    if result_from_twelve_data["status"] != "ok":
+        # Error
+        return twelvedata_error_response(result_from_twelve_data)
+
+    data_market = result_from_twelve_data["data"]
+
+    date_check = datetime.datetime.now(tz=EUROPE_TIMEZONE).timestamp()
+
+    for data_exchange in data_market.iloc:
+        old_exchange_data = db.session.get(MarketState, data_exchange["exchange"])
+        if old_exchange_data is None:
+            # TODO : adding new data to database through PUT request... Ugly...
+            # No data for this exchange, lets add it to the database
+            db.session.add(
+                MarketState(
+                    exchange=data_exchange["exchange"],
+                    country=data_exchange["country"],
+                    isMarketOpen=data_exchange["isMarketOpen"],
+                    timeToOpen=data_exchange["timeToOpen"],
+                    timeToClose=data_exchange["timeToClose"],
+                    dateCheck=date_check,
+                )
+            )
+
+        else:
+            old_exchange_data.isMarketOpen = data_exchange["isMarketOpen"]
+            old_exchange_data.timeToOpen = data_exchange["timeToOpen"]
+            old_exchange_data.timeToClose = data_exchange["timeToClose"]
+            old_exchange_data.dateCheck = date_check
+
+    db.session.commit()
+
+    return {"message": f"Data successfully updated, use GET /market"}, 200
+
+
+# =================================================================================================
+#     Background refresh
+# =================================================================================================
+
+refresh_scheduler = RefreshScheduler()
+
+# Client of the background jobs, on the event loop of the refresh scheduler
+async_twelvedata_api = AsyncTwelveDataApi()
+
+
+def symbol_job_key(symbol: str, time_delta: str) -> str:
+    return f"symbols/{symbol}?timeDelta={time_delta}"
+
+
+def run_in_app_context(app: Flask, refresh, *args) -> None:
+    """Run a refresh function in a background job.
+
+    Parameters
+    ----------
+    app : Flask
+        The app whose database is refreshed.
+    refresh : Callable
+        refresh_symbol or refresh_market_state.
+    *args
+        The arguments of the refresh function.
+
+    Raises
+    ------
+    RuntimeError
+        If the refresh failed, so the job failure is recorded.
+    """
+    with app.app_context():
+        check_refresh_response(refresh(*args, priority=BACKGROUND))
+
+
+async def run_in_app_context_async(app: Flask, refresh, *args) -> None:
+    """Await a refresh coroutine function in a background job, see run_in_app_context.
+
+    Each job runs in its own task, so in its own app context and
+    database session.
+    """
+    with app.app_context():
+        check_refresh_response(await refresh(*args, priority=BACKGROUND))
+
+
+def check_refresh_response(response: tuple) -> None:
+    body, status_code = response[:2]
+
+    if status_code >= 400:
+        raise RuntimeError(body.get("message", f"Refresh failed ({status_code})"))
+
+
+def schedule_symbol_refresh(symbol: str, time_delta: str, delay: float = 0) -> None:
+    """Refresh a stored symbol every bar interval.
+
+    To be called in an app context, whose app runs the refreshes.
+
+    Parameters
+    ----------
+    symbol : str
+        The symbol.
+    time_delta : str
+        The time delta of the data, which is also the refresh interval.
+    delay : float, optional
+        The time before the first refresh in seconds, by default 0.
+    """
+    app = current_app._get_current_object()
+    refresh_scheduler.add_job(
+        symbol_job_key(symbol, time_delta),
+        time_delta_to_timedelta(time_delta).total_seconds(),
+        functools.partial(
+            run_in_app_context_async, app, refresh_symbol_async, symbol, time_delta
+        ),
+        delay=delay,
+    )
+
+
+def sync_symbol_jobs(app: Flask) -> None:
+    """Schedule the refresh of the stored symbols of an app that have no job yet."""
+    with app.app_context():
+        for data in StockTimeSeries.query.all():
+            key = symbol_job_key(data.symbol, data.timeDelta)
+            if not refresh_scheduler.has_job(key):
+                schedule_symbol_refresh(data.symbol, data.timeDelta)
+
+
+def start_refresh_scheduler(app: Flask) -> None:
+    """Refresh the markets and the stored symbols of an app in the background.
+
+    Parameters
+    ----------
+    app : Flask
+        The app, see create_app.
+    """
+    refresh_scheduler.add_job(
+        "market",
+        MARKET_REFRESH_INTERVAL,
+        lambda: run_in_app_context(app, refresh_market_state),
+    )
+    refresh_scheduler.add_job(
+        "symbols", SYMBOLS_SYNC_INTERVAL, lambda: sync_symbol_jobs(app)
+    )
+    refresh_scheduler.start()
+
+
+def read_range_args() -> Dict[str, datetime.datetime]:
+    """Read the start and end query parameters of a time range.
+
+    Returns
+    -------
+    Dict[str, datetime.datetime]
+        The start and end that are given.
+
+    Raises
+    ------
+    ValueError
+        If a parameter is not a datetime.
+    """
+    return {
+        name: utils.parse_datetime(request.args[name]).to_pydatetime()
+        for name in ["start", "end"]
+        if name in request.args
+    }
+
+
+def read_window_args() -> Dict[str, datetime.datetime | int] | None:
+    """Read the time range and pagination query parameters of the GET /symbols routes.
+
+    Returns
+    -------
+    Dict[str, datetime.datetime | int] | None
+        The start, end, before (from the cursor) and limit arguments of
+        read_symbol_timeseries that are given, None if none is given.
+
+    Raises
+    ------
+    ValueError
+        If a parameter is not valid.
+    """
+    window = {}
+    for name, argument in [("start", "start"), ("end", "end"), ("cursor", "before")]:
+        value = request.args.get(name)
+        if value is not None:
+            window[argument] = utils.parse_datetime(value).to_pydatetime()
+
+    limit = request.args.get("limit")
+    if limit is not None:
+        if not limit.isdigit() or int(limit) < 1:
+            raise ValueError("limit should be at least 1")
+
+        window["limit"] = int(limit)
+
+    return window or None
+
+
+def read_symbol_window(
+    symbol: str, time_delta: str, window: Dict[str, datetime.datetime | int]
+) -> Tuple[pd.Series, Dict[str, int | None]]:
+    """Read a time range of the stored close values of a symbol.
+
+    If a limit is given, the most recent bars of the range are read
+    and the cursor to the previous page is given.
+
+    Parameters
+    ----------
+    symbol : str
+        The symbol.
+    time_delta : str
+        The time interval of the bars.
+    window : Dict[str, datetime.datetime | int]
+        The time range and limit, see read_window_args.
+
+    Returns
+    -------
+    Tuple[pd.Series, Dict[str, int | None]]
+        The timeseries, and the pagination fields of the response: if a
+        limit is given, nextCursor is the first datetime of the page in
+        milliseconds since epoch, or None if there is no previous page.
+    """
+    limit = window.get("limit")
+    if limit is None:
+        return read_symbol_timeseries(symbol, time_delta, **window), {}
+
+    # One more bar tells whether there is a previous page
+    timeseries = read_symbol_timeseries(
+        symbol, time_delta, **{**window, "limit": limit + 1}
+    )
+    if len(timeseries) <= limit:
+        return timeseries, {"nextCursor": None}
+
+    timeseries = timeseries.iloc[1:]
+    return timeseries, {"nextCursor": timeseries.index[0].value // 10**6}
+
+
+def format_symbol_entry(
+    data: StockTimeSeries,
+    timeseries: pd.Series,
+    page: Dict[str, int | None],
+    performance: bool,
+    max_points: int | None = None,
+) -> Dict[str, str | bool | List[List[float | int]]]:
+    """Format a stored symbol for GET /symbols.
+
+    Parameters
+    ----------
+    data : StockTimeSeries
+        The stored symbol.
+    timeseries : pd.Series
+        Its timeseries.
+    page : Dict[str, int | None]
+        Its pagination fields, see read_symbol_window.
+    performance : bool
+        If true, the timeseries is given as a percentage of its first value.
+    max_points : int | None, optional
+        The number of points the timeseries is downsampled to, by default None (all).
+
+    Returns
+    -------
+    Dict[str, str | bool | List[List[float | int]]]
+        The symbol with its timeseries and pagination fields.
+    """
+    entry = stock_timeseries_schema.dump(data)
+    entry["timeseries"] = utils.series_to_apexcharts(
+        timeseries, performance, max_points=max_points
+    )
+    entry.update(page)
+
+    return entry
+
+
+def build_symbol_entry(
+    data: StockTimeSeries,
+    performance: bool,
+    max_points: int | None = None,
+    window: Dict[str, datetime.datetime | int] | None = None,
+) -> Tuple[Dict[str, str | bool | List[List[float | int]]], Dict[str, str | float]]:
+    """Read a stored symbol and format it for GET /symbols.
+
+    Parameters
+    ----------
+    data : StockTimeSeries
+        The stored symbol.
+    performance : bool
+        If true, the timeseries is given as a percentage of its first value.
+    max_points : int | None, optional
+        The number of points the timeseries is downsampled to, by default None (all).
+    window : Dict[str, datetime.datetime | int] | None, optional
+        The time range and limit, see read_window_args, by default None (all).
+
+    Returns
+    -------
+    Tuple[Dict[str, str | bool | List[List[float | int]]], Dict[str, str | float]]
+        The symbol with its timeseries and pagination fields, and its stats informations.
+    """
+    timeseries, page = read_symbol_window(data.symbol, data.timeDelta, window or {})
+
+    stats = evaluate_symbol_stats(data.symbol, data.timeDelta, timeseries)
+    entry = format_symbol_entry(data, timeseries, page, performance, max_points)
+
+    return entry, stats
+
+
+def stream_all_symbols_data(
+    data: List[StockTimeSeries],
+    performance: bool,
+    max_points: int | None = None,
+    window: Dict[str, datetime.datetime | int] | None = None,
+):
+    """Generate the GET /symbols response symbol by symbol.
+
+    Only one timeseries is held in memory at a time, the stats
+    informations are sent at the end.
+
+    Parameters
+    ----------
+    data : List[StockTimeSeries]
+        The stored symbols.
+    performance : bool
+        If true, the timeseries are given as a percentage of their first value.
+    max_points : int | None, optional
+        The number of points the timeseries are downsampled to, by default None (all).
+    window : Dict[str, datetime.datetime | int] | None, optional
+        The time range and limit, see read_window_args, by default None (all).
+
+    Yields
+    ------
+    str
+        The chunks of the JSON response.
+    """
+    stats_table = []
+
+    yield '{"timeseries":['
+    for i, symbol_data in enumerate(data):
+        entry, stats = build_symbol_entry(symbol_data, performance, max_points, window)
+        stats_table.append(stats)
+
+        yield ("," if i > 0 else "") + current_app.json.dumps(entry)
+
+    yield '],"stats":' + current_app.json.dumps(stats_table) + "}"
+
+
+@api.route("/symbols", methods=["GET"])
+def get_all_symbols_data():
+    """Get all symbols at once.
+
+    Get the list of all the symbols data available in database.
+    ---
+    tags:
+        - SYMBOLS
+    parameters:
+        - in: query
+          name: performance
+          schema:
+              type: boolean
+          required: false
+          description: If true, the timeseries are given as a percentage of their first value.
+        - in: query
+          name: stream
+          schema:
+              type: boolean
+          required: false
+          description: If true, the response is sent symbol by symbol as soon as each one is ready.
+        - in: query
+          name: maxPoints
+          schema:
+              type: integer
+              minimum: 3
+          required: false
+          description: Downsample the timeseries to this number of points, keeping their shape (Largest-Triangle-Three-Buckets).
+        - in: query
+          name: start
+          schema:
+              type: string
+          required: false
+          description: The first datetime of the timeseries, included, as a date string or in milliseconds since epoch.
+        - in: query
+          name: end
+          schema:
+              type: string
+          required: false
+          description: The last datetime of the timeseries, included, as a date string or in milliseconds since epoch.
+        - in: query
+          name: limit
+          schema:
+              type: integer
+              minimum: 1
+          required: false
+          description: Only give the limit most recent points of the time range, with a nextCursor to the previous ones.
+        - in: query
+          name: cursor
+          schema:
+              type: integer
+          required: false
+          description: The nextCursor of a previous response, to get the points before it.
+    responses:
+        200:
+            description: Request successful, returning all symbols data from database and the evaluated stats infomartions.
+            schema:
+                type: object
+                properties:
+                    timeseries:
+                        type: array
+                        description: The symbols timeseries.
+                        items:
+                            type: array
+                            description: One symbol timeseries.
+                            items:
+                                type: array
+                                items:
+                                    type: number
+                                    description: A data point (time and value).
+                                minItems: 2
+                                maxItems: 2
+
+                    stats:
+                        type: array
+                        description: The list of the stats informations of the stocks.
+                        items:
+                            type: object
+                            properties:
+                                symbol:
+                                    type: string
+                                    description: The symbol name.
+                                cumulativeReturn:
+                                    type: number
+                                    description: The cumulative return of the stock.
+                                annualizedCumulativeReturn:
+                                    type: number
+                                    description: The annualized cumulative return of the stock.
+                                annualizedVolatility:
+                                    type: number
+                                    description: The annualized volatility of the stock.
+        400:
+            description: maxPoints is lower than 3, or a time range or pagination parameter is not valid.
+
+
+
+
+    """
+    target_data_format: str = request.args.get(
+        "dataFormat", default="apexcharts", type=str
+    )
+    localize: bool = request.args.get("localize", default=False, type=json.loads)
+    performance: bool = request.args.get("performance", default=True, type=json.loads)
+    stream: bool = request.args.get("stream", default=False, type=json.loads)
+    max_points: int | None = request.args.get("maxPoints", default=None, type=int)
+    if max_points is not None and max_points < 3:
+        return {"message": "maxPoints should be at least 3"}, 400
+
+    try:
+        window = read_window_args()
+    except ValueError as e:
+        return {"message": str(e)}, 400
+
+    data = StockTimeSeries.query.all()
+
+    if stream:
+        return Response(
+            stream_with_context(
+                stream_all_symbols_data(data, performance, max_points, window)
+            ),
+            mimetype="application/json",
+        )
+
+    # Stats of all the symbols are evaluated at once
+    timeseries_pages = [
+        read_symbol_window(symbol_data.symbol, symbol_data.timeDelta, window or {})
+        for symbol_data in data
+    ]
+    stats_table = evaluate_symbols_stats(
+        [
+            (symbol_data.symbol, symbol_data.timeDelta, timeseries)
+            for symbol_data, (timeseries, _) in zip(data, timeseries_pages)
+        ]
+    )
+    all_timeseries = [
+        format_symbol_entry(symbol_data, timeseries, page, performance, max_points)
+        for symbol_data, (timeseries, page) in zip(data, timeseries_pages)
+    ]
+
+    return {"timeseries": all_timeseries, "stats": stats_table}, 200
+
+
+@api.route("/symbols", methods=["POST"])
+def create_symbol_data():
+    """Add a new symbol.
+
+    Add a symbol timeseries to the database.
+    ---
+    tags:
+        - SYMBOLS
+
+    parameters:
+        - name: body
+          in: body
+          required: true
+          schema:
+            type: object
+            properties:
+                symbol:
+                    type: string
+                    description: The symbol we want to add to the database.
+                timeDelta:
+                    type: string
+                    description: The desired time delta for the data.
+
+    responses:
+        200:
+            description: Data already exists in the database, you can use directly the get method.
+        201:
+            description: Data successfully created in the database, you can use the get method to retrieve it.
+        429:
+            description: Twelve Data API credits are exhausted, retry after the delay of the Retry-After header.
+            schema:
+                type: object
+                properties:
+                    status:
+                        type: string
+                        description: The status of the request, which will be 'error' in this case.
+                    code:
+                        type: integer
+                        description: The associated error code, 429.
+                    message:
+                        type: string
+                        description: The error message associated.
+                    retryAfter:
+                        type: number
+                        description: The estimated wait in seconds before the request can succeed.
+        500:
+            description: An error happened sever-side.
+            schema:
+                type: object
+                properties:
+                    status:
+                        type: string
+                        description: The status of the request, which will be 'error' in this case
+                    code:
+                        type: integer
+                        description: The associated error code.
+                    message:
+                        type: string
+                        description: The error message associated.
+    """
+    requests_body = json.loads(request.data)
+    try:
+        symbol = requests_body["symbol"]
+        time_delta = requests_body["timeDelta"]
+    except KeyError:
+        return {
+            "message": "Body format wrong, should be {'symbol': 'abc', 'timeDelta': 'abc}"
+        }, 400
+
+    # Concurrent requests of the same symbol share the creation
+    return symbol_flights.do(
+        ("create", symbol, time_delta), lambda: create_symbol(symbol, time_delta)
+    )
+
+
+@api.route("/symbols", methods=["PUT"])
+def update_all_symbols_data():
+    """Update all symbols at once.
+
+    Update the stale symbols of the database, with one Twelve Data API request per batch of symbols of a time delta and exchange timezone, sent concurrently. Batches beyond the first one wait for the API credits of the plan. Symbols being updated by another request are waited for.
+    ---
+    tags:
+        - SYMBOLS
+    parameters:
+        - in: query
+          name: timeDelta
+          schema:
+              type: string
+          required: false
+          description: Only update the symbols of this time interval.
+    responses:
+        200:
+            description: The update was done, returning the outcome for each symbol.
+            schema:
+                type: object
+                properties:
+                    results:
+                        type: array
+                        items:
+                            type: object
+                            properties:
+                                symbol:
+                                    type: string
+                                    description: The symbol name.
+                                timeDelta:
+                                    type: string
+                                    description: The time interval of the data.
+                                status:
+                                    type: string
+                                    description: updated, notModified or error.
+                                message:
+                                    type: string
+                                    description: If status is error, the error message.
+        400:
+            description: Time delta is incorrect, choose according to message.
+            schema:
+                type: object
+                properties:
+                    message:
+                        type: string
+                        description: Gives the list of available time delta.
+    """
+    time_delta: str | None = request.args.get("timeDelta", default=None, type=str)
+    if time_delta is not None and time_delta not in DELTA_CHOICES:
+        return {
+            "message": f'Incorrect time delta, should be within {", ".join(DELTA_CHOICES)}'
+        }, 400
+
+    query = StockTimeSeries.query
+    if time_delta is not None:
+        query = query.filter_by(timeDelta=time_delta)
+
+    # Symbols refreshed meanwhile by another request are waited for, and the
+    # PUT /symbols/<symbol> requests of the other symbols wait for this one
+    stored_symbols = query.all()
+    flights = [
+        symbol_flights.start(("refresh", old_data.symbol, old_data.timeDelta))
+        for old_data in stored_symbols
+    ]
+    led_symbols = [
+        old_data for old_data, (_, leader) in zip(stored_symbols, flights) if leader
+    ]
+
+    try:
+        responses = refresh_symbols(led_symbols)
+
+    except BaseException as e:
+        for old_data, (flight, leader) in zip(stored_symbols, flights):
+            if leader:
+                symbol_flights.finish(
+                    ("refresh", old_data.symbol, old_data.timeDelta), flight, error=e
+                )
+        raise
+
+    # Ended once committed, so that the waiting requests read the new bars
+    for old_data, (flight, leader) in zip(stored_symbols, flights):
+        if leader:
+            symbol_flights.finish(
+                ("refresh", old_data.symbol, old_data.timeDelta),
+                flight,
+                responses[old_data.symbol, old_data.timeDelta],
+            )
+
+    results = []
+    for old_data, (flight, leader) in zip(stored_symbols, flights):
+        if leader:
+            response = responses[old_data.symbol, old_data.timeDelta]
+
+        else:
+            try:
+                response = flight.wait()
+
+            except Exception as e:
+                response = {"message": str(e)}, 500
+
+        body, status_code = response[:2]
+        result = {
+            "symbol": old_data.symbol,
+            "timeDelta": old_data.timeDelta,
+            "status": {200: "updated", 304: "notModified"}.get(status_code, "error"),
+        }
+        if result["status"] == "error":
+            result["message"] = body.get("message")
+
+        results.append(result)
+
+    return {"results": results}, 200
+
+
+def refresh_symbols(stored_symbols: list) -> Dict[Tuple[str, str], tuple]:
+    """Fetch the new bars of the stale symbols among stored ones, in batches.
+
+    Parameters
+    ----------
+    stored_symbols : list
+        The stored symbols.
+
+    Returns
+    -------
+    Dict[Tuple[str, str], tuple]
+        The Flask response of each symbol and time delta, as given by
+        refresh_symbol.
+    """
+    responses = {}
+    # Symbols to update and their last bar datetime
+    stale_symbols = []
+    for old_data in stored_symbols:
+        last_bar_datetime = read_last_bar_datetime(old_data.symbol, old_data.timeDelta)
+        status_code, body = check_symbol_update(old_data, last_bar_datetime)
+
+        if status_code == 200:
+            stale_symbols.append((old_data, last_bar_datetime))
+
+        else:
+            responses[old_data.symbol, old_data.timeDelta] = body, status_code
+
+    # One API credit per symbol, a request can not use more than the plan allows
+    batch_size = min(
+        request_twelvedata_api.load_twelvedata_api_config()["timeseries_batch_size"],
+        request_twelvedata_api.get_credit_scheduler().max_credits,
+    )
+
+    batches = make_symbols_batches(stale_symbols, batch_size)
+
+    # The batches are requested at once and stored as they come, in order
+    results_from_twelve_data = asyncio.run(
+        request_symbols_batches(batches, current_app.config["API_KEY"])
+    )
+
+    updated = []
+    for (stale_time_delta, batch), result_from_twelve_data in zip(
+        batches, results_from_twelve_data
+    ):
+        for old_data, _ in batch:
+            if result_from_twelve_data["status"] == "ok":
+                symbol_result = result_from_twelve_data["data"][old_data.symbol]
+
+            else:
+                symbol_result = result_from_twelve_data
+
+            if symbol_result["status"] == "ok":
+                store_symbol_bars(
+                    old_data.symbol, stale_time_delta, symbol_result["data"]
+                )
+                updated.append((old_data.symbol, stale_time_delta))
+                responses[old_data.symbol, stale_time_delta] = {
+                    "message": f"Data successfully updated, use GET /symbols/{old_data.symbol}?timeDelta={stale_time_delta}"
+                }, 200
+
+            else:
+                # Not fetched, the closed market should be checked again
+                old_data.marketChecked = False
+                responses[old_data.symbol, stale_time_delta] = (
+                    twelvedata_error_response(symbol_result)
+                )
+
+    db.session.commit()
+
+    for symbol, stale_time_delta in updated:
+        store_symbol_payloads(symbol, stale_time_delta)
+
+    return responses
+
+
+def make_symbols_batches(
+    stale_symbols: list, batch_size: int
+) -> List[Tuple[str, list]]:
+    """Group stale symbols in batches, each requested from one start date.
+
+    The start date of a batch is the oldest last bar of its symbols, in
+    the timezone of their exchange. So the symbols of a batch have the
+    same time delta and exchange timezone, and last bars at most
+    BATCH_MAX_LAST_BAR_SPREAD bars newer than the oldest one.
+
+    Parameters
+    ----------
+    stale_symbols : list
+        The stored symbols with their last bar datetime.
+    batch_size : int
+        The most symbols of a batch.
+
+    Returns
+    -------
+    List[Tuple[str, list]]
+        The time delta of each batch, and its stored symbols with their
+        last bar datetime, from the oldest one.
+    """
+    groups: Dict[Tuple[str, str], list] = defaultdict(list)
+    for old_data, last_bar_datetime in stale_symbols:
+        groups[(old_data.timeDelta, old_data.timezone)].append(
+            (old_data, last_bar_datetime)
+        )
+
+    batches = []
+    for (time_delta, _), group in groups.items():
+        max_spread = BATCH_MAX_LAST_BAR_SPREAD * time_delta_to_timedelta(time_delta)
+        batch = []
+        for old_data, last_bar_datetime in sorted(group, key=lambda x: x[1]):
+            if batch and (
+                len(batch) == batch_size or last_bar_datetime - batch[0][1] > max_spread
+            ):
+                batches.append((time_delta, batch))
+                batch = []
+
+            batch.append((old_data, last_bar_datetime))
+
+        batches.append((time_delta, batch))
+
+    return batches
+
+
+async def request_symbols_batches(
+    batches: List[Tuple[str, list]], api_key: str
+) -> List[Dict]:
+    """Request the time series of batches of stale symbols concurrently.
+
+    The first batch is requested as an interactive request. The others
+    are background requests, which wait for the API credits of the plan
+    instead of being rejected.
+
+    Parameters
+    ----------
+    batches : List[Tuple[str, list]]
+        The time delta of each batch, and its stored symbols with their
+        last bar datetime.
+    api_key : str
+        API key for the Twelve Data API.
+
+    Returns
+    -------
+    List[Dict]
+        The result of get_stocks_timeseries for each batch.
+    """
+    async with AsyncTwelveDataApi() as twelvedata_api:
+        return await asyncio.gather(
+            *(
+                twelvedata_api.get_stocks_timeseries(
+                    [old_data.symbol for old_data, _ in batch],
+                    time_delta,
+                    api_key,
+                    # Bars already stored for some symbols are overwritten
+                    start_date=min(
+                        last_bar_datetime for _, last_bar_datetime in batch
+                    ).strftime(TWELVEDATA_DATE_FORMAT),
+                    priority=INTERACTIVE if i == 0 else BACKGROUND,
+                )
+                for i, (time_delta, batch) in enumerate(batches)
+            )
+        )
+
+
+@api.route("/symbols/<symbol>", methods=["GET"])
+def get_symbol_data(symbol: str):
+    """Retrieve one specific symbol.
+
+    Get timeseries and statistics informations of the given stock symbol.
+    ---
+    tags:
+        - SYMBOLS
+    parameters:
+        - in: path
+          name: symbol
+          schema:
+            type: string
+          required: true
+          description: The symbol we want to retrieve data from the database.
+        - in: query
+          name: timeDelta
           schema:
               type: string
           required: true
@@ -412,195 +2071,610 @@ def get_symbol_data(symbol: str):
               type: boolean
           required: true
           description: To format to performance or keep raw value.
+        - in: query
+          name: maxPoints
+          schema:
+              type: integer
+              minimum: 3
+          required: false
+          description: Downsample the timeseries to this number of points, keeping its shape (Largest-Triangle-Three-Buckets).
+        - in: query
+          name: start
+          schema:
+              type: string
+          required: false
+          description: The first datetime of the timeseries, included, as a date string or in milliseconds since epoch.
+        - in: query
+          name: end
+          schema:
+              type: string
+          required: false
+          description: The last datetime of the timeseries, included, as a date string or in milliseconds since epoch.
+        - in: query
+          name: limit
+          schema:
+              type: integer
+              minimum: 1
+          required: false
+          description: Only give the limit most recent points of the time range, with a nextCursor to the previous ones.
+        - in: query
+          name: cursor
+          schema:
+              type: integer
+          required: false
+          description: The nextCursor of a previous response, to get the points before it.
+        - in: header
+          name: If-None-Match
+          schema:
+              type: string
+          required: false
+          description: The ETag of a previous response, to only get the data if it changed.
+    responses:
+        200:
+            description: Request successful, returning the symbol data from database and the evaluated stats infomartions, with its ETag header.
+            schema:
+                type: object
+                properties:
+                    timeseries:
+                        type: array
+                        description: Timeseries, either performance or raw value.
+                        items:
+                            type: array
+                            items:
+                                type: number
+                                description: A data point (time and value).
+                            minItems: 2
+                            maxItems: 2
+                    nextCursor:
+                        type: integer
+                        description: Only if limit is given, the cursor to the previous page, null if there is none.
+                    stats:
+                        type: object
+                        description: The stats informations of the stock.
+                        properties:
+                            symbol:
+                                type: string
+                                description: The symbol name.
+                            cumulativeReturn:
+                                type: number
+                                description: The cumulative return of the stock.
+                            annualizedCumulativeReturn:
+                                type: number
+                                description: The annualized cumulative return of the stock.
+                            annualizedVolatility:
+                                type: number
+                                description: The annualized volatility of the stock.
+
+        204:
+            description: Data does not exist in database, you can create it through the POST /symbols
+        304:
+            description: The data did not change since the response of the If-None-Match ETag.
+        400:
+            description: maxPoints is lower than 3, or a time range or pagination parameter is not valid.
+    """
+    time_delta: str = request.args.get("timeDelta", type=str)
+    performance: bool = bool(json.loads(request.args.get("performance")))
+    max_points: int = request.args.get("maxPoints", default=0, type=int)
+    if max_points and max_points < 3:
+        return {"message": "maxPoints should be at least 3"}, 400
+
+    try:
+        window = read_window_args()
+    except ValueError as e:
+        return {"message": str(e)}, 400
+
+    payload = None
+    if window is None:
+        payload = db.session.get(
+            SymbolPayload, [symbol, time_delta, performance, max_points]
+        )
+
+    if payload is None:
+        if db.session.get(StockTimeSeries, [symbol, time_delta]) is None:
+            # Data does not exist
+            return {}, 204
+
+        if window is not None:
+            timeseries, page = read_symbol_window(symbol, time_delta, window)
+            payload = build_symbol_payload(
+                symbol, time_delta, timeseries, performance, max_points, page
+            )
+
+        else:
+            # Not precomputed, or not stored yet by the write paths: served
+            # without being stored, GET requests only read the database
+            payload = build_symbol_payload(
+                symbol,
+                time_delta,
+                read_symbol_timeseries(symbol, time_delta),
+                performance,
+                max_points,
+            )
+
+    response = current_app.response_class(payload.body, mimetype="application/json")
+    response.set_etag(payload.etag)
+    # Cached by the browser, but always revalidated with If-None-Match
+    response.cache_control.no_cache = True
+
+    return response.make_conditional(request)
+
+
+# TODO : market is closed but new data is available (delta > 2* chosen delta) -> modify this !!
+@api.route("/symbols/<symbol>", methods=["PUT"])
+def update_symbol_data(symbol: str):
+    """Update one specific symbol.
+
+    Update data symbol in the database.
+    ---
+    tags:
+        - SYMBOLS
+    parameters:
+        - in: path
+          name: symbol
+          schema:
+            type: string
+          required: true
+          description: The symbol we want to update data in the database.
+        - in: query
+          name: timeDelta
+          schema:
+              type: string
+          required: true
+          description: The time interval we want for the data.
+    responses:
+        200:
+            description: The data was successfully updated, you can get it back with get request.
+        204:
+            description: The data does not exists, you should create it first with POST /symbols.
+
+        304:
+            description: The data was not updated because it was fresh enough or the associated market was closed.
+
+        400:
+            description: Time delta is incorrect, choose according to message.
+            schema:
+                type: object
+                properties:
+                    message:
+                        type: string
+                        description: Gives the list of available time delta.
+        429:
+            description: Twelve Data API credits are exhausted, retry after the delay of the Retry-After header.
+            schema:
+                type: object
+                properties:
+                    status:
+                        type: string
+                        description: The status of the request, which will be 'error' in this case.
+                    code:
+                        type: integer
+                        description: The associated error code, 429.
+                    message:
+                        type: string
+                        description: The error message associated.
+                    retryAfter:
+                        type: number
+                        description: The estimated wait in seconds before the request can succeed.
+        500:
+            description: An error happened server-side.
+            schema:
+                type: object
+                properties:
+                    status:
+                        type: string
+                        description: The status of the request, which will be 'error' in this case.
+                    code:
+                        type: integer
+                        description: The associated error code.
+                    message:
+                        type: string
+                        description: The error message associated.
+    """
+    time_delta: str = request.args.get("timeDelta", type=str)
+    if time_delta not in DELTA_CHOICES:
+        return {
+            "message": f'Incorrect time delta, should be within {", ".join(DELTA_CHOICES)}'
+        }, 400
+
+    # Concurrent requests of the same symbol share the refresh
+    return symbol_flights.do(
+        ("refresh", symbol, time_delta), lambda: refresh_symbol(symbol, time_delta)
+    )
+
+
+@api.route("/symbols/<symbol>/analytics", methods=["GET"])
+def get_symbol_analytics(symbol: str):
+    """Retrieve rolling analytics of one specific symbol.
+
+    Get moving averages, rolling volatility, Sharpe ratio and drawdown of the given stock symbol, evaluated over a rolling window.
+    ---
+    tags:
+        - SYMBOLS
+    parameters:
+        - in: path
+          name: symbol
+          schema:
+            type: string
+          required: true
+          description: The symbol we want to retrieve analytics of.
+        - in: query
+          name: timeDelta
+          schema:
+              type: string
+          required: true
+          description: The time interval of the data.
+        - in: query
+          name: window
+          schema:
+              type: integer
+              minimum: 2
+              default: 20
+          required: false
+          description: The number of points of the rolling window.
+        - in: query
+          name: metrics
+          schema:
+              type: string
+          required: false
+          description: Comma separated analytics to give among sma, ema, volatility, sharpe and drawdown, by default all.
+        - in: query
+          name: maxPoints
+          schema:
+              type: integer
+              minimum: 3
+          required: false
+          description: Downsample each analytics timeseries to this number of points, keeping its shape (Largest-Triangle-Three-Buckets).
+    responses:
+        200:
+            description: Request successful, returning the analytics timeseries, without the first points lacking history.
+            schema:
+                type: object
+                properties:
+                    symbol:
+                        type: string
+                        description: The symbol name.
+                    timeDelta:
+                        type: string
+                        description: The time interval of the data.
+                    window:
+                        type: integer
+                        description: The number of points of the rolling window.
+                    maxDrawdown:
+                        type: number
+                        description: The largest decline of the price from its highest previous value, in percent.
+                    sma:
+                        type: array
+                        description: Simple moving average of the price.
+                        items:
+                            type: array
+                            items:
+                                type: number
+                                description: A data point (time and value).
+                            minItems: 2
+                            maxItems: 2
+                    ema:
+                        type: array
+                        description: Exponential moving average of the price, of span window.
+                    volatility:
+                        type: array
+                        description: Standard deviation of the log returns, in percent, not annualized.
+                    sharpe:
+                        type: array
+                        description: Mean over standard deviation of the log returns, with a risk free rate of zero, not annualized.
+                    drawdown:
+                        type: array
+                        description: Decline of the price from its highest value over the window, in percent.
+        204:
+            description: Data does not exist in database, you can create it through the POST /symbols
+        400:
+            description: window is lower than 2, maxPoints is lower than 3, or a metric is unknown.
+    """
+    time_delta: str = request.args.get("timeDelta", type=str)
+    window: int = request.args.get("window", default=20, type=int)
+    metrics: List[str] = request.args.get(
+        "metrics", default=",".join(ANALYTICS_METRICS), type=str
+    ).split(",")
+    max_points: int | None = request.args.get("maxPoints", default=None, type=int)
+
+    if window < 2:
+        return {"message": "window should be at least 2"}, 400
+
+    if max_points is not None and max_points < 3:
+        return {"message": "maxPoints should be at least 3"}, 400
+
+    unknown_metrics = sorted(set(metrics) - set(ANALYTICS_METRICS))
+    if unknown_metrics:
+        return {"message": f"Unknown metrics: {', '.join(unknown_metrics)}"}, 400
+
+    if db.session.get(StockTimeSeries, [symbol, time_delta]) is None:
+        # Data does not exist
+        return {}, 204
+
+    analytics, max_drawdown = evaluate_symbol_analytics(symbol, time_delta, window)
+
+    result = {
+        "symbol": symbol,
+        "timeDelta": time_delta,
+        "window": window,
+        "maxDrawdown": max_drawdown,
+    }
+    for metric in metrics:
+        result[metric] = utils.series_to_apexcharts(
+            analytics[metric].dropna(),
+            performance=False,
+            max_points=max_points,
+            decimals=4,
+        )
+
+    return result, 200
+
+
+@api.route("/symbols-correlation", methods=["GET"])
+def get_symbols_correlation():
+    """Retrieve the returns correlation of the symbols.
+
+    Get the correlation and covariance matrices of the log returns of the stored symbols of a time delta.
+    Each pair of symbols is compared on the datetimes both have a return.
+    ---
+    tags:
+        - SYMBOLS
+    parameters:
+        - in: query
+          name: timeDelta
+          schema:
+              type: string
+          required: true
+          description: The time interval of the data.
+        - in: query
+          name: symbols
+          schema:
+              type: string
+          required: false
+          description: Comma separated symbols to compare, by default all the stored symbols of the time delta.
+        - in: query
+          name: start
+          schema:
+              type: string
+          required: false
+          description: The first datetime of the data, included, as a date string or in milliseconds since epoch.
+        - in: query
+          name: end
+          schema:
+              type: string
+          required: false
+          description: The last datetime of the data, included, as a date string or in milliseconds since epoch.
+        - in: query
+          name: minPeriods
+          schema:
+              type: integer
+              minimum: 2
+              default: 2
+          required: false
+          description: The minimum number of common returns of a pair, below which its correlation and covariance are null.
     responses:
         200:
-            description: Request successful, returning the symbol data from database and the evaluated stats infomartions.
+            description: Request successful, returning the matrices, whose rows and columns are in the order of symbols.
             schema:
                 type: object
                 properties:
-                    timeseries:
+                    timeDelta:
+                        type: string
+                        description: The time interval of the data.
+                    symbols:
                         type: array
-                        description: Timeseries, either performance or raw value.
+                        description: The symbols.
+                        items:
+                            type: string
+                    correlation:
+                        type: array
+                        description: The correlation matrix of the log returns, null for pairs without enough common returns.
                         items:
                             type: array
                             items:
                                 type: number
-                                description: A data point (time and value).
-                            minItems: 2
-                            maxItems: 2
-                    stats:
-                        type: object
-                        description: The stats informations of the stock.
-                        properties:
-                            symbol:
-                                type: string
-                                description: The symbol name.
-                            cumulativeReturn:
-                                type: number
-                                description: The cumulative return of the stock.
-                            annualizedCumulativeReturn:
-                                type: number
-                                description: The annualized cumulative return of the stock.
-                            annualizedVolatility:
+                    covariance:
+                        type: array
+                        description: The covariance matrix of the log returns, null for pairs without enough common returns.
+                        items:
+                            type: array
+                            items:
                                 type: number
-                                description: The annualized volatility of the stock.
-
-        204:
-            description: Data does not exist in database, you can create it through the POST /symbols
+                    observations:
+                        type: array
+                        description: The number of common returns of each pair.
+                        items:
+                            type: array
+                            items:
+                                type: integer
+        400:
+            description: A symbol is not stored for the time delta, minPeriods is lower than 2, or a time range parameter is not valid.
     """
     time_delta: str = request.args.get("timeDelta", type=str)
-    performance: bool = json.loads(request.args.get("performance"))
-
-    data = db.session.get(StockTimeSeries, [symbol, time_delta])
-    if data is None:
-        # Data does not exist
-        return {}, 204
+    min_periods: int = request.args.get("minPeriods", default=2, type=int)
+    if min_periods < 2:
+        return {"message": "minPeriods should be at least 2"}, 400
 
-    else:
-        database_data = stock_timeseries_schema.dump(data)
-
-        stats_table = stock_stats.evaluate_stats_information(
-            database_data["timeseries"], symbol
-        )
+    try:
+        bounds = read_range_args()
+    except ValueError as e:
+        return {"message": str(e)}, 400
+
+    stored_symbols = db.session.scalars(
+        db.select(StockTimeSeries.symbol)
+        .where(StockTimeSeries.timeDelta == time_delta)
+        .order_by(StockTimeSeries.symbol)
+    ).all()
+
+    symbols = stored_symbols
+    if "symbols" in request.args:
+        symbols = list(dict.fromkeys(request.args["symbols"].split(",")))
+        unknown_symbols = sorted(set(symbols) - set(stored_symbols))
+        if unknown_symbols:
+            return {"message": f"Unknown symbols: {', '.join(unknown_symbols)}"}, 400
+
+    matrices = evaluate_symbols_correlation(
+        symbols, time_delta, min_periods=min_periods, **bounds
+    )
 
-        timeseries = utils.series_to_apexcharts(
-            database_data["timeseries"], performance=performance
-        )
+    result = {"timeDelta": time_delta, "symbols": symbols}
+    for name, matrix in matrices.items():
+        values = matrix.to_numpy()
+        if values.dtype.kind == "f":
+            # NaN is not valid JSON
+            values = np.where(np.isnan(values), None, values)
+        result[name] = values.tolist()
 
-        return {"timeseries": timeseries, "stats": stats_table}, 200
+    return result, 200
 
 
-# TODO : market is closed but new data is available (delta > 2* chosen delta) -> modify this !!
-@app.route("/symbols/<symbol>", methods=["PUT"])
-def update_symbol_data(symbol: str):
-    """Update one specific symbol.
+@api.route("/portfolio", methods=["GET"])
+def get_portfolio():
+    """Retrieve the value of a portfolio of symbols.
 
-    Update data symbol in the database.
+    Get the performance and statistics informations of a portfolio of stored symbols, bought with the given weights at the first datetime all of them have a price.
+    The prices are carried over the datetimes a symbol is not traded, e.g. the holidays of its exchange.
     ---
     tags:
         - SYMBOLS
     parameters:
-        - in: path
-          name: symbol
+        - in: query
+          name: timeDelta
           schema:
-            type: string
+              type: string
           required: true
-          description: The symbol we want to update data in the database.
+          description: The time interval of the data.
         - in: query
-          name: timeDelta
+          name: symbols
           schema:
               type: string
           required: true
-          description: The time interval we want for the data.
+          description: Comma separated symbols of the portfolio.
+        - in: query
+          name: weights
+          schema:
+              type: string
+          required: false
+          description: Comma separated non negative weights of the symbols, normalized by their sum, by default equal weights.
+        - in: query
+          name: name
+          schema:
+              type: string
+              default: Portfolio
+          required: false
+          description: The name of the portfolio in its stats informations.
+        - in: query
+          name: start
+          schema:
+              type: string
+          required: false
+          description: The first datetime of the data, included, as a date string or in milliseconds since epoch.
+        - in: query
+          name: end
+          schema:
+              type: string
+          required: false
+          description: The last datetime of the data, included, as a date string or in milliseconds since epoch.
+        - in: query
+          name: maxPoints
+          schema:
+              type: integer
+              minimum: 3
+          required: false
+          description: Downsample the timeseries to this number of points, keeping its shape (Largest-Triangle-Three-Buckets).
     responses:
         200:
-            description: The data was successfully updated, you can get it back with get request.
-        204:
-            description: The data does not exists, you should create it first with POST /symbols.
-
-        304:
-            description: The data was not updated because it was fresh enough or the associated market was closed.
-
-        400:
-            description: Time delta is incorrect, choose according to message.
-            schema:
-                type: object
-                properties:
-                    message:
-                        type: string
-                        description: Gives the list of available time delta.
-        500:
-            description: An error happened server-side.
+            description: Request successful, returning the portfolio performance and the evaluated stats infomartions.
             schema:
                 type: object
                 properties:
-                    status:
-                        type: string
-                        description: The status of the request, which will be 'error' in this case.
-                    code:
-                        type: integer
-                        description: The associated error code.
-                    message:
+                    timeDelta:
                         type: string
-                        description: The error message associated.
+                        description: The time interval of the data.
+                    symbols:
+                        type: array
+                        description: The symbols.
+                        items:
+                            type: string
+                    weights:
+                        type: array
+                        description: The normalized weights of the symbols.
+                        items:
+                            type: number
+                    timeseries:
+                        type: array
+                        description: Value of the portfolio, as a percentage of its first value.
+                        items:
+                            type: array
+                            items:
+                                type: number
+                                description: A data point (time and value).
+                            minItems: 2
+                            maxItems: 2
+                    stats:
+                        type: object
+                        description: The stats informations of the portfolio, as those of GET /symbols/<symbol>.
+        400:
+            description: symbols is missing, a symbol is not stored for the time delta or is repeated, the weights are not valid, maxPoints is lower than 3, or a time range parameter is not valid.
     """
     time_delta: str = request.args.get("timeDelta", type=str)
-    if time_delta not in DELTA_CHOICES:
+    name: str = request.args.get("name", default="Portfolio", type=str)
+    max_points: int | None = request.args.get("maxPoints", default=None, type=int)
+    if max_points is not None and max_points < 3:
+        return {"message": "maxPoints should be at least 3"}, 400
+
+    symbols = request.args.get("symbols", default="", type=str).split(",")
+    if symbols == [""]:
+        return {"message": "symbols should be given"}, 400
+
+    if len(set(symbols)) != len(symbols):
+        return {"message": "symbols should not be repeated"}, 400
+
+    stored_symbols = db.session.scalars(
+        db.select(StockTimeSeries.symbol).where(
+            StockTimeSeries.timeDelta == time_delta,
+            StockTimeSeries.symbol.in_(symbols),
+        )
+    ).all()
+    unknown_symbols = sorted(set(symbols) - set(stored_symbols))
+    if unknown_symbols:
+        return {"message": f"Unknown symbols: {', '.join(unknown_symbols)}"}, 400
+
+    weights = [1.0] * len(symbols)
+    if "weights" in request.args:
+        try:
+            weights = [float(weight) for weight in request.args["weights"].split(",")]
+        except ValueError:
+            weights = []
+
+    if (
+        len(weights) != len(symbols)
+        or not all(math.isfinite(weight) and weight >= 0 for weight in weights)
+        or sum(weights) == 0
+    ):
         return {
-            "message": f'Incorrect time delta, should be within {", ".join(DELTA_CHOICES)}'
+            "message": "weights should be one non negative number per symbol, not all zero"
         }, 400
 
-    old_data = db.session.get(StockTimeSeries, [symbol, time_delta])
-    if old_data is None:
-        # Data does not exist
-        return {}, 204
-
-    else:
-        # Check if data is fresh enough
-        timezone = old_data.timezone
-        tz = pytz.timezone(timezone)
-        delta_size = int(re.findall("\d+", time_delta)[0])
-        delta_unit = convert_delta_unit[re.findall("\D+", time_delta)[0]]
-
-        if delta_unit == "months":
-            delta_unit = "days"
-            delta_size *= 30
-
-        data_time_delta = datetime.datetime.now(tz=tz) - tz.localize(
-            old_data.timeseries.index[-1]
-        )
-
-        if data_time_delta < datetime.timedelta(**{delta_unit: delta_size}):
-            # if True:
-            # Data is fresh enough
-            logger.warning(
-                f"Last data point is younger than {delta_size} {delta_unit}, no new data available. Last data is {data_time_delta} old."
-            )
-            return {}, 304
-
-        else:
-            # Data is not fresh enough, now check if market is open
-            exchange_data = db.session.get(MarketState, old_data.exchange)
-
-            if not exchange_data:
-                return {"message": f"No market data for {old_data.exchange}"}, 409
-
-            if not exchange_data.isMarketOpen:
-                # Market is close
-
-                if not old_data.marketChecked:
-                    logger.info(
-                        f"{old_data.exchange} is closed, we verify one time for potential new data."
-                    )
-                    # Check at least one time because new data may have arrived
-                    old_data.marketChecked = True
-
-                else:
-                    logger.warning(
-                        f"{old_data.exchange} is closed and verified, no new data available."
-                    )
-                    return {}, 304
-
-            else:
-                old_data.marketChecked = False
-
-            result_from_twelve_data = request_twelvedata_api.get_stock_timeseries(
-                symbol, time_delta, API_KEY
-            )
-            if result_from_twelve_data["status"] == "ok":
-                old_data.timeseries = result_from_twelve_data["data"]
-
-                db.session.commit()
+    try:
+        bounds = read_range_args()
+    except ValueError as e:
+        return {"message": str(e)}, 400
 
-                return {
-                    "message": f"Data successfully updated, use GET /symbols/{symbol}?timeDelta={time_delta}"
-                }, 200
+    weights = [weight / sum(weights) for weight in weights]
+    value, stats = evaluate_portfolio(symbols, weights, time_delta, name, **bounds)
 
-            else:
-                return result_from_twelve_data, 500
+    return {
+        "timeDelta": time_delta,
+        "symbols": symbols,
+        "weights": weights,
+        "timeseries": utils.series_to_apexcharts(
+            value, performance=False, max_points=max_points
+        ),
+        "stats": stats,
+    }, 200
 
 
-@app.route("/market", methods=["GET"])
+@api.route("/market", methods=["GET"])
 def get_market_state():
     """Get the market informations.
 
@@ -651,15 +2725,19 @@ def get_market_state():
         # Data does not exist
         return {}, 204
 
-    market: Dict[str, str | List[List[float | int]]] = markets_schema.dump(data)
-    market = pd.DataFrame(market)
-
-    market = [json.loads(x.to_json()) for x in market.iloc]
+    market: List[Dict[str, str | bool | int | float | None]] = markets_schema.dump(data)
+    for exchange_data in market:
+        # Durations are sent in milliseconds
+        for key in ("timeToOpen", "timeToClose"):
+            duration = exchange_data[key]
+            exchange_data[key] = (
+                None if pd.isna(duration) else duration // pd.Timedelta(milliseconds=1)
+            )
 
     return market, 200
 
 
-@app.route("/market", methods=["POST"])
+@api.route("/market", methods=["POST"])
 def create_market_state():
     """Create the market informations.
 
@@ -672,6 +2750,23 @@ def create_market_state():
             description: The data already exists, you can get it with GET /market.
         201:
             description: The data was successfully created, you can get it with GET /market.
+        429:
+            description: Twelve Data API credits are exhausted, retry after the delay of the Retry-After header.
+            schema:
+                type: object
+                properties:
+                    status:
+                        type: string
+                        description: The status of the request, which will be 'error' in this case.
+                    code:
+                        type: integer
+                        description: The associated error code, 429.
+                    message:
+                        type: string
+                        description: The error message associated.
+                    retryAfter:
+                        type: number
+                        description: The estimated wait in seconds before the request can succeed.
         500:
             description: An error happened server-side.
             schema:
@@ -696,7 +2791,9 @@ def create_market_state():
         return {"message": f"Data already exists, use GET /market"}, 200
 
     else:
-        result_from_twelve_data = request_twelvedata_api.get_markets_state(API_KEY)
+        result_from_twelve_data = request_twelvedata_api.get_markets_state(
+            current_app.config["API_KEY"]
+        )
         if result_from_twelve_data["status"] == "ok":
             date_check = datetime.datetime.now(tz=EUROPE_TIMEZONE).timestamp()
             data_market = result_from_twelve_data["data"]
@@ -719,12 +2816,12 @@ def create_market_state():
 
         else:
             # Error
-            return result_from_twelve_data, 500
+            return twelvedata_error_response(result_from_twelve_data)
 
     return {"message": f"Data succesfully created, use GET /market"}, 201
 
 
-@app.route("/market", methods=["PUT"])
+@api.route("/market", methods=["PUT"])
 def update_market_state():
     """Update the market informations.
 
@@ -739,6 +2836,23 @@ def update_market_state():
         204:
             description: The data does not exist in database, you can create it with POST /market.
 
+        429:
+            description: Twelve Data API credits are exhausted, retry after the delay of the Retry-After header.
+            schema:
+                type: object
+                properties:
+                    status:
+                        type: string
+                        description: The status of the request, which will be 'error' in this case.
+                    code:
+                        type: integer
+                        description: The associated error code, 429.
+                    message:
+                        type: string
+                        description: The error message associated.
+                    retryAfter:
+                        type: number
+                        description: The estimated wait in seconds before the request can succeed.
         500:
             description: An error happened server-side.
             schema:
@@ -759,47 +2873,10 @@ def update_market_state():
         # Data does not exist
         return {}, 204
 
-    else:
-        result_from_twelve_data = request_twelvedata_api.get_markets_state(API_KEY)
-        if result_from_twelve_data["status"] == "ok":
-            data_market = result_from_twelve_data["data"]
-
-            date_check = datetime.datetime.now(tz=EUROPE_TIMEZONE).timestamp()
-
-            for data_exchange in data_market.iloc:
-                old_exchange_data = db.session.get(
-                    MarketState, data_exchange["exchange"]
-                )
-                if old_exchange_data is None:
-                    # TODO : adding new data to database through PUT request... Ugly...
-                    # No data for this exchange, lets add it to the database
-                    db.session.add(
-                        MarketState(
-                            exchange=data_exchange["exchange"],
-                            country=data_exchange["country"],
-                            isMarketOpen=data_exchange["isMarketOpen"],
-                            timeToOpen=data_exchange["timeToOpen"],
-                            timeToClose=data_exchange["timeToClose"],
-                            dateCheck=date_check,
-                        )
-                    )
-
-                else:
-                    old_exchange_data.isMarketOpen = data_exchange["isMarketOpen"]
-                    old_exchange_data.timeToOpen = data_exchange["timeToOpen"]
-                    old_exchange_data.timeToClose = data_exchange["timeToClose"]
-                    old_exchange_data.dateCheck = date_check
-
-            db.session.commit()
-
-        else:
-            # Error
-            return result_from_twelve_data, 500
-
-    return {"message": f"Data successfully updated, use GET /market"}, 200
+    return refresh_market_state()
 
 
-@app.route("/symbols-list", methods=["GET"])
+@api.route("/symbols-list", methods=["GET"])
 def get_symbols_list():
     """Get the available symbols.
 
@@ -856,7 +2933,7 @@ def get_symbols_list():
     return symbols_list, 200
 
 
-@app.route("/symbols-list", methods=["POST"])
+@api.route("/symbols-list", methods=["POST"])
 def create_symbols_list():
     """Create the available symbols list.
 
@@ -872,6 +2949,23 @@ def create_symbols_list():
         201:
             description: The data was successfully created, you can get it with GET /symbols-list.
 
+        429:
+            description: Twelve Data API credits are exhausted, retry after the delay of the Retry-After header.
+            schema:
+                type: object
+                properties:
+                    status:
+                        type: string
+                        description: The status of the request, which will be 'error' in this case.
+                    code:
+                        type: integer
+                        description: The associated error code, 429.
+                    message:
+                        type: string
+                        description: The error message associated.
+                    retryAfter:
+                        type: number
+                        description: The estimated wait in seconds before the request can succeed.
         500:
             description: An error happened server-side.
             schema:
@@ -894,7 +2988,7 @@ def create_symbols_list():
 
     else:
         result_from_twelve_data = request_twelvedata_api.get_available_symbols_list(
-            API_KEY, API_PLAN
+            current_app.config["API_KEY"], current_app.config["API_PLAN"]
         )
 
         if result_from_twelve_data["status"] == "ok":
@@ -913,12 +3007,12 @@ def create_symbols_list():
 
         else:
             # Error
-            return result_from_twelve_data, 500
+            return twelvedata_error_response(result_from_twelve_data)
 
     return {"message": f"Data successfully created, use GET /symbols-list"}, 201
 
 
-@app.route("/symbols-list", methods=["PUT"])
+@api.route("/symbols-list", methods=["PUT"])
 def update_symbols_list():
     """Update the available symbols list.
 
@@ -933,6 +3027,23 @@ def update_symbols_list():
         204:
             description: The data does not exist in database, you can create it with POST /symbols-list.
 
+        429:
+            description: Twelve Data API credits are exhausted, retry after the delay of the Retry-After header.
+            schema:
+                type: object
+                properties:
+                    status:
+                        type: string
+                        description: The status of the request, which will be 'error' in this case.
+                    code:
+                        type: integer
+                        description: The associated error code, 429.
+                    message:
+                        type: string
+                        description: The error message associated.
+                    retryAfter:
+                        type: number
+                        description: The estimated wait in seconds before the request can succeed.
         500:
             description: An error happened server-side.
             schema:
@@ -970,7 +3081,7 @@ def update_symbols_list():
 
     else:
         result_from_twelve_data = request_twelvedata_api.get_available_symbols_list(
-            API_KEY, API_PLAN
+            current_app.config["API_KEY"], current_app.config["API_PLAN"]
         )
 
         if result_from_twelve_data["status"] == "ok":
@@ -996,30 +3107,153 @@ def update_symbols_list():
 
         else:
             # Error
-            return result_from_twelve_data, 500
+            return twelvedata_error_response(result_from_twelve_data)
 
     return {}, 200
 
 
-@app.route("/spec")
+@api.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Get the monitoring metrics.
+
+    Get usage statistics of the backend.
+    ---
+    tags:
+        - MONITORING
+    responses:
+        200:
+            description: Request successful, returning the metrics.
+            schema:
+                type: object
+                properties:
+                    httpClient:
+                        type: object
+                        description: Requests, retries and errors of the Twelve Data API client and the state of its connection pools.
+                    asyncHttpClient:
+                        type: object
+                        description: Requests, retries, errors and requests in flight of the Twelve Data API client of the background refreshes.
+                    responseCache:
+                        type: object
+                        description: Fresh and stale hits, misses, revalidations and stores of the on-disk cache of Twelve Data API responses.
+                    creditScheduler:
+                        type: object
+                        description: API credits available, and requests queued, granted and rejected by the credit scheduler.
+                    refreshScheduler:
+                        type: object
+                        description: Runs, failures, duration and lag of each background refresh job.
+                    singleFlight:
+                        type: object
+                        description: Calls, runs and shared runs of the fetches of symbols from Twelve Data API.
+                    statsCache:
+                        type: object
+                        description: Entries, memory, hits, misses and evictions of the stats informations cache.
+                    analyticsCache:
+                        type: object
+                        description: Entries, memory, hits, misses and evictions of the rolling analytics cache.
+                    correlationCache:
+                        type: object
+                        description: Entries, memory, hits, misses and evictions of the correlation matrices cache.
+                    portfolioCache:
+                        type: object
+                        description: Entries, memory, hits, misses and evictions of the portfolio values cache.
+    """
+    return {
+        "httpClient": request_twelvedata_api.get_http_client().pool_stats(),
+        "asyncHttpClient": async_twelvedata_api.stats(),
+        "responseCache": request_twelvedata_api.get_response_cache().stats(),
+        "creditScheduler": request_twelvedata_api.get_credit_scheduler().stats(),
+        "refreshScheduler": refresh_scheduler.stats(),
+        "singleFlight": symbol_flights.stats(),
+        "statsCache": stats_cache.stats(),
+        "analyticsCache": analytics_cache.stats(),
+        "correlationCache": correlation_cache.stats(),
+        "portfolioCache": portfolio_cache.stats(),
+    }, 200
+
+
+@api.route("/spec")
 def spec():
-    swag = swagger(app)
+    swag = swagger(current_app)
     swag["info"]["version"] = "1.0"
     swag["info"]["title"] = "Full Stocks backend"
 
     return json.dumps(swag)
 
 
+# =================================================================================================
+#     App factory
+# =================================================================================================
+
+SWAGGER_URL = "/api/docs"
+API_URL = "/spec"
+
+
+def create_app(config: Dict | None = None) -> Flask:
+    """Create the Flask app.
+
+    Logging is configured, the database initialized and the routes
+    registered when the app is created rather than when this module is
+    imported, so that workers and tests only pay for the apps they use.
+
+    Parameters
+    ----------
+    config : Dict | None, optional
+        Overrides of the configuration, e.g. SQLALCHEMY_DATABASE_URI,
+        API_KEY or LOG_CONFIG_FILE (None to keep the logging
+        configuration), by default None.
+
+    Returns
+    -------
+    Flask
+        The app, with an initialized database.
+    """
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.config.from_object(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(
+        basedir, "db.sqlite"
+    )
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config.from_mapping(config or {})
+
+    if app.config["LOG_CONFIG_FILE"] is not None:
+        logging.config.fileConfig(os.path.join(basedir, app.config["LOG_CONFIG_FILE"]))
+        logger.info("Logger initialized.")
+
+    request_twelvedata_api.configure_credit_scheduler(app.config["API_PLAN"])
+
+    # enable CORS
+    CORS(
+        app,
+        resources={
+            r"/symbols/*": {"origins": app.config["FRONTEND_URL"]},
+            r"/market": {"origins": app.config["FRONTEND_URL"]},
+            r"/portfolio": {"origins": app.config["FRONTEND_URL"]},
+        },
+    )
+
+    db.init_app(app)
+    ma.init_app(app)
+    with app.app_context():
+        init_db()
+
+    app.register_blueprint(api)
+    app.register_blueprint(
+        get_swaggerui_blueprint(SWAGGER_URL, API_URL), url_prefix=SWAGGER_URL
+    )
+    logger.info("Backend server initialized.")
+
+    return app
+
+
 # Start the app
 if __name__ == "__main__":
     # Production server
-
-    SWAGGER_URL = "/api/docs"
-    API_URL = "/spec"
-    swaggerui_blueprint = get_swaggerui_blueprint(SWAGGER_URL, API_URL)
-
     from waitress import serve
 
-    app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
+    app = create_app()
+
+    # GET requests only read the database, which is kept fresh in the background
+    start_refresh_scheduler(app)
 
     serve(app, host="0.0.0.0", port=5000)
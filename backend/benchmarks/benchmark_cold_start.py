@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""benchmark_cold_start.py: benchmark
+
+Measures the cold start of a backend worker in fresh interpreters: the
+import of app.py, the creation of the app by create_app on an empty
+database, and its first request.
+
+Run from the backend folder:
+    python benchmarks/benchmark_cold_start.py
+"""
+
+__author__ = "Paul RÉMONDEAU"
+__copyright__ = "Paul RÉMONDEAU"
+__version__ = "1.0.0"
+__maintainer__ = "Paul RÉMONDEAU"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Dev"
+
+# =================================================================================================
+#     Libs
+# =================================================================================================
+
+import os
+import sys
+import json
+import statistics
+import subprocess
+import tempfile
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+
+REPEAT = 5
+
+# Run in a fresh interpreter, so that nothing is imported yet
+WORKER = """
+import json
+import sys
+import time
+
+start = time.perf_counter()
+import app as backend
+
+imported = time.perf_counter()
+app = backend.create_app(
+    {"SQLALCHEMY_DATABASE_URI": "sqlite:///" + sys.argv[1], "LOG_CONFIG_FILE": None}
+)
+created = time.perf_counter()
+assert app.test_client().get("/metrics").status_code == 200
+served = time.perf_counter()
+
+print(
+    json.dumps(
+        {
+            "import": imported - start,
+            "create_app": created - imported,
+            "first request": served - created,
+        }
+    )
+)
+"""
+
+# =================================================================================================
+#     Functions
+# =================================================================================================
+
+
+def measure_cold_start() -> dict:
+    """Start a worker on an empty database and give the duration of each step."""
+    with tempfile.TemporaryDirectory() as directory:
+        output = subprocess.run(
+            [sys.executable, "-c", WORKER, os.path.join(directory, "db.sqlite")],
+            cwd=parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+    return json.loads(output.splitlines()[-1])
+
+
+# =================================================================================================
+#     Main
+# =================================================================================================
+
+if __name__ == "__main__":
+    runs = [measure_cold_start() for _ in range(REPEAT)]
+
+    for step in runs[0]:
+        durations = [run[step] for run in runs]
+        print(
+            f"{step:>14}: {min(durations) * 1000:8.1f} ms min, "
+            f"{statistics.median(durations) * 1000:8.1f} ms median"
+        )
+
+    total = [sum(run.values()) for run in runs]
+    print(f"{'total':>14}: {min(total) * 1000:8.1f} ms min over {REPEAT} runs")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""benchmark_json_provider.py: benchmark
+
+Compares the encoding time of a GET /symbols payload by src.json_provider.FastJSONProvider
+and the default Flask JSON provider, checking that both decode to the same data.
+
+Run from the backend folder:
+    python benchmarks/benchmark_json_provider.py
+"""
+
+__author__ = "Paul RÉMONDEAU"
+__copyright__ = "Paul RÉMONDEAU"
+__version__ = "1.0.0"
+__maintainer__ = "Paul RÉMONDEAU"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Dev"
+
+# =================================================================================================
+#     Libs
+# =================================================================================================
+
+import os
+import sys
+import json
+import timeit
+
+import numpy as np
+import pandas as pd
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(parent)
+
+from src.json_provider import FastJSONProvider
+from src.utils import series_to_apexcharts
+
+POINTS = 5000
+SYMBOLS = 50
+REPEAT = 5
+
+# =================================================================================================
+#     Functions
+# =================================================================================================
+
+
+def make_payload(rng):
+    """Build a GET /symbols payload of random timeseries."""
+    index = pd.date_range("2005-01-03", periods=POINTS, freq="D")
+    all_timeseries = []
+    stats_table = []
+    for i in range(SYMBOLS):
+        prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, POINTS)))
+        timeseries = pd.Series(prices, index=index)
+
+        all_timeseries.append(
+            {
+                "symbol": f"SYM{i}",
+                "timeDelta": "1day",
+                "exchange": "NASDAQ",
+                "timezone": "America/New_York",
+                "marketChecked": False,
+                "timeseries": series_to_apexcharts(timeseries),
+            }
+        )
+        stats_table.append(
+            {
+                "symbol": f"SYM{i}",
+                "cumulativeReturn": prices[-1] / prices[0] - 1,
+                "annualizedCumulativeReturn": rng.normal(0, 0.1),
+                "annualizedVolatility": rng.uniform(0, 0.5),
+            }
+        )
+
+    return {"timeseries": all_timeseries, "stats": stats_table}
+
+
+# =================================================================================================
+#     Main
+# =================================================================================================
+
+if __name__ == "__main__":
+    app = Flask(__name__)
+    payload = make_payload(np.random.default_rng(0))
+
+    providers = [
+        ("default", DefaultJSONProvider(app)),
+        ("fast", FastJSONProvider(app)),
+    ]
+
+    with app.test_request_context():
+        outputs = [provider.response(payload).data for _, provider in providers]
+        assert json.loads(outputs[0]) == json.loads(outputs[1])
+        print(
+            f"Decoded outputs are identical, bytes are {'' if outputs[0] == outputs[1] else 'not '}identical."
+        )
+
+        for name, provider in providers:
+            duration = min(
+                timeit.repeat(
+                    lambda: provider.response(payload), number=1, repeat=REPEAT
+                )
+            )
+            print(
+                f"{name:>7}: {duration * 1000:8.1f} ms for {SYMBOLS} x {POINTS} points"
+            )
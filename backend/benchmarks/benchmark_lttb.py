@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""benchmark_lttb.py: benchmark
+
+Compares the size and the time to build the chart payload of a series with
+and without LTTB downsampling in src.utils.series_to_apexcharts.
+
+Run from the backend folder:
+    python benchmarks/benchmark_lttb.py
+"""
+
+__author__ = "Paul RÉMONDEAU"
+__copyright__ = "Paul RÉMONDEAU"
+__version__ = "1.0.0"
+__maintainer__ = "Paul RÉMONDEAU"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Dev"
+
+# =================================================================================================
+#     Libs
+# =================================================================================================
+
+import os
+import sys
+import json
+import timeit
+
+import numpy as np
+import pandas as pd
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(parent)
+
+from src.utils import series_to_apexcharts
+
+SIZES = [5_000, 100_000, 1_000_000]
+MAX_POINTS = 500
+REPEAT = 3
+
+# =================================================================================================
+#     Functions
+# =================================================================================================
+
+
+def make_series(rng, points):
+    index = pd.date_range("2005-01-03 09:30", periods=points, freq="min")
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, points)))
+    return pd.Series(prices, index=index)
+
+
+def measure(timeseries, max_points):
+    duration = min(
+        timeit.repeat(
+            lambda: series_to_apexcharts(timeseries, True, max_points),
+            number=1,
+            repeat=REPEAT,
+        )
+    )
+    size = len(json.dumps(series_to_apexcharts(timeseries, True, max_points)))
+    return duration, size
+
+
+# =================================================================================================
+#     Main
+# =================================================================================================
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+
+    for points in SIZES:
+        timeseries = make_series(rng, points)
+        for name, max_points in [("full", None), (f"{MAX_POINTS} points", MAX_POINTS)]:
+            duration, size = measure(timeseries, max_points)
+            print(
+                f"{points:>9} points, {name:>10}: {duration * 1000:8.1f} ms,"
+                f" {size / 1024:9.1f} KiB"
+            )
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""benchmark_parse_stock_timeseries.py: benchmark
+
+Compares the parsing of a Twelve Data API time series of 5000 bars, from
+the raw response bytes to the DataFrame, with its former row by row
+implementation, checking that both give the same DataFrame.
+
+Run from the backend folder:
+    python benchmarks/benchmark_parse_stock_timeseries.py
+"""
+
+__author__ = "Paul RÉMONDEAU"
+__copyright__ = "Paul RÉMONDEAU"
+__version__ = "1.0.0"
+__maintainer__ = "Paul RÉMONDEAU"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Dev"
+
+# =================================================================================================
+#     Libs
+# =================================================================================================
+
+import os
+import sys
+import json
+import timeit
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import requests
+from typeguard import check_type
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(parent)
+
+from src.request_twelvedata_api import (
+    check_twelvedata_api_response,
+    load_twelvedata_api_config,
+    parse_stock_timeseries,
+)
+
+BARS = 5000
+REPEAT = 20
+
+META = {
+    "symbol": "AAPL",
+    "interval": "1min",
+    "currency": "USD",
+    "exchange_timezone": "America/New_York",
+    "exchange": "NASDAQ",
+    "mic_code": "XNAS",
+    "type": "Common Stock",
+}
+
+# =================================================================================================
+#     Functions
+# =================================================================================================
+
+
+def former_parse_stock_timeseries(response: requests.Response) -> pd.DataFrame:
+    """Implementation of the parsing before the columnar parser."""
+    response_json = response.json()
+    config = load_twelvedata_api_config()
+
+    meta = check_type(response_json["meta"], Dict[str, str])
+    values = check_type(response_json["values"], List[Dict[str, str]])
+
+    assert set(meta.keys()) == set(config["timeseries_meta_keys"])
+    assert values
+
+    values_keys = [x.keys() for x in response_json["values"]]
+    assert all(x == values_keys[0] for x in values_keys)
+    assert set(values_keys[0]) == config["timeseries_values_keys"]
+
+    df = pd.DataFrame(response_json["values"])
+    df = df.astype(
+        {
+            "open": "float64",
+            "high": "float64",
+            "low": "float64",
+            "close": "float64",
+            "volume": "int64",
+        }
+    )
+    df["datetime"] = pd.to_datetime(df["datetime"])
+    df = df.set_index("datetime").sort_index()
+
+    return df[["open", "high", "low", "close", "volume"]]
+
+
+def parse(response: requests.Response) -> pd.DataFrame:
+    return parse_stock_timeseries(check_twelvedata_api_response(response))["data"]
+
+
+def make_response(rng: np.random.Generator, bars: int) -> requests.Response:
+    """Build a response of Twelve Data API with bars of one minute."""
+    index = pd.date_range("2023-06-12 15:59", periods=bars, freq="-1min")
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, bars)))
+    values = [
+        {
+            "datetime": date.strftime("%Y-%m-%d %H:%M:%S"),
+            "open": f"{price:.5f}",
+            "high": f"{price * 1.001:.5f}",
+            "low": f"{price * 0.999:.5f}",
+            "close": f"{price:.5f}",
+            "volume": str(int(volume)),
+        }
+        for date, price, volume in zip(index, prices, rng.integers(0, 10**6, bars))
+    ]
+
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(
+        {"meta": META, "values": values, "status": "ok"}
+    ).encode()
+
+    return response
+
+
+# =================================================================================================
+#     Main
+# =================================================================================================
+
+if __name__ == "__main__":
+    response = make_response(np.random.default_rng(0), BARS)
+
+    assert parse(response).equals(former_parse_stock_timeseries(response))
+    print("Outputs are identical.")
+
+    for name, function in [
+        ("former", former_parse_stock_timeseries),
+        ("columnar", parse),
+    ]:
+        duration = min(
+            timeit.repeat(lambda: function(response), number=1, repeat=REPEAT)
+        )
+        print(f"{name:>10}: {duration * 1000:8.2f} ms for {BARS} bars")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""benchmark_series_to_apexcharts.py: benchmark
+
+Compares src.utils.series_to_apexcharts with its former per point implementation,
+checking that both give the same output.
+
+Run from the backend folder:
+    python benchmarks/benchmark_series_to_apexcharts.py
+"""
+
+__author__ = "Paul RÉMONDEAU"
+__copyright__ = "Paul RÉMONDEAU"
+__version__ = "1.0.0"
+__maintainer__ = "Paul RÉMONDEAU"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Dev"
+
+# =================================================================================================
+#     Libs
+# =================================================================================================
+
+import os
+import sys
+import math
+import timeit
+from copy import deepcopy
+
+import numpy as np
+import pandas as pd
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(parent)
+
+from src.utils import series_to_apexcharts
+
+POINTS = 5000
+SYMBOLS = 50
+REPEAT = 5
+
+# =================================================================================================
+#     Functions
+# =================================================================================================
+
+
+def former_series_to_apexcharts(timeseries, performance=True):
+    """Implementation of series_to_apexcharts before vectorization."""
+    result = deepcopy(timeseries)
+
+    if timeseries is None:
+        result = []
+
+    else:
+        result = [
+            [
+                int(index.timestamp() * 1000),
+                (
+                    float(f"{value / result.iloc[0] * 100:.2f}")
+                    if performance
+                    else float(f"{value:.2f}")
+                ),
+            ]
+            for index, value in result.items()
+        ]
+
+    return result
+
+
+def identical(result, expected):
+    """Compare the outputs bit by bit, NaN included."""
+    if len(result) != len(expected):
+        return False
+
+    for (epoch, value), (expected_epoch, expected_value) in zip(result, expected):
+        if type(epoch) is not type(expected_epoch) or epoch != expected_epoch:
+            return False
+
+        if type(value) is not type(expected_value):
+            return False
+
+        if math.isnan(expected_value):
+            if not math.isnan(value):
+                return False
+
+        elif value != expected_value or math.copysign(1, value) != math.copysign(
+            1, expected_value
+        ):
+            return False
+
+    return True
+
+
+def make_series(rng, points):
+    index = pd.date_range("2005-01-03 09:30", periods=points, freq="min")
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, points)))
+    return pd.Series(prices, index=index)
+
+
+def check_identical(rng):
+    series_list = [make_series(rng, POINTS) for _ in range(SYMBOLS)]
+
+    # Values on a half cent, the hard case for rounding
+    index = pd.date_range("2023-01-02", periods=2000, freq="D")
+    halves = pd.Series(np.arange(2000) / 200 + 0.005, index=index)
+    halves.iloc[[3, 7]] = np.nan
+    series_list.append(halves)
+    series_list.append(-halves)
+
+    # Timestamps with milliseconds
+    series_list.append(
+        pd.Series(
+            rng.normal(0, 1, 100), index=pd.date_range("2023", periods=100, freq="1ms")
+        )
+    )
+
+    for timeseries in series_list:
+        for performance in (True, False):
+            assert identical(
+                series_to_apexcharts(timeseries, performance),
+                former_series_to_apexcharts(timeseries, performance),
+            )
+
+    return series_list[:SYMBOLS]
+
+
+# =================================================================================================
+#     Main
+# =================================================================================================
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    series_list = check_identical(rng)
+    print("Outputs are identical.")
+
+    for name, function in [
+        ("former", former_series_to_apexcharts),
+        ("vectorized", series_to_apexcharts),
+    ]:
+        duration = min(
+            timeit.repeat(
+                lambda: [function(timeseries, True) for timeseries in series_list],
+                number=1,
+                repeat=REPEAT,
+            )
+        )
+        print(f"{name:>10}: {duration * 1000:8.1f} ms for {SYMBOLS} x {POINTS} points")
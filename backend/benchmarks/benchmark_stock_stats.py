@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""benchmark_stock_stats.py: benchmark
+
+Compares src.stock_stats.evaluate_stats_information_batch, alignment of the
+series included, with a loop over src.stock_stats.evaluate_stats_information,
+checking that both give the same output.
+
+Run from the backend folder:
+    python benchmarks/benchmark_stock_stats.py
+"""
+
+__author__ = "Paul RÉMONDEAU"
+__copyright__ = "Paul RÉMONDEAU"
+__version__ = "1.0.0"
+__maintainer__ = "Paul RÉMONDEAU"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Dev"
+
+# =================================================================================================
+#     Libs
+# =================================================================================================
+
+import os
+import sys
+import math
+import timeit
+
+import numpy as np
+import pandas as pd
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(parent)
+
+from src.stock_stats import (
+    align_series,
+    evaluate_stats_information,
+    evaluate_stats_information_batch,
+)
+
+SYMBOLS = [10, 100, 1000]
+POINTS = 5 * 252
+REPEAT = 3
+
+# =================================================================================================
+#     Functions
+# =================================================================================================
+
+
+def identical(result, expected):
+    """Compare the stats dicts, NaN included."""
+    if list(result) != list(expected):
+        return False
+
+    for key, expected_value in expected.items():
+        value = result[key]
+        if type(value) is not type(expected_value):
+            return False
+
+        if isinstance(value, float) and math.isnan(expected_value):
+            if not math.isnan(value):
+                return False
+
+        elif value != expected_value:
+            return False
+
+    return True
+
+
+def make_series(rng, symbol):
+    # Series of different lengths, starting on different dates
+    points = int(rng.integers(1, POINTS))
+    start = pd.Timestamp("2016-02-29") + pd.Timedelta(days=int(rng.integers(0, 400)))
+    index = pd.bdate_range(start, periods=points)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, points)))
+    return pd.Series(prices, index=index, name=symbol)
+
+
+def loop_stats(series_list):
+    return [
+        evaluate_stats_information(timeseries, timeseries.name)
+        for timeseries in series_list
+    ]
+
+
+def batch_stats(series_list):
+    return evaluate_stats_information_batch(
+        align_series({timeseries.name: timeseries for timeseries in series_list})
+    )
+
+
+# =================================================================================================
+#     Main
+# =================================================================================================
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+
+    for n_symbols in SYMBOLS:
+        series_list = [make_series(rng, f"S{i}") for i in range(n_symbols)]
+
+        for result, expected in zip(batch_stats(series_list), loop_stats(series_list)):
+            assert identical(result, expected), (result, expected)
+
+        for name, function in [("loop", loop_stats), ("batch", batch_stats)]:
+            duration = min(
+                timeit.repeat(lambda: function(series_list), number=1, repeat=REPEAT)
+            )
+            print(
+                f"{n_symbols:>5} symbols, {name:>5}: {duration * 1000:8.1f} ms"
+                f" for up to {POINTS} points"
+            )
+
+    print("Outputs are identical.")
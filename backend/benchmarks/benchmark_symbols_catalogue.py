@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""benchmark_symbols_catalogue.py: benchmark
+
+Compares the parsing of a Twelve Data API catalogue of 20000 symbols,
+from the checked response to the symbols of each exchange, with its
+former implementation filtering the rows of one plan, checking that both
+give the same symbols for every plan. Also times a request answered by
+the response cache, whose parsed catalogue is kept in memory.
+
+Run from the backend folder:
+    python benchmarks/benchmark_symbols_catalogue.py
+"""
+
+__author__ = "Paul RÉMONDEAU"
+__copyright__ = "Paul RÉMONDEAU"
+__version__ = "1.0.0"
+__maintainer__ = "Paul RÉMONDEAU"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Dev"
+
+# =================================================================================================
+#     Libs
+# =================================================================================================
+
+import os
+import sys
+import json
+import timeit
+import tempfile
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import requests
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(parent)
+
+from src import request_twelvedata_api
+from src.credit_scheduler import CreditScheduler
+from src.response_cache import ResponseCache
+from src.request_twelvedata_api import (
+    get_available_symbols_list,
+    load_twelvedata_api_config,
+    parse_symbols_catalogue,
+)
+
+SYMBOLS = 20000
+EXCHANGES = 80
+PLANS = ["Basic", "Grow", "Pro", "Ultra", "Enterprise"]
+REPEAT = 20
+
+# =================================================================================================
+#     Functions
+# =================================================================================================
+
+
+def former_parse_available_symbols_list(
+    response_json: Dict[str, str | list], plan: str = "Basic"
+) -> Dict[str, List[str]]:
+    """Implementation of the parsing before the catalogue of all plans."""
+    data = pd.DataFrame(response_json["data"])
+
+    data_plan = data[data["access"].apply(lambda x: x["plan"] == plan)]
+
+    return json.loads(
+        data_plan.groupby("exchange").agg({"symbol": list})["symbol"].to_json()
+    )
+
+
+def make_response_json(rng: np.random.Generator, symbols: int) -> Dict:
+    """Build a response of Twelve Data API /stocks with show_plan."""
+    exchanges = [f"EX{i:02d}" for i in range(EXCHANGES)]
+    data = [
+        {
+            "symbol": f"S{i:05d}",
+            "name": f"Company {i}",
+            "currency": "USD",
+            "exchange": exchanges[exchange],
+            "mic_code": f"X{exchange:03d}",
+            "country": "United States",
+            "type": "Common Stock",
+            "access": {"global": "Level A", "plan": PLANS[plan]},
+        }
+        for i, exchange, plan in zip(
+            range(symbols),
+            rng.integers(0, EXCHANGES, symbols),
+            rng.choice(len(PLANS), symbols, p=[0.4, 0.25, 0.2, 0.1, 0.05]),
+        )
+    ]
+
+    return {"data": data, "status": "ok"}
+
+
+def install_cached_response(response_json: Dict) -> None:
+    """Serve the catalogue from a fresh response cache, without any request."""
+    config = load_twelvedata_api_config()
+    cache = ResponseCache(tempfile.mkdtemp(), {config["symbols_url"]: 86400})
+
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(response_json).encode()
+    cache.put(config["symbols_url"], {"show_plan": True}, response)
+
+    request_twelvedata_api.response_cache = cache
+    request_twelvedata_api.credit_scheduler = CreditScheduler(per_minute=1000)
+
+
+# =================================================================================================
+#     Main
+# =================================================================================================
+
+if __name__ == "__main__":
+    response_json = make_response_json(np.random.default_rng(0), SYMBOLS)
+
+    catalogue = parse_symbols_catalogue(response_json)
+    for plan in PLANS:
+        assert catalogue[plan] == former_parse_available_symbols_list(
+            response_json, plan
+        )
+    print("Outputs are identical.")
+
+    install_cached_response(response_json)
+
+    for name, function in [
+        ("former", lambda: former_parse_available_symbols_list(response_json)),
+        (
+            "former all",
+            lambda: [
+                former_parse_available_symbols_list(response_json, plan)
+                for plan in PLANS
+            ],
+        ),
+        ("grouped", lambda: parse_symbols_catalogue(response_json)),
+        ("cached", lambda: get_available_symbols_list("foo", "Basic")),
+    ]:
+        duration = min(timeit.repeat(function, number=1, repeat=REPEAT))
+        print(f"{name:>10}: {duration * 1000:8.2f} ms for {SYMBOLS} symbols")
@@ -0,0 +1,402 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""async_request_twelvedata_api.py:  class
+
+This module is an asynchronous gate between the Twelve Data API and this app.
+"""
+
+__author__ = "Paul RÉMONDEAU"
+__copyright__ = "Paul RÉMONDEAU"
+__version__ = "1.0.0"
+__maintainer__ = "Paul RÉMONDEAU"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Production"
+__logger__ = "async_request_twelvedata_api.py"
+
+# =================================================================================================
+#     Libs
+# =================================================================================================
+
+import asyncio
+from typing import Callable, Dict, List
+
+import httpx
+import pandas as pd
+
+from .exceptions_twelvedata_api import TwelveDataApiException, handle_exception
+from .credit_scheduler import INTERACTIVE
+from .response_cache import CachedResponse
+from .request_twelvedata_api import (
+    check_twelvedata_api_response,
+    get_credit_scheduler,
+    get_response_cache,
+    load_twelvedata_api_config,
+    parse_markets_state,
+    parse_stock_timeseries,
+    parse_stocks_timeseries,
+    parse_symbols_catalogue,
+    timeseries_params,
+)
+
+import logging
+
+logger = logging.getLogger(__logger__)
+
+# =================================================================================================
+#     Classes
+# =================================================================================================
+
+
+class AsyncTwelveDataApi:
+    """Asynchronous client of Twelve Data API.
+
+    Its methods mirror the functions of request_twelvedata_api, with
+    the same checks, API credits and error results, but the requests
+    of concurrent calls overlap their network waits. At most
+    max_concurrency requests are in flight, the others wait for a slot.
+
+    The HTTP client is configured with the http_client section of the
+    configuration, and created in the running event loop. An instance
+    is meant to be used in one event loop, either as an async context
+    manager or kept for the lifetime of the loop.
+
+    Parameters
+    ----------
+    max_concurrency : int | None, optional
+        The maximum number of requests in flight, by default the
+        pool_maxsize of the configuration.
+
+    Examples
+    ----------
+    >>> async def main():
+    ...     async with AsyncTwelveDataApi() as twelvedata_api:
+    ...         return await asyncio.gather(
+    ...             twelvedata_api.get_stock_timeseries("AAPL", "1day", API_KEY),
+    ...             twelvedata_api.get_markets_state(API_KEY),
+    ...         )
+    >>> stock_timeseries, markets_state = asyncio.run(main())
+    >>> stock_timeseries["status"], markets_state["status"]
+    ('ok', 'ok')
+    """
+
+    def __init__(self, max_concurrency: int | None = None):
+        self.max_concurrency = max_concurrency
+
+        self._client: httpx.AsyncClient | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+        self._requests = 0
+        self._retries = 0
+        self._errors = 0
+        self._in_flight = 0
+        self._max_in_flight = 0
+
+    async def __aenter__(self) -> "AsyncTwelveDataApi":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the connections of the HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+
+        self._client = None
+        self._semaphore = None
+        self._loop = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            config = load_twelvedata_api_config()["http_client"]
+            if self.max_concurrency is None:
+                self.max_concurrency = config["pool_maxsize"]
+
+            limits = httpx.Limits(
+                max_connections=config["pool_maxsize"],
+                max_keepalive_connections=config["pool_maxsize"],
+            )
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(
+                    config["read_timeout"], connect=config["connect_timeout"]
+                ),
+                # Retries the connections only, see _send for the status codes
+                transport=httpx.AsyncHTTPTransport(
+                    limits=limits, retries=config["max_retries"]
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+
+        return self._client
+
+    async def _send(
+        self,
+        url: str,
+        params: Dict,
+        headers: Dict | None,
+        credits: int,
+        priority: int,
+        max_wait: float | None,
+    ) -> httpx.Response:
+        """Send a GET request, retrying on the configured status codes.
+
+        Each attempt waits for the API credits of the request. The backoff
+        between retries is backoff_factor * 2 ** (retry - 1) seconds,
+        unless the response gives a Retry-After delay. A 429 is never
+        retried, as the credits are exhausted.
+
+        Raises
+        ------
+        TwelveDataApiException
+            If the API credits would not be available in time (code 429).
+        httpx.HTTPError
+            If the request could not be completed, e.g. on timeout.
+        """
+        config = load_twelvedata_api_config()["http_client"]
+        client = self._get_client()
+        self._requests += 1
+
+        retry = 0
+        while True:
+            await asyncio.to_thread(
+                get_credit_scheduler().acquire, credits, priority, max_wait
+            )
+
+            try:
+                response = await client.get(url, params=params, headers=headers)
+
+            except httpx.HTTPError as e:
+                logger.error(e)
+                self._errors += 1
+                raise
+
+            if (
+                response.status_code == 429
+                or response.status_code not in config["retry_status_codes"]
+                or retry == config["max_retries"]
+            ):
+                break
+
+            retry += 1
+            self._retries += 1
+
+            backoff = config["backoff_factor"] * 2 ** (retry - 1)
+            try:
+                backoff = float(response.headers.get("Retry-After", backoff))
+
+            except ValueError:
+                pass
+
+            await asyncio.sleep(backoff)
+
+        if retry:
+            logger.warning(f"{url} answered after {retry} retries.")
+
+        return response
+
+    async def send_twelvedata_api_request(
+        self,
+        url: str,
+        params: Dict[str, str],
+        credits: int = 1,
+        priority: int = INTERACTIVE,
+        headers: Dict[str, str] | None = None,
+    ) -> httpx.Response:
+        """Send a request to Twelve Data API.
+
+        See :func:`src.request_twelvedata_api.send_twelvedata_api_request`.
+        The wait for the API credits holds a request slot, so that it
+        does not start more requests than max_concurrency either.
+
+        Parameters
+        ----------
+        url : str
+            The Twelve Data API URL.
+        params : Dict[str, str]
+            The query parameters.
+        credits : int, optional
+            The API credits used by the request, by default 1.
+        priority : int, optional
+            INTERACTIVE or BACKGROUND, by default INTERACTIVE.
+        headers : Dict[str, str] | None, optional
+            The request headers, by default None.
+
+        Returns
+        -------
+        httpx.Response
+            The Twelve Data API response.
+
+        Raises
+        ------
+        TwelveDataApiException
+            If the API credits would not be available in time (code 429),
+            Twelve Data API did not answer in time (code 504)
+            or could not be reached (code 503).
+        """
+        max_wait = (
+            load_twelvedata_api_config()["credit_scheduler"]["interactive_max_wait"]
+            if priority == INTERACTIVE
+            else None
+        )
+        self._get_client()
+
+        async with self._semaphore:
+            self._in_flight += 1
+            self._max_in_flight = max(self._max_in_flight, self._in_flight)
+
+            try:
+                return await self._send(
+                    url, params, headers, credits, priority, max_wait
+                )
+
+            except httpx.TimeoutException:
+                raise TwelveDataApiException(
+                    504, "Twelve Data API did not answer in time"
+                )
+
+            except httpx.HTTPError:
+                raise TwelveDataApiException(
+                    503, "Twelve Data API could not be reached"
+                )
+
+            finally:
+                self._in_flight -= 1
+
+    async def send_cached_twelvedata_api_request(
+        self,
+        url: str,
+        params: Dict[str, str],
+        parse: Callable[[Dict[str, str | list]], Dict],
+        priority: int = INTERACTIVE,
+    ) -> Dict:
+        """Send a request to Twelve Data API through the response cache, and parse it.
+
+        See :func:`src.request_twelvedata_api.send_cached_twelvedata_api_request`.
+        The cache files are read and written in a thread, not to block
+        the event loop.
+        """
+        cache = get_response_cache()
+
+        def parse_response(response: CachedResponse | httpx.Response) -> Dict:
+            return parse(check_twelvedata_api_response(response))
+
+        cached = await asyncio.to_thread(cache.get, url, params)
+        if cached is not None and cached.fresh:
+            return cache.parse(url, params, cached, parse_response)
+
+        response = await self.send_twelvedata_api_request(
+            url, params, priority=priority, headers=cache.revalidation_headers(cached)
+        )
+        if response.status_code == 304 and cached is not None:
+            cached = await asyncio.to_thread(cache.revalidate, url, params, cached)
+            return cache.parse(url, params, cached, parse_response)
+
+        result = parse_response(response)
+        await asyncio.to_thread(cache.put, url, params, response, result)
+
+        return result
+
+    @handle_exception
+    async def get_stock_timeseries(
+        self,
+        symbol: str,
+        time_delta: str,
+        api_key: str,
+        start_date: str | None = None,
+        priority: int = INTERACTIVE,
+    ) -> Dict[str, str | int | pd.DataFrame]:
+        """Request the twelve data API for stock informations.
+
+        See :func:`src.request_twelvedata_api.get_stock_timeseries`.
+        """
+        params = timeseries_params([symbol], time_delta, api_key, start_date)
+        response = await self.send_twelvedata_api_request(
+            load_twelvedata_api_config()["timeseries_url"], params, priority=priority
+        )
+
+        response_json = check_twelvedata_api_response(response)
+
+        return parse_stock_timeseries(response_json)
+
+    @handle_exception
+    async def get_stocks_timeseries(
+        self,
+        symbols: List[str],
+        time_delta: str,
+        api_key: str,
+        start_date: str | None = None,
+        priority: int = INTERACTIVE,
+    ) -> Dict[str, str | int | Dict[str, Dict[str, str | int | pd.DataFrame]]]:
+        """Request the twelve data API for several stocks at once.
+
+        See :func:`src.request_twelvedata_api.get_stocks_timeseries`.
+        """
+        params = timeseries_params(symbols, time_delta, api_key, start_date)
+        response = await self.send_twelvedata_api_request(
+            load_twelvedata_api_config()["timeseries_url"],
+            params,
+            credits=len(symbols),
+            priority=priority,
+        )
+
+        response_json = check_twelvedata_api_response(response)
+
+        return parse_stocks_timeseries(response_json, symbols)
+
+    @handle_exception
+    async def get_markets_state(
+        self, api_key: str, priority: int = INTERACTIVE
+    ) -> Dict[str, str | int | pd.DataFrame]:
+        """Retrieves market state from Twelve Data API.
+
+        See :func:`src.request_twelvedata_api.get_markets_state`.
+        """
+        params = {"apikey": api_key}
+
+        return await self.send_cached_twelvedata_api_request(
+            load_twelvedata_api_config()["market_url"],
+            params,
+            parse_markets_state,
+            priority=priority,
+        )
+
+    @handle_exception
+    async def get_available_symbols_list(
+        self, api_key: str, plan: str = "Basic", priority: int = INTERACTIVE
+    ) -> Dict[str, str | Dict[str, List[str]]]:
+        """Retrieves available symbol.
+
+        See :func:`src.request_twelvedata_api.get_available_symbols_list`.
+        """
+        params = {"apikey": api_key, "show_plan": True}
+
+        catalogue = await self.send_cached_twelvedata_api_request(
+            load_twelvedata_api_config()["symbols_url"],
+            params,
+            parse_symbols_catalogue,
+            priority=priority,
+        )
+
+        return {"status": "ok", "data": catalogue.get(plan, {})}
+
+    def stats(self) -> Dict[str, int | None]:
+        """Give usage statistics of the client.
+
+        Returns
+        -------
+        Dict[str, int | None]
+            The number of requests sent, retries and errors, the requests
+            in flight, the most requests in flight at once and their limit.
+        """
+        return {
+            "requests": self._requests,
+            "retries": self._retries,
+            "errors": self._errors,
+            "inFlight": self._in_flight,
+            "maxInFlight": self._max_in_flight,
+            "maxConcurrency": self.max_concurrency,
+        }
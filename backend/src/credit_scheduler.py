@@ -0,0 +1,320 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""credit_scheduler.py:  class
+
+This module schedules the requests to the Twelve Data API according to the API credits of the plan.
+"""
+
+__author__ = "Paul RÉMONDEAU"
+__copyright__ = "Paul RÉMONDEAU"
+__version__ = "1.0.0"
+__maintainer__ = "Paul RÉMONDEAU"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Production"
+__logger__ = "credit_scheduler.py"
+
+# =================================================================================================
+#     Libs
+# =================================================================================================
+
+import math
+import time
+import heapq
+import itertools
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, List, Tuple
+
+from .exceptions_twelvedata_api import TwelveDataApiException
+
+import logging
+
+logger = logging.getLogger(__logger__)
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# =================================================================================================
+#     Classes
+# =================================================================================================
+
+
+class SlidingWindow:
+    """Credits granted over the last period, at most capacity.
+
+    Twelve Data API counts the credits of each minute, so the credits
+    granted in any period are limited, rather than refilled
+    continuously: credits are available again once the period of
+    their grant is over.
+
+    Parameters
+    ----------
+    capacity : int
+        The number of credits available over a period.
+    period : float
+        The period in seconds.
+    now : float
+        The current time in seconds.
+
+    Examples
+    ----------
+    >>> window = SlidingWindow(capacity=8, period=60, now=0)
+    >>> window.consume(8, now=0)
+    >>> window.wait_time(1)
+    60.0
+    >>> window.refill(now=60)
+    >>> window.tokens
+    8
+    """
+
+    def __init__(self, capacity: int, period: float, now: float):
+        self.capacity = capacity
+        self.period = period
+        self.updated = now
+
+        # Time and credits of the grants of the last period, oldest first
+        self._grants: Deque[Tuple[float, int]] = deque()
+        self._used = 0
+
+    @property
+    def tokens(self) -> int:
+        return self.capacity - self._used
+
+    def refill(self, now: float) -> None:
+        while self._grants and self._grants[0][0] <= now - self.period:
+            self._used -= self._grants.popleft()[1]
+
+        self.updated = now
+
+    def wait_time(self, tokens: int) -> float:
+        # Credits beyond the capacity wait for as many whole periods
+        periods, tokens = divmod(max(tokens, 1) - 1, self.capacity)
+        tokens += 1
+
+        available = self.tokens
+        wait = 0.0
+        for granted_at, credits in self._grants:
+            if available >= tokens:
+                break
+
+            available += credits
+            wait = granted_at + self.period - self.updated
+
+        return float(max(0.0, wait) + periods * self.period)
+
+    def consume(self, tokens: int, now: float) -> None:
+        self._grants.append((now, tokens))
+        self._used += tokens
+
+
+class CreditScheduler:
+    """Queue of the requests waiting for Twelve Data API credits.
+
+    The credits are tracked with one sliding window of a minute and,
+    if the plan has one, one of a day. Requests are granted credits
+    by priority (the lowest value first), then in arrival order, so
+    interactive requests jump ahead of background ones.
+
+    Parameters
+    ----------
+    per_minute : int
+        The API credits per minute of the plan.
+    per_day : int | None, optional
+        The API credits per day of the plan, by default None (no limit).
+    clock : Callable[[], float], optional
+        The clock in seconds, by default time.monotonic.
+
+    Examples
+    ----------
+    >>> scheduler = CreditScheduler(per_minute=8, per_day=800)
+    >>> scheduler.acquire(credits=8) < 1
+    True
+    >>> try:
+    ...     scheduler.acquire(credits=1, max_wait=5)
+    ... except TwelveDataApiException as e:
+    ...     print(e.code, e.message)
+    429 Twelve Data API credits are exhausted, retry in 60 seconds.
+    """
+
+    def __init__(
+        self,
+        per_minute: int,
+        per_day: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.clock = clock
+
+        now = self.clock()
+        self.windows = [SlidingWindow(per_minute, 60, now)]
+        if per_day is not None:
+            self.windows.append(SlidingWindow(per_day, 24 * 60 * 60, now))
+
+        self.max_credits = min(window.capacity for window in self.windows)
+
+        self._condition = threading.Condition()
+        self._queue: List[Tuple[int, int, int]] = []
+        self._sequence = itertools.count()
+
+        self._granted = 0
+        self._rejected = 0
+        self._wait_time = 0.0
+
+    def _refill(self) -> None:
+        now = self.clock()
+        for window in self.windows:
+            window.refill(now)
+
+    def _estimate_wait(self, credits: int, priority: int) -> float:
+        # Credits of the requests that will be served first
+        queued_credits = sum(
+            queued_credits
+            for queued_priority, _, queued_credits in self._queue
+            if queued_priority <= priority
+        )
+        return max(
+            window.wait_time(queued_credits + credits) for window in self.windows
+        )
+
+    def estimate_wait(self, credits: int = 1, priority: int = BACKGROUND) -> float:
+        """Estimate the time before credits would be granted.
+
+        Parameters
+        ----------
+        credits : int, optional
+            The credits needed, by default 1.
+        priority : int, optional
+            The request priority, by default BACKGROUND.
+
+        Returns
+        -------
+        float
+            The estimated wait in seconds.
+        """
+        with self._condition:
+            self._refill()
+            return self._estimate_wait(credits, priority)
+
+    def acquire(
+        self,
+        credits: int = 1,
+        priority: int = INTERACTIVE,
+        max_wait: float | None = None,
+    ) -> float:
+        """Wait until the credits for a request are granted.
+
+        Parameters
+        ----------
+        credits : int, optional
+            The credits needed by the request, by default 1.
+        priority : int, optional
+            INTERACTIVE or BACKGROUND, by default INTERACTIVE.
+        max_wait : float | None, optional
+            The longest acceptable wait in seconds, by default None (no limit).
+
+        Returns
+        -------
+        float
+            The time waited in seconds.
+
+        Raises
+        ------
+        TwelveDataApiException
+            With code 429 if the credits can not be granted within max_wait,
+            and the estimated wait as retry_after.
+        """
+        if credits > self.max_credits:
+            raise TwelveDataApiException(
+                429,
+                f"{credits} credits exceed the {self.max_credits} credits per minute of the plan.",
+            )
+
+        with self._condition:
+            self._refill()
+            wait = self._estimate_wait(credits, priority)
+            if max_wait is not None and wait > max_wait:
+                self._rejected += 1
+                raise TwelveDataApiException(
+                    429,
+                    f"Twelve Data API credits are exhausted, retry in {math.ceil(wait)} seconds.",
+                    retry_after=round(wait, 2),
+                )
+
+            entry = (priority, next(self._sequence), credits)
+            heapq.heappush(self._queue, entry)
+            start = self.clock()
+
+            try:
+                while True:
+                    self._refill()
+                    if self._queue[0] is entry:
+                        wait = max(window.wait_time(credits) for window in self.windows)
+                        if wait <= 0:
+                            break
+
+                    else:
+                        # Woken up when the requests ahead are granted
+                        wait = None
+
+                    self._condition.wait(timeout=wait)
+
+            except BaseException:
+                # Do not block the requests behind
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self._condition.notify_all()
+                raise
+
+            heapq.heappop(self._queue)
+            now = self.clock()
+            for window in self.windows:
+                window.consume(credits, now)
+
+            waited = self.clock() - start
+            self._granted += 1
+            self._wait_time += waited
+            self._condition.notify_all()
+
+        if waited > 0:
+            logger.info(f"Waited {waited:.2f} seconds for {credits} API credits.")
+
+        return waited
+
+    def drain(self) -> None:
+        """Empty the credits of the current minute.
+
+        To be called when Twelve Data API answers that the credits are
+        exhausted although the scheduler still had some, e.g. because
+        the API key is also used somewhere else.
+        """
+        with self._condition:
+            self._refill()
+            minute = self.windows[0]
+            if minute.tokens > 0:
+                minute.consume(minute.tokens, self.clock())
+
+    def stats(self) -> Dict[str, int | float | List[Dict[str, float]]]:
+        """Give the state of the scheduler.
+
+        Returns
+        -------
+        Dict[str, int | float | List[Dict[str, float]]]
+            The credits available per window, the number of queued,
+            granted and rejected requests, and the total wait time.
+        """
+        with self._condition:
+            self._refill()
+            return {
+                "windows": [
+                    {
+                        "period": window.period,
+                        "capacity": window.capacity,
+                        "available": window.tokens,
+                    }
+                    for window in self.windows
+                ],
+                "queued": len(self._queue),
+                "granted": self._granted,
+                "rejected": self._rejected,
+                "waitTime": round(self._wait_time, 2),
+            }
@@ -19,6 +19,9 @@ __logger__ = "exceptions_twelvedata_api.py"
 # =================================================================================================
 
 import functools
+import inspect
+
+from typing import Dict
 
 from typeguard import TypeCheckError
 
@@ -34,6 +37,9 @@ logger = logging.getLogger(__logger__)
 class TwelveDataApiException(Exception):
     """Exception class for issues coming from Twelve Data API.
 
+    If the request can be retried later, retry_after gives the
+    estimated wait in seconds.
+
     Examples
     ----------
     >>> try:
@@ -44,9 +50,10 @@ class TwelveDataApiException(Exception):
 
     """
 
-    def __init__(self, code, message):
+    def __init__(self, code, message, retry_after=None):
         self.code = code
         self.message = message
+        self.retry_after = retry_after
 
 
 def handle_exception(func):
@@ -73,23 +80,73 @@ def handle_exception(func):
     {'status': 'error', 'code': 500, 'message': 'Erreur'}
     >>> foo(raise_exception=False)
     'Nothing happened'
+
+    If the exception gives a retry delay, it is returned as well :
+
+    >>> @handle_exception
+    ... def bar():
+    ...     raise TwelveDataApiException(429, "Erreur", retry_after=7.5)
+    >>> bar()
+    {'status': 'error', 'code': 429, 'message': 'Erreur', 'retryAfter': 7.5}
+
+    Coroutine functions are wrapped in a coroutine function :
+
+    >>> import asyncio
+    >>> @handle_exception
+    ... async def baz():
+    ...     raise TwelveDataApiException(503, "Erreur")
+    >>> asyncio.run(baz())
+    {'status': 'error', 'code': 503, 'message': 'Erreur'}
     """
 
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+
+            except (TwelveDataApiException, AssertionError, TypeCheckError) as e:
+                return exception_to_result(e)
+
+        return async_wrapper
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         try:
             return func(*args, **kwargs)
 
-        except TwelveDataApiException as e:
-            logger.error(e)
-            return {"status": "error", "code": e.code, "message": e.message}
+        except (TwelveDataApiException, AssertionError, TypeCheckError) as e:
+            return exception_to_result(e)
 
-        except AssertionError as e:
-            logger.error(e)
-            return {"status": "error", "code": 500, "message": e.args[0]}
+    return wrapper
 
-        except TypeCheckError as e:
-            logger.error(e)
-            return {"status": "error", "code": 500, "message": str(e)}
 
-    return wrapper
+def exception_to_result(
+    e: TwelveDataApiException | AssertionError | TypeCheckError,
+) -> Dict[str, str | int | float]:
+    """Log an exception and give its error result.
+
+    Parameters
+    ----------
+    e : TwelveDataApiException | AssertionError | TypeCheckError
+        The exception caught by :func:`handle_exception`.
+
+    Returns
+    -------
+    Dict[str, str | int | float]
+        The error result, with code 500 for failed checks.
+    """
+    logger.error(e)
+
+    if isinstance(e, TwelveDataApiException):
+        result = {"status": "error", "code": e.code, "message": e.message}
+        if e.retry_after is not None:
+            result["retryAfter"] = e.retry_after
+
+        return result
+
+    if isinstance(e, AssertionError):
+        return {"status": "error", "code": 500, "message": e.args[0]}
+
+    return {"status": "error", "code": 500, "message": str(e)}
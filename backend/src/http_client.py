@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""http_client.py:  class
+
+This module contains the pooled HTTP client shared by all the calls to the Twelve Data API.
+"""
+
+__author__ = "Paul RÉMONDEAU"
+__copyright__ = "Paul RÉMONDEAU"
+__version__ = "1.0.0"
+__maintainer__ = "Paul RÉMONDEAU"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Production"
+__logger__ = "http_client.py"
+
+# =================================================================================================
+#     Libs
+# =================================================================================================
+
+import threading
+from typing import Dict, List
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import logging
+
+logger = logging.getLogger(__logger__)
+
+# =================================================================================================
+#     Classes
+# =================================================================================================
+
+
+class HttpClient:
+    """Keep-alive HTTP client with a connection pool per host.
+
+    Connections are reused between requests instead of paying a new
+    TCP and TLS handshake each time. Every request has a timeout, and
+    requests answered with a retryable status code are retried with an
+    exponential backoff.
+
+    Parameters
+    ----------
+    pool_connections : int, optional
+        The number of hosts to keep a connection pool for, by default 4.
+    pool_maxsize : int, optional
+        The maximum number of connections per host, by default 10.
+        Requests wait for a free connection when all are used.
+    connect_timeout : float, optional
+        Seconds to wait for the connection to be established, by default 3.05.
+    read_timeout : float, optional
+        Seconds to wait for the server to send data, by default 30.
+    max_retries : int, optional
+        The maximum number of retries of one request, by default 3.
+    backoff_factor : float, optional
+        The backoff between retries is backoff_factor * 2 ** (retry - 1)
+        seconds, by default 0.5.
+    retry_status_codes : List[int] | None, optional
+        The status codes to retry on, by default 500, 502, 503 and 504.
+        429 is not retried, as each retry would use API credits that the
+        credit scheduler did not grant.
+
+    Examples
+    ----------
+    >>> client = HttpClient(pool_maxsize=2, read_timeout=10)
+    >>> client.timeout
+    (3.05, 10)
+    >>> client.pool_stats()
+    {'requests': 0, 'retries': 0, 'errors': 0, 'pools': []}
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 4,
+        pool_maxsize: int = 10,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 30,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        retry_status_codes: List[int] | None = None,
+    ):
+        if retry_status_codes is None:
+            retry_status_codes = [500, 502, 503, 504]
+
+        self.timeout = (connect_timeout, read_timeout)
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=retry_status_codes,
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=True,
+            max_retries=retry,
+        )
+
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._retries = 0
+        self._errors = 0
+
+    def get(
+        self, url: str, params: Dict | None = None, headers: Dict | None = None
+    ) -> requests.Response:
+        """Send a GET request through the pool.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+        params : Dict | None, optional
+            The query parameters, by default None.
+        headers : Dict | None, optional
+            The request headers, by default None.
+
+        Returns
+        -------
+        requests.Response
+            The response, which may have a retryable status code if all
+            the retries failed.
+
+        Raises
+        ------
+        requests.RequestException
+            If the request could not be completed, e.g. on timeout.
+        """
+        with self._lock:
+            self._requests += 1
+
+        try:
+            response = self.session.get(
+                url, params=params, headers=headers, timeout=self.timeout
+            )
+
+        except requests.RequestException as e:
+            logger.error(e)
+            with self._lock:
+                self._errors += 1
+            raise
+
+        retries = getattr(response.raw, "retries", None)
+        if retries is not None and retries.history:
+            logger.warning(f"{url} answered after {len(retries.history)} retries.")
+            with self._lock:
+                self._retries += len(retries.history)
+
+        return response
+
+    def pool_stats(self) -> Dict[str, int | List[Dict[str, str | int]]]:
+        """Give usage statistics of the client and its connection pools.
+
+        Returns
+        -------
+        Dict[str, int | List[Dict[str, str | int]]]
+            The number of requests sent, retries and errors, and for each
+            host pool the number of connections opened, requests sent,
+            connection slots not in use and maximum size.
+        """
+        pools = []
+        pool_manager = self.adapter.poolmanager
+        for key in pool_manager.pools.keys():
+            pool = pool_manager.pools.get(key)
+            if pool is None:
+                continue
+
+            pools.append(
+                {
+                    "host": pool.host,
+                    "port": pool.port,
+                    "scheme": pool.scheme,
+                    "connections": pool.num_connections,
+                    "requests": pool.num_requests,
+                    "available": pool.pool.qsize() if pool.pool is not None else 0,
+                    "maxsize": pool.pool.maxsize if pool.pool is not None else 0,
+                }
+            )
+
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "retries": self._retries,
+                "errors": self._errors,
+                "pools": pools,
+            }
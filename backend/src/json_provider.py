@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""json_provider.py:  class
+
+This module contains the JSON provider of the Flask app, encoding responses with orjson.
+"""
+
+__author__ = "Paul RÉMONDEAU"
+__copyright__ = "Paul RÉMONDEAU"
+__version__ = "1.0.0"
+__maintainer__ = "Paul RÉMONDEAU"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Production"
+__logger__ = "json_provider.py"
+
+# =================================================================================================
+#     Libs
+# =================================================================================================
+
+from typing import Any
+
+import orjson
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+import logging
+
+logger = logging.getLogger(__logger__)
+
+# =================================================================================================
+#     Classes
+# =================================================================================================
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider encoding with orjson.
+
+    The output is the one of the default provider: sorted keys, compact
+    separators and ASCII only, and NumPy arrays and scalars are encoded
+    natively. Dates are still encoded by the default provider hook as
+    HTTP dates. Floats are written in their shortest form, which may
+    differ in notation (e.g. 1.2e-05 is written 0.000012) but decodes to
+    the same value, and NaN and infinities as null, which is valid JSON.
+
+    Objects orjson can not encode, non ASCII output and non default
+    arguments fall back to the default provider.
+
+    Examples
+    ----------
+    >>> from flask import Flask
+    >>> app = Flask(__name__)
+    >>> app.json = FastJSONProvider(app)
+    >>> app.json.dumps({"b": [1, 2.5], "a": float("nan")})
+    '{"a":null,"b":[1,2.5]}'
+    """
+
+    def _dumps_bytes(self, obj: Any) -> bytes | None:
+        if not self.sort_keys:
+            return None
+
+        try:
+            output = orjson.dumps(
+                obj,
+                default=self.default,
+                option=orjson.OPT_SORT_KEYS
+                | orjson.OPT_SERIALIZE_NUMPY
+                | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+
+        except TypeError as e:
+            logger.debug(f"Encoding with the default JSON provider: {e}")
+            return None
+
+        if self.ensure_ascii and not output.isascii():
+            return None
+
+        return output
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize data as JSON to a string.
+
+        Parameters
+        ----------
+        obj : Any
+            The data to serialize.
+        **kwargs : Any
+            Passed to json.dumps, in which case the default provider is used.
+
+        Returns
+        -------
+        str
+            The JSON document, compact if no arguments are given.
+        """
+        if not kwargs:
+            output = self._dumps_bytes(obj)
+            if output is not None:
+                return output.decode()
+
+            kwargs["separators"] = (",", ":")
+
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        """Deserialize data from a JSON string or bytes.
+
+        Parameters
+        ----------
+        s : str | bytes
+            The JSON document.
+        **kwargs : Any
+            Passed to json.loads, in which case the default provider is used.
+
+        Returns
+        -------
+        Any
+            The data.
+        """
+        if kwargs:
+            return super().loads(s, **kwargs)
+
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """Serialize the arguments as a JSON response.
+
+        Out of debug mode, the bytes of orjson are sent without being
+        decoded and encoded again.
+
+        Returns
+        -------
+        Response
+            The response with mimetype application/json.
+        """
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        output = self._dumps_bytes(obj)
+        if output is None:
+            return super().response(obj)
+
+        return self._app.response_class(output + b"\n", mimetype=self.mimetype)
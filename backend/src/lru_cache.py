@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""lru_cache.py:  class
+
+This module contains an in-memory cache of computed results with a memory cap.
+"""
+
+__author__ = "Paul RÉMONDEAU"
+__copyright__ = "Paul RÉMONDEAU"
+__version__ = "1.0.0"
+__maintainer__ = "Paul RÉMONDEAU"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Production"
+__logger__ = "lru_cache.py"
+
+# =================================================================================================
+#     Libs
+# =================================================================================================
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import logging
+
+logger = logging.getLogger(__logger__)
+
+# =================================================================================================
+#     Functions
+# =================================================================================================
+
+
+def approximate_size(obj: Any) -> int:
+    """Approximate the memory used by an object and its content.
+
+    Parameters
+    ----------
+    obj : Any
+        The object, containers are walked through.
+
+    Returns
+    -------
+    int
+        The size in bytes.
+
+    Examples
+    ----------
+    >>> approximate_size("abc") == sys.getsizeof("abc")
+    True
+    >>> approximate_size(("abc", 1)) > approximate_size("abc")
+    True
+    """
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, dict):
+        size += sum(
+            approximate_size(key) + approximate_size(value)
+            for key, value in obj.items()
+        )
+
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(approximate_size(item) for item in obj)
+
+    elif hasattr(obj, "nbytes"):
+        # NumPy arrays, pandas series and indexes
+        size += int(obj.nbytes)
+
+    elif hasattr(obj, "memory_usage"):
+        # pandas DataFrames
+        size += int(obj.memory_usage(index=True).sum())
+
+    return size
+
+
+# =================================================================================================
+#     Classes
+# =================================================================================================
+
+
+class LRUCache:
+    """Thread safe least recently used cache with a memory cap.
+
+    Keys are tuples, so that all the entries starting with the same
+    elements can be invalidated at once.
+
+    Parameters
+    ----------
+    max_bytes : int
+        The maximum approximate memory used by the entries. The least
+        recently used entries are evicted above it.
+
+    Examples
+    ----------
+    >>> cache = LRUCache(max_bytes=1024)
+    >>> cache.get_or_compute(("AAPL", "1day", 1), lambda: "computed")
+    'computed'
+    >>> cache.get_or_compute(("AAPL", "1day", 1), lambda: "computed again")
+    'computed'
+    >>> cache.invalidate("AAPL", "1day")
+    >>> cache.get(("AAPL", "1day", 1)) is None
+    True
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+
+        # Values and their size, from the least to the most recently used
+        self._entries: OrderedDict[tuple, Tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Tuple[Hashable, ...]) -> Any | None:
+        """Get an entry, counting a hit or a miss.
+
+        Parameters
+        ----------
+        key : Tuple[Hashable, ...]
+            The entry key.
+
+        Returns
+        -------
+        Any | None
+            The entry value, or None if it is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple[Hashable, ...], value: Any) -> None:
+        """Add or replace an entry, evicting the least recently used ones if needed.
+
+        Parameters
+        ----------
+        key : Tuple[Hashable, ...]
+            The entry key.
+        value : Any
+            The entry value, which must not be modified afterwards.
+        """
+        size = approximate_size(key) + approximate_size(value)
+        if size > self.max_bytes:
+            logger.warning(f"Entry {key} of {size} bytes is too large to be cached.")
+            return
+
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self._bytes -= old_entry[1]
+
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def get_or_compute(
+        self, key: Tuple[Hashable, ...], compute: Callable[[], Any]
+    ) -> Any:
+        """Get an entry, computing and caching it if it is not cached.
+
+        Parameters
+        ----------
+        key : Tuple[Hashable, ...]
+            The entry key.
+        compute : Callable[[], Any]
+            Gives the entry value.
+
+        Returns
+        -------
+        Any
+            The entry value.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+
+        return value
+
+    def invalidate(self, *key_start: Hashable) -> None:
+        """Remove the entries whose key starts with the given elements.
+
+        Parameters
+        ----------
+        *key_start : Hashable
+            The first elements of the keys, all the entries are removed if none is given.
+        """
+        with self._lock:
+            keys = [key for key in self._entries if key[: len(key_start)] == key_start]
+            for key in keys:
+                _, size = self._entries.pop(key)
+                self._bytes -= size
+
+    def stats(self) -> Dict[str, int]:
+        """Give the usage statistics of the cache.
+
+        Returns
+        -------
+        Dict[str, int]
+            The number of entries, their approximate memory, the memory
+            cap, and the number of hits, misses and evictions.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxBytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
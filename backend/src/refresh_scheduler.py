@@ -0,0 +1,334 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""refresh_scheduler.py:  class
+
+This module runs the periodic refreshes of the data in a background thread.
+"""
+
+__author__ = "Paul RÉMONDEAU"
+__copyright__ = "Paul RÉMONDEAU"
+__version__ = "1.0.0"
+__maintainer__ = "Paul RÉMONDEAU"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Production"
+__logger__ = "refresh_scheduler.py"
+
+# =================================================================================================
+#     Libs
+# =================================================================================================
+
+import asyncio
+import inspect
+import math
+import time
+import threading
+from typing import Awaitable, Callable, Dict, List
+
+import logging
+
+logger = logging.getLogger(__logger__)
+
+# =================================================================================================
+#     Classes
+# =================================================================================================
+
+
+class RefreshJob:
+    """A function run every interval, and its timing metrics.
+
+    Parameters
+    ----------
+    key : str
+        The job name.
+    interval : float
+        The time between two runs in seconds.
+    func : Callable[[], None | Awaitable[None]]
+        The function to run, or coroutine function to await. The run is
+        counted as failed if it raises.
+    next_run : float
+        The time of the first run in seconds.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        interval: float,
+        func: Callable[[], None | Awaitable[None]],
+        next_run: float,
+    ):
+        self.key = key
+        self.interval = interval
+        self.func = func
+        self.next_run = next_run
+
+        self.runs = 0
+        self.failures = 0
+        self.last_error: str | None = None
+        self.last_duration = 0.0
+        self.total_duration = 0.0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def stats(self, now: float) -> Dict[str, float | int | str | None]:
+        mean_duration = self.total_duration / self.runs if self.runs else 0.0
+        return {
+            "interval": self.interval,
+            "runs": self.runs,
+            "failures": self.failures,
+            "lastError": self.last_error,
+            "lastDuration": round(self.last_duration, 3),
+            "meanDuration": round(mean_duration, 3),
+            "lastLag": round(self.last_lag, 3),
+            "maxLag": round(self.max_lag, 3),
+            "nextRunIn": round(max(0.0, self.next_run - now), 3),
+        }
+
+
+class RefreshScheduler:
+    """Run jobs periodically in a background thread.
+
+    Jobs run one at a time, except coroutine jobs: the ones that are due
+    run concurrently after the others, on an event loop of the scheduler,
+    so that their network waits overlap. The lag of a run is the time
+    between its scheduled time and its actual start, it grows when jobs
+    take longer than the time between them (e.g. while waiting for API
+    credits).
+
+    Parameters
+    ----------
+    clock : Callable[[], float], optional
+        The clock in seconds, by default time.monotonic.
+    max_concurrency : int, optional
+        The maximum number of coroutine jobs running at once, by default 8.
+
+    Examples
+    ----------
+    >>> scheduler = RefreshScheduler()
+    >>> scheduler.add_job("hello", 60, lambda: print("Hello"))
+    >>> scheduler.run_pending()
+    Hello
+    1
+    >>> scheduler.run_pending()
+    0
+    >>> scheduler.stats()["jobs"]["hello"]["runs"]
+    1
+
+    Coroutine jobs are awaited :
+
+    >>> async def hello_async():
+    ...     print("Hello async")
+    >>> scheduler.add_job("hello_async", 60, hello_async)
+    >>> scheduler.run_pending()
+    Hello async
+    1
+    """
+
+    def __init__(
+        self, clock: Callable[[], float] = time.monotonic, max_concurrency: int = 8
+    ):
+        self.clock = clock
+        self.max_concurrency = max_concurrency
+
+        self._jobs: Dict[str, RefreshJob] = {}
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        # Created on the first coroutine job, and kept so that the resources
+        # bound to it (e.g. connections) are reused between runs
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def add_job(
+        self,
+        key: str,
+        interval: float,
+        func: Callable[[], None | Awaitable[None]],
+        delay: float = 0,
+    ) -> None:
+        """Schedule a job.
+
+        If a job with the same key exists, it is replaced.
+
+        Parameters
+        ----------
+        key : str
+            The job name.
+        interval : float
+            The time between two runs in seconds.
+        func : Callable[[], None | Awaitable[None]]
+            The function to run, or coroutine function to await.
+        delay : float, optional
+            The time before the first run in seconds, by default 0.
+        """
+        with self._condition:
+            self._jobs[key] = RefreshJob(key, interval, func, self.clock() + delay)
+            self._condition.notify_all()
+
+    def remove_job(self, key: str) -> None:
+        """Unschedule a job.
+
+        Parameters
+        ----------
+        key : str
+            The job name.
+        """
+        with self._condition:
+            self._jobs.pop(key, None)
+
+    def has_job(self, key: str) -> bool:
+        with self._condition:
+            return key in self._jobs
+
+    def _due_jobs(self, now: float) -> List[RefreshJob]:
+        return sorted(
+            (job for job in self._jobs.values() if job.next_run <= now),
+            key=lambda job: job.next_run,
+        )
+
+    def run_pending(self) -> int:
+        """Run the jobs that are due.
+
+        Returns
+        -------
+        int
+            The number of jobs run.
+        """
+        with self._condition:
+            due_jobs = self._due_jobs(self.clock())
+
+        async_jobs = []
+        for job in due_jobs:
+            if inspect.iscoroutinefunction(job.func):
+                async_jobs.append(job)
+                continue
+
+            start = self.clock()
+
+            try:
+                job.func()
+                error = None
+
+            except Exception as e:
+                logger.error(f"Refresh job {job.key} failed: {e}")
+                error = str(e)
+
+            self._record_run(job, start, self.clock(), error)
+
+        if async_jobs:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+
+            self._loop.run_until_complete(self._run_async_jobs(async_jobs))
+
+        return len(due_jobs)
+
+    async def _run_async_jobs(self, jobs: List[RefreshJob]) -> None:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_async_job(job: RefreshJob) -> None:
+            async with semaphore:
+                start = self.clock()
+
+                try:
+                    await job.func()
+                    error = None
+
+                except Exception as e:
+                    logger.error(f"Refresh job {job.key} failed: {e}")
+                    error = str(e)
+
+                self._record_run(job, start, self.clock(), error)
+
+        await asyncio.gather(*(run_async_job(job) for job in jobs))
+
+    def _record_run(
+        self, job: RefreshJob, start: float, end: float, error: str | None
+    ) -> None:
+        lag = start - job.next_run
+
+        with self._condition:
+            job.runs += 1
+            job.last_duration = end - start
+            job.total_duration += end - start
+            job.last_lag = lag
+            job.max_lag = max(job.max_lag, lag)
+            if error is not None:
+                job.failures += 1
+                job.last_error = error
+
+            # Keep the cadence, skipping the runs missed while late
+            missed_runs = math.floor((end - job.next_run) / job.interval)
+            job.next_run += (max(missed_runs, 0) + 1) * job.interval
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopping:
+                    now = self.clock()
+                    next_runs = [job.next_run for job in self._jobs.values()]
+                    if next_runs and min(next_runs) <= now:
+                        break
+
+                    timeout = min(next_runs) - now if next_runs else None
+                    self._condition.wait(timeout=timeout)
+
+                if self._stopping:
+                    return
+
+            self.run_pending()
+
+    def start(self) -> None:
+        """Start running the jobs in a background thread."""
+        with self._condition:
+            if self._thread is not None:
+                return
+
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run, name="refresh-scheduler", daemon=True
+            )
+            self._thread.start()
+
+        logger.info("Refresh scheduler started.")
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop the background thread after the running job.
+
+        Parameters
+        ----------
+        timeout : float | None, optional
+            The time to wait for the thread in seconds, by default None (no limit).
+        """
+        with self._condition:
+            thread = self._thread
+            self._stopping = True
+            self._condition.notify_all()
+
+        if thread is not None:
+            thread.join(timeout=timeout)
+
+        with self._condition:
+            self._thread = None
+
+            if self._loop is not None and not self._loop.is_running():
+                self._loop.close()
+                self._loop = None
+
+        logger.info("Refresh scheduler stopped.")
+
+    def stats(self) -> Dict[str, bool | Dict[str, Dict[str, float | int | str | None]]]:
+        """Give the timing metrics of the jobs.
+
+        Returns
+        -------
+        Dict[str, bool | Dict[str, Dict[str, float | int | str | None]]]
+            Whether the scheduler is running and, for each job, its
+            interval, number of runs and failures, last error, last and
+            mean duration, last and max lag, and time before next run.
+        """
+        with self._condition:
+            now = self.clock()
+            return {
+                "running": self._thread is not None,
+                "jobs": {key: job.stats(now) for key, job in self._jobs.items()},
+            }
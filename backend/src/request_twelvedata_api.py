@@ -19,19 +19,29 @@ __logger__ = "request_twelvedata_api.py"
 # =================================================================================================
 
 import os
-import json
+import threading
 
-from typing import List, Dict
+from typing import Callable, List, Dict
 from copy import copy
+from operator import itemgetter
 
+import httpx
+import orjson
 import requests
+import numpy as np
 import pandas as pd
-from typeguard import check_type
-
+from typeguard import CollectionCheckStrategy, check_type
 
 from .exceptions_twelvedata_api import TwelveDataApiException, handle_exception
+from .http_client import HttpClient
+from .response_cache import CachedResponse, ResponseCache
+from .credit_scheduler import CreditScheduler, INTERACTIVE, BACKGROUND
 from .utils import read_twelvedata_api_config_file
 
+import logging
+
+logger = logging.getLogger(__logger__)
+
 twelvedata_api_config_path = os.path.join(
     os.path.dirname(os.path.abspath(__file__)),
     "..",
@@ -39,7 +49,32 @@ twelvedata_api_config_path = os.path.join(
     "twelvedata_api_info.json",
 )
 
-twelvedata_api_config = read_twelvedata_api_config_file(twelvedata_api_config_path)
+# Read on first use, see load_twelvedata_api_config
+twelvedata_api_config: Dict | None = None
+
+# Shared by all the requests so that connections to Twelve Data API are kept alive,
+# created on first use, see get_http_client
+http_client: HttpClient | None = None
+
+# Basic plan until configured otherwise with configure_credit_scheduler,
+# created on first use, see get_credit_scheduler
+credit_scheduler: CreditScheduler | None = None
+
+# Responses of the slowly changing endpoints, created on first use,
+# see get_response_cache
+response_cache: ResponseCache | None = None
+
+_lazy_init_lock = threading.Lock()
+
+# Formats of the bar datetimes by length, the bars of a day or longer have no time
+BAR_DATETIME_FORMATS = {10: "%Y-%m-%d", 19: "%Y-%m-%d %H:%M:%S"}
+BAR_COLUMNS_DTYPES = {
+    "open": "float64",
+    "high": "float64",
+    "low": "float64",
+    "close": "float64",
+    "volume": "int64",
+}
 
 
 # =================================================================================================
@@ -47,16 +82,240 @@ twelvedata_api_config = read_twelvedata_api_config_file(twelvedata_api_config_pa
 # =================================================================================================
 
 
-def check_twelvedata_api_response(response: requests.Response) -> Dict[str, str | list]:
-    """Format Twelve Data API response.
+def load_twelvedata_api_config() -> Dict:
+    """Read the Twelve Data API configuration file once.
+
+    Returns
+    -------
+    Dict
+        The configuration, see utils.read_twelvedata_api_config_file.
+    """
+    global twelvedata_api_config
+
+    if twelvedata_api_config is None:
+        with _lazy_init_lock:
+            if twelvedata_api_config is None:
+                twelvedata_api_config = read_twelvedata_api_config_file(
+                    twelvedata_api_config_path
+                )
 
-    This function take care of the data output from Twelve Data API.
+    return twelvedata_api_config
+
+
+def get_http_client() -> HttpClient:
+    """Give the HTTP client shared by all the requests, creating it once.
+
+    Returns
+    -------
+    HttpClient
+        The client configured with the http_client section of the configuration.
+    """
+    global http_client
+
+    if http_client is None:
+        config = load_twelvedata_api_config()
+        with _lazy_init_lock:
+            if http_client is None:
+                http_client = HttpClient(**config["http_client"])
+
+    return http_client
+
+
+def get_credit_scheduler() -> CreditScheduler:
+    """Give the credit scheduler of the requests, creating it once for the Basic plan.
+
+    Returns
+    -------
+    CreditScheduler
+        The scheduler set by configure_credit_scheduler, or of the Basic plan.
+    """
+    global credit_scheduler
+
+    if credit_scheduler is None:
+        plans = load_twelvedata_api_config()["credit_scheduler"]["plans"]
+        with _lazy_init_lock:
+            if credit_scheduler is None:
+                credit_scheduler = CreditScheduler(**plans["Basic"])
+
+    return credit_scheduler
+
+
+def get_response_cache() -> ResponseCache:
+    """Give the on-disk cache of the responses, creating it once.
+
+    Returns
+    -------
+    ResponseCache
+        The cache configured with the response_cache section of the
+        configuration, whose ttl gives the time to live of the
+        responses of each URL by its name in the configuration.
+    """
+    global response_cache
+
+    if response_cache is None:
+        config = load_twelvedata_api_config()
+        with _lazy_init_lock:
+            if response_cache is None:
+                response_cache = ResponseCache(
+                    os.path.join(
+                        os.path.dirname(os.path.abspath(__file__)),
+                        "..",
+                        config["response_cache"]["directory"],
+                    ),
+                    {
+                        config[url_name]: ttl
+                        for url_name, ttl in config["response_cache"]["ttl"].items()
+                    },
+                )
+
+    return response_cache
+
+
+def configure_credit_scheduler(plan: str) -> None:
+    """Schedule the requests according to the API credits of a plan.
 
     Parameters
     ----------
-    response : requests.Response
+    plan : str
+        The Twelve Data API plan. Unknown plans are handled as Basic.
+    """
+    global credit_scheduler
+
+    plans = load_twelvedata_api_config()["credit_scheduler"]["plans"]
+    if plan not in plans:
+        logger.warning(f"Unknown plan {plan}, API credits of Basic plan are used.")
+        plan = "Basic"
+
+    credit_scheduler = CreditScheduler(**plans[plan])
+
+
+def send_twelvedata_api_request(
+    url: str,
+    params: Dict[str, str],
+    credits: int = 1,
+    priority: int = INTERACTIVE,
+    headers: Dict[str, str] | None = None,
+) -> requests.Response:
+    """Send a request to Twelve Data API through the shared client.
+
+    The request first waits for its API credits. Interactive requests
+    are served before background ones, but do not wait more than the
+    configured interactive_max_wait.
+
+    Parameters
+    ----------
+    url : str
+        The Twelve Data API URL.
+    params : Dict[str, str]
+        The query parameters.
+    credits : int, optional
+        The API credits used by the request, by default 1.
+    priority : int, optional
+        INTERACTIVE or BACKGROUND, by default INTERACTIVE.
+    headers : Dict[str, str] | None, optional
+        The request headers, by default None.
+
+    Returns
+    -------
+    requests.Response
         The Twelve Data API response.
 
+    Raises
+    ------
+    TwelveDataApiException
+        If the API credits would not be available in time (code 429),
+        Twelve Data API did not answer in time (code 504)
+        or could not be reached (code 503).
+    """
+    max_wait = (
+        load_twelvedata_api_config()["credit_scheduler"]["interactive_max_wait"]
+        if priority == INTERACTIVE
+        else None
+    )
+    get_credit_scheduler().acquire(credits, priority, max_wait)
+
+    try:
+        return get_http_client().get(url, params=params, headers=headers)
+
+    except requests.Timeout:
+        raise TwelveDataApiException(504, "Twelve Data API did not answer in time")
+
+    except requests.RequestException:
+        raise TwelveDataApiException(503, "Twelve Data API could not be reached")
+
+
+def send_cached_twelvedata_api_request(
+    url: str,
+    params: Dict[str, str],
+    parse: Callable[[Dict[str, str | list]], Dict],
+    priority: int = INTERACTIVE,
+) -> Dict:
+    """Send a request to Twelve Data API through the response cache, and parse it.
+
+    A fresh cached response is used without a request nor API credits.
+    A stale one is revalidated with a conditional request, and used if
+    Twelve Data API answers 304 Not Modified. Only the responses which
+    pass check_twelvedata_api_response and the checks of their parser
+    are cached, and a cached response is parsed once.
+
+    Parameters
+    ----------
+    url : str
+        The Twelve Data API URL, cached if it has a time to live.
+    params : Dict[str, str]
+        The query parameters.
+    parse : Callable[[Dict[str, str | list]], Dict]
+        Formats the checked response, raising if it is not correct.
+    priority : int, optional
+        INTERACTIVE or BACKGROUND, by default INTERACTIVE.
+
+    Returns
+    -------
+    Dict
+        The result of parse, which must not be modified as it may be
+        shared with other calls.
+
+    Raises
+    ------
+    TwelveDataApiException
+        See :func:`send_twelvedata_api_request` and
+        :func:`check_twelvedata_api_response`.
+    """
+    cache = get_response_cache()
+
+    def parse_response(response: CachedResponse | requests.Response) -> Dict:
+        return parse(check_twelvedata_api_response(response))
+
+    cached = cache.get(url, params)
+    if cached is not None and cached.fresh:
+        return cache.parse(url, params, cached, parse_response)
+
+    response = send_twelvedata_api_request(
+        url, params, priority=priority, headers=cache.revalidation_headers(cached)
+    )
+    if response.status_code == 304 and cached is not None:
+        cached = cache.revalidate(url, params, cached)
+        return cache.parse(url, params, cached, parse_response)
+
+    result = parse_response(response)
+    cache.put(url, params, response, result)
+
+    return result
+
+
+def check_twelvedata_api_response(
+    response: requests.Response | httpx.Response,
+) -> Dict[str, str | list]:
+    """Format Twelve Data API response.
+
+    This function take care of the data output from Twelve Data API,
+    for both the sync and the async clients.
+
+    Parameters
+    ----------
+    response : requests.Response | httpx.Response
+        The Twelve Data API response, or a cached one.
+
     Returns
     -------
     Dict[str, str | list]
@@ -100,22 +359,35 @@ def check_twelvedata_api_response(response: requests.Response) -> Dict[str, str
         # URL is not found
         raise TwelveDataApiException(404, "Not found")
 
+    elif status_code_requests == 429:
+        raise credits_exhausted_exception(
+            "Twelve Data API credits are exhausted for the current minute."
+        )
+
+    elif status_code_requests >= 500:
+        # Still failing after the retries of the HTTP client
+        raise TwelveDataApiException(503, "Twelve Data API is unavailable")
+
     elif status_code_requests == 200:
         # Request succeeded
-        response_json = response.json()
+        response_json = orjson.loads(response.content)
         if isinstance(response_json, list):
             # This is for the market data
             status = "ok"
             response_json = {"status": "ok", "data": response_json}
 
         else:
-            status = response_json["status"]
+            # Multiple symbols responses only have a status per symbol
+            status = response_json.get("status", "ok")
 
         if status == "error":
             # An error happened with Twelve Data API
             code = response_json["code"]
             message = response_json["message"]
 
+            if code == 429:
+                raise credits_exhausted_exception(message)
+
             raise TwelveDataApiException(code, message)
 
         else:
@@ -126,20 +398,55 @@ def check_twelvedata_api_response(response: requests.Response) -> Dict[str, str
         raise TwelveDataApiException(501, "Not implemented")
 
 
+def credits_exhausted_exception(message: str) -> TwelveDataApiException:
+    """Build the error of Twelve Data API answering that the credits are exhausted.
+
+    The credits were used somewhere else, e.g. by another user of the
+    API key, so the credits of the current minute are considered used.
+
+    Parameters
+    ----------
+    message : str
+        The error message.
+
+    Returns
+    -------
+    TwelveDataApiException
+        The exception, with code 429 and the estimated wait as retry_after.
+    """
+    get_credit_scheduler().drain()
+    retry_after = round(get_credit_scheduler().estimate_wait(), 2)
+
+    return TwelveDataApiException(429, message, retry_after=retry_after)
+
+
 @handle_exception
 def get_stock_timeseries(
-    symbol: str, time_delta: str, api_key: str
+    symbol: str,
+    time_delta: str,
+    api_key: str,
+    start_date: str | None = None,
+    priority: int = INTERACTIVE,
 ) -> Dict[str, str | int | pd.DataFrame]:
     """Request the twelve data API for stock informations.
 
     This function requests meta and time series for the requested
-    instrument. It also evaluates the cumulative return, the
-    annualized cumulative return and  annualized volatility.
+    instrument. Every bar is kept with its open, high, low, close
+    and volume values.
 
     Parameters
     ----------
     symbol : str
         The instrument symbol.
+    time_delta : str
+        The interval between two bars.
+    api_key : str
+        API key for the Twelve Data API.
+    start_date : str | None, optional
+        If given, only bars from this date (included, exchange timezone,
+        "%Y-%m-%d %H:%M:%S" format) are requested, by default None.
+    priority : int, optional
+        INTERACTIVE or BACKGROUND, by default INTERACTIVE.
 
     Returns
     -------
@@ -153,7 +460,7 @@ def get_stock_timeseries(
 
     Request time series for Apple :
 
-    >>> res = get_stock_timeseries("AAPL", API_KEY)
+    >>> res = get_stock_timeseries("AAPL", "1day", API_KEY)
     >>> res['status']
     ok
     >>> res['exchange']
@@ -161,80 +468,298 @@ def get_stock_timeseries(
     >>> res['timezone']
     America/New_York
     >>> res['data']
-        datetime
-    2019-06-20 04:00:00     49.69750
-    2019-06-20 12:00:00     49.84485
-    2019-06-21 04:00:00     50.06215
-    2019-06-21 12:00:00     49.69250
-    2019-06-24 04:00:00     49.87000
-                            ...
-    2023-06-06 09:30:00    179.16000
-    2023-06-07 09:30:00    177.82001
-    2023-06-08 09:30:00    180.53999
-    2023-06-09 09:30:00    181.03999
-    2023-06-12 09:30:00    183.84000
-    Name: close, Length: 1228, dtype: float64
+                      open       high        low      close     volume
+    datetime
+    2003-08-20    0.37600    0.38518    0.37554    0.37875  349045600
+    2003-08-21    0.37857    0.38875    0.37804    0.38821  383457600
+    ...                ...        ...        ...        ...        ...
+    2023-06-09  181.50000  182.23000  180.63000  180.96001   48870700
+    2023-06-12  181.27000  183.89000  180.97000  183.78999   54274900
+    <BLANKLINE>
+    [5000 rows x 5 columns]
+
+    Request only the bars since the last known one :
+
+    >>> res = get_stock_timeseries("AAPL", "1day", API_KEY, "2023-06-09 00:00:00")
+    >>> res['data']
+                      open       high        low      close    volume
+    datetime
+    2023-06-09  181.50000  182.23000  180.63000  180.96001  48870700
+    2023-06-12  181.27000  183.89000  180.97000  183.78999  54274900
 
     If something went wrong :
 
-    >>> get_stock_timeseries("AAPL", API_KEY)
+    >>> get_stock_timeseries("AAPL", "1day", API_KEY)
     {"status": "error", "code": 500, "message": "Erreur"}
 
     See :func:`src.exceptions_twelvedata_api.handle_exception` for more informations on possible errors.
     """
 
     # API request
-    params = copy(twelvedata_api_config["timeseries_params"])
-    params["symbol"] = symbol
+    params = timeseries_params([symbol], time_delta, api_key, start_date)
+    response = send_twelvedata_api_request(
+        load_twelvedata_api_config()["timeseries_url"], params, priority=priority
+    )
+
+    response_json = check_twelvedata_api_response(response)
+
+    return parse_stock_timeseries(response_json)
+
+
+@handle_exception
+def get_stocks_timeseries(
+    symbols: List[str],
+    time_delta: str,
+    api_key: str,
+    start_date: str | None = None,
+    priority: int = INTERACTIVE,
+) -> Dict[str, str | int | Dict[str, Dict[str, str | int | pd.DataFrame]]]:
+    """Request the twelve data API for several stocks at once.
+
+    The time series of all the symbols are requested in a single
+    call, which uses one API credit per symbol.
+
+    Parameters
+    ----------
+    symbols : List[str]
+        The instrument symbols.
+    time_delta : str
+        The interval between two bars.
+    api_key : str
+        API key for the Twelve Data API.
+    start_date : str | None, optional
+        If given, only bars from this date (included, exchange timezone,
+        "%Y-%m-%d %H:%M:%S" format) are requested, by default None.
+    priority : int, optional
+        INTERACTIVE or BACKGROUND, by default INTERACTIVE.
+
+    Returns
+    -------
+    Dict[str, str | int | Dict[str, Dict[str, str | int | pd.DataFrame]]]
+        res["status"] is ok or error
+            - if status is error, dict contains code of error and message
+            - if status is ok, dict contains for each symbol the result
+              of :func:`get_stock_timeseries`
+
+    Examples
+    ----------
+
+    >>> res = get_stocks_timeseries(["AAPL", "FOO"], "1day", API_KEY)
+    >>> res['status']
+    ok
+    >>> res['data']['AAPL']['exchange']
+    NASDAQ
+    >>> res['data']['FOO']
+    {"status": "error", "code": 400, "message": "**symbol** not found: FOO. Please specify it correctly according to API Documentation."}
+    """
+    params = timeseries_params(symbols, time_delta, api_key, start_date)
+    response = send_twelvedata_api_request(
+        load_twelvedata_api_config()["timeseries_url"],
+        params,
+        credits=len(symbols),
+        priority=priority,
+    )
+
+    response_json = check_twelvedata_api_response(response)
+
+    return parse_stocks_timeseries(response_json, symbols)
+
+
+def timeseries_params(
+    symbols: List[str], time_delta: str, api_key: str, start_date: str | None = None
+) -> Dict[str, str | int]:
+    """Give the query parameters of a time series request.
+
+    Parameters
+    ----------
+    symbols : List[str]
+        The instrument symbols.
+    time_delta : str
+        The interval between two bars.
+    api_key : str
+        API key for the Twelve Data API.
+    start_date : str | None, optional
+        See :func:`get_stock_timeseries`, by default None.
+
+    Returns
+    -------
+    Dict[str, str | int]
+        The configured parameters, with the ones of the request.
+    """
+    params = copy(load_twelvedata_api_config()["timeseries_params"])
+    params["symbol"] = ",".join(symbols)
     params["apikey"] = api_key
     params["interval"] = time_delta
-    response = requests.get(twelvedata_api_config["timeseries_url"], params=params)
+    if start_date is not None:
+        params["start_date"] = start_date
 
-    response_json = check_twelvedata_api_response(response)
+    return params
+
+
+def parse_stocks_timeseries(
+    response_json: Dict[str, str | int | dict | list], symbols: List[str]
+) -> Dict[str, str | Dict[str, Dict[str, str | int | pd.DataFrame]]]:
+    """Format the time series of several symbols from Twelve Data API.
+
+    Parameters
+    ----------
+    response_json : Dict[str, str | int | dict | list]
+        The checked Twelve Data API response.
+    symbols : List[str]
+        The requested instrument symbols.
+
+    Returns
+    -------
+    Dict[str, str | Dict[str, Dict[str, str | int | pd.DataFrame]]]
+        See :func:`get_stocks_timeseries`.
+    """
+    if len(symbols) == 1:
+        # A single symbol is not nested in the response
+        response_json = {symbols[0]: response_json}
+
+    data = {
+        symbol: parse_stock_timeseries(
+            response_json.get(
+                symbol,
+                {
+                    "status": "error",
+                    "code": 500,
+                    "message": f"No data for {symbol}, check Twelve Data API",
+                },
+            )
+        )
+        for symbol in symbols
+    }
+
+    return {"status": "ok", "data": data}
+
+
+def read_values_columns(values: list) -> Dict[str, list] | None:
+    """Read the columns of the values of a Twelve Data API time series.
+
+    The values are checked with one pass per column in C, instead of
+    a type check of each value in Python.
+
+    Parameters
+    ----------
+    values : list
+        The values of the time series, which should be dicts of str
+        with the same keys.
+
+    Returns
+    -------
+    Dict[str, list] | None
+        The values of each key, or None if the values are not dicts of
+        str with the same keys.
+
+    Examples
+    ----------
+    >>> read_values_columns([{"open": "1.0", "close": "2.0"}, {"open": "3.0", "close": "4.0"}])
+    {'open': ['1.0', '3.0'], 'close': ['2.0', '4.0']}
+    >>> read_values_columns([{"open": "1.0"}, {"open": 3.0}]) is None
+    True
+    >>> read_values_columns([{"open": "1.0"}, {"close": "4.0"}]) is None
+    True
+    """
+    if not values:
+        return {}
+
+    if set(map(type, values)) != {dict}:
+        return None
+
+    keys = list(values[0])
+    if set(map(len, values)) != {len(keys)}:
+        return None
+
+    try:
+        columns = {key: list(map(itemgetter(key), values)) for key in keys}
+
+    except KeyError:
+        return None
+
+    if any(set(map(type, column)) != {str} for column in columns.values()):
+        return None
+
+    return columns
+
+
+@handle_exception
+def parse_stock_timeseries(
+    response_json: Dict[str, str | int | dict | list],
+) -> Dict[str, str | int | pd.DataFrame]:
+    """Format the time series of one symbol from Twelve Data API.
+
+    Parameters
+    ----------
+    response_json : Dict[str, str | int | dict | list]
+        The Twelve Data API response for the symbol.
+
+    Returns
+    -------
+    Dict[str, str | int | pd.DataFrame]
+        See :func:`get_stock_timeseries`.
+    """
+    if response_json["status"] == "error":
+        # Symbols of a multiple symbols response fail independently
+        raise TwelveDataApiException(response_json["code"], response_json["message"])
 
     meta: Dict[str, str] = check_type(response_json["meta"], Dict[str, str])
 
-    values: List[Dict[str, str]] = check_type(
-        response_json["values"], List[Dict[str, str]]
-    )
+    values: list = check_type(response_json["values"], list)
+    columns = read_values_columns(values)
+    if columns is None:
+        # Only to report the first value that is not of the expected type
+        check_type(
+            values,
+            List[Dict[str, str]],
+            collection_check_strategy=CollectionCheckStrategy.ALL_ITEMS,
+        )
 
     # Assert meta data is good format
     assert set(meta.keys()) == set(
-        twelvedata_api_config["timeseries_meta_keys"]
+        load_twelvedata_api_config()["timeseries_meta_keys"]
     ), "Meta data are not correct, check Twelve Data API"
 
     exchange = meta["exchange"]
     timezone = meta["exchange_timezone"]
 
-    values = response_json["values"]
     # Check if values is not an empty list
     assert values, "Data value is empty, check Twelve Data API"
 
-    values_keys = [x.keys() for x in response_json["values"]]
-
     # Assert that data is of type List[Dict] with all dict having same keys
-    assert all(
-        x == values_keys[0] for x in values_keys
+    assert (
+        columns is not None
     ), "Data value keys are not always the same, check Twelve Data API"
 
     assert (
-        set(values_keys[0]) == twelvedata_api_config["timeseries_values_keys"]
+        set(columns) == load_twelvedata_api_config()["timeseries_values_keys"]
     ), "Data value keys are not the expected ones, check Twelve Data API"
 
-    df = pd.DataFrame(response_json["values"])
-    df = df.astype(
-        {
-            "open": "float64",
-            "high": "float64",
-            "high": "float64",
-            "close": "float64",
-            "volume": "int64",
-        }
-    )
-    df["datetime"] = pd.to_datetime(df["datetime"])
-    df = df.set_index("datetime").sort_index()
-
-    working_df: pd.Series = df["close"]
+    # Inferred if the datetimes are not of a known format
+    datetime_format = BAR_DATETIME_FORMATS.get(len(columns["datetime"][0]))
+    try:
+        index = pd.DatetimeIndex(
+            pd.to_datetime(columns["datetime"], format=datetime_format),
+            name="datetime",
+        )
+        working_df = pd.DataFrame(
+            {
+                column: np.array(columns[column], dtype=dtype)
+                for column, dtype in BAR_COLUMNS_DTYPES.items()
+            },
+            index=index,
+        )
+
+    except ValueError as e:
+        raise TwelveDataApiException(
+            500, f"Data values are not correct, check Twelve Data API: {e}"
+        )
+
+    # Bars are given from the most recent one
+    if working_df.index.is_monotonic_decreasing:
+        working_df = working_df.iloc[::-1]
+    elif not working_df.index.is_monotonic_increasing:
+        working_df = working_df.sort_index()
 
     return {
         "status": "ok",
@@ -245,7 +770,9 @@ def get_stock_timeseries(
 
 
 @handle_exception
-def get_markets_state(api_key: str) -> Dict[str, str | int | pd.DataFrame]:
+def get_markets_state(
+    api_key: str, priority: int = INTERACTIVE
+) -> Dict[str, str | int | pd.DataFrame]:
     """Retrieves market state from Twelve Data API.
 
     If request fails (not enough token), status is "ko"
@@ -257,6 +784,8 @@ def get_markets_state(api_key: str) -> Dict[str, str | int | pd.DataFrame]:
     ----------
     api_key : str
         API key for the Twelve Data API.
+    priority : int, optional
+        INTERACTIVE or BACKGROUND, by default INTERACTIVE.
 
     Returns
     -------
@@ -288,10 +817,30 @@ def get_markets_state(api_key: str) -> Dict[str, str | int | pd.DataFrame]:
 
     """
     params = {"apikey": api_key}
-    response = requests.get(twelvedata_api_config["market_url"], params=params)
 
-    response_json = check_twelvedata_api_response(response)
+    return send_cached_twelvedata_api_request(
+        load_twelvedata_api_config()["market_url"],
+        params,
+        parse_markets_state,
+        priority=priority,
+    )
+
+
+def parse_markets_state(
+    response_json: Dict[str, str | list],
+) -> Dict[str, str | pd.DataFrame]:
+    """Format the markets state from Twelve Data API.
+
+    Parameters
+    ----------
+    response_json : Dict[str, str | list]
+        The checked Twelve Data API response.
 
+    Returns
+    -------
+    Dict[str, str | pd.DataFrame]
+        See :func:`get_markets_state`.
+    """
     data: List[Dict[str, str | bool]] = check_type(
         response_json["data"], List[Dict[str, str | bool]]
     )
@@ -305,7 +854,7 @@ def get_markets_state(api_key: str) -> Dict[str, str | int | pd.DataFrame]:
     ), "Data value keys are not always the same, check Twelve Data API."
 
     assert (
-        set(data_keys[0]) == twelvedata_api_config["market_keys"]
+        set(data_keys[0]) == load_twelvedata_api_config()["market_keys"]
     ), "Data value keys are not the expected ones, check Twelve Data API."
 
     df = pd.DataFrame(data).drop(columns=["code"]).drop_duplicates()
@@ -332,7 +881,7 @@ def get_markets_state(api_key: str) -> Dict[str, str | int | pd.DataFrame]:
 
 @handle_exception
 def get_available_symbols_list(
-    api_key: str, plan: str = "Basic"
+    api_key: str, plan: str = "Basic", priority: int = INTERACTIVE
 ) -> Dict[str, str | Dict[str, List[str]]]:
     """Retrieves available symbol.
 
@@ -344,6 +893,8 @@ def get_available_symbols_list(
         The API key
     plan : str, optional
         The desired plan, by default "Basic".
+    priority : int, optional
+        INTERACTIVE or BACKGROUND, by default INTERACTIVE.
 
     Returns
     -------
@@ -377,16 +928,73 @@ def get_available_symbols_list(
     See :func:`src.exceptions_twelvedata_api.handle_exception` for more informations on possible errors.
     """
     params = {"apikey": api_key, "show_plan": True}
-    response = requests.get(twelvedata_api_config["symbols_url"], params=params)
 
-    response_json = check_twelvedata_api_response(response)
+    # The catalogue is parsed for all the plans, and kept with the cached response
+    catalogue = send_cached_twelvedata_api_request(
+        load_twelvedata_api_config()["symbols_url"],
+        params,
+        parse_symbols_catalogue,
+        priority=priority,
+    )
 
-    data = pd.DataFrame(response_json["data"])
+    return {"status": "ok", "data": catalogue.get(plan, {})}
 
-    data_plan = data[data["access"].apply(lambda x: x["plan"] == plan)]
 
-    result = json.loads(
-        data_plan.groupby("exchange").agg({"symbol": list})["symbol"].to_json()
-    )
+def parse_symbols_catalogue(
+    response_json: Dict[str, str | list],
+) -> Dict[str, Dict[str, List[str]]]:
+    """Group the symbols of the catalogue of Twelve Data API by plan and exchange.
+
+    The fields are read with one pass per field in C, and the symbols of
+    all the plans are grouped at once, instead of filtering the rows of
+    one plan with a Python call per row.
 
-    return {"status": "ok", "data": result}
+    Parameters
+    ----------
+    response_json : Dict[str, str | list]
+        The checked Twelve Data API response.
+
+    Returns
+    -------
+    Dict[str, Dict[str, List[str]]]
+        For each plan, the symbols of each exchange, exchanges being
+        sorted and symbols in the catalogue order. Symbols without an
+        exchange or a plan are left out.
+
+    Raises
+    ------
+    TwelveDataApiException
+        If the symbols do not have the expected fields (code 500).
+
+    Examples
+    ----------
+    >>> parse_symbols_catalogue({"data": [
+    ...     {"symbol": "AAPL", "exchange": "NASDAQ", "access": {"plan": "Basic"}},
+    ...     {"symbol": "ADS", "exchange": "XETR", "access": {"plan": "Grow"}},
+    ...     {"symbol": "MSFT", "exchange": "NASDAQ", "access": {"plan": "Basic"}},
+    ... ]})
+    {'Basic': {'NASDAQ': ['AAPL', 'MSFT']}, 'Grow': {'XETR': ['ADS']}}
+    """
+    data: list = check_type(response_json["data"], list)
+
+    try:
+        symbols = np.array(list(map(itemgetter("symbol"), data)), dtype=object)
+        groups = pd.DataFrame(
+            {
+                "plan": list(map(itemgetter("plan"), map(itemgetter("access"), data))),
+                "exchange": list(map(itemgetter("exchange"), data)),
+            }
+        )
+
+    except (KeyError, TypeError) as e:
+        raise TwelveDataApiException(
+            500, f"Symbols are not correct, check Twelve Data API: {e!r}"
+        )
+
+    catalogue: Dict[str, Dict[str, List[str]]] = {}
+    for (plan, exchange), indices in sorted(
+        groups.groupby(["plan", "exchange"]).indices.items()
+    ):
+        catalogue.setdefault(plan, {})[exchange] = symbols[indices].tolist()
+
+    return catalogue
@@ -0,0 +1,370 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""response_cache.py:  class
+
+This module contains an on-disk cache of the responses of Twelve Data API.
+"""
+
+__author__ = "Paul RÉMONDEAU"
+__copyright__ = "Paul RÉMONDEAU"
+__version__ = "1.0.0"
+__maintainer__ = "Paul RÉMONDEAU"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Production"
+__logger__ = "response_cache.py"
+
+# =================================================================================================
+#     Libs
+# =================================================================================================
+
+import os
+import json
+import time
+import zlib
+import uuid
+import hashlib
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+import logging
+
+logger = logging.getLogger(__logger__)
+
+# Query parameters which do not change the response
+IGNORED_PARAMS = {"apikey"}
+
+# =================================================================================================
+#     Classes
+# =================================================================================================
+
+
+class CachedResponse:
+    """A response read from the cache.
+
+    It has the status_code, headers, content and json() of a response,
+    the body being decompressed on first use.
+
+    Parameters
+    ----------
+    metadata : Dict[str, Any]
+        The version of the stored response, the time it was stored or
+        last revalidated, and its ETag and Last-Modified headers.
+    compressed : bytes
+        The compressed body.
+    fresh : bool
+        Whether its time to live is not over.
+    """
+
+    status_code = 200
+
+    def __init__(self, metadata: Dict[str, Any], compressed: bytes, fresh: bool):
+        self.metadata = metadata
+        self.compressed = compressed
+        self.fresh = fresh
+        self.headers = {
+            name: metadata[name]
+            for name in ["ETag", "Last-Modified"]
+            if metadata.get(name) is not None
+        }
+        self._content: bytes | None = None
+
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            self._content = zlib.decompress(self.compressed)
+
+        return self._content
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class ResponseCache:
+    """Thread safe on-disk cache of the responses of some URLs.
+
+    Responses are stored compressed, one file per URL and query
+    parameters, the API key being left out of the key. A response is
+    fresh during the time to live of its URL. Once it is not, it can be
+    revalidated with a conditional request, see revalidation_headers.
+
+    The result of parsing a stored response is also kept in memory, so
+    that it is parsed once, see parse.
+
+    Parameters
+    ----------
+    directory : str
+        The folder of the cached responses, created if needed.
+    ttls : Dict[str, float]
+        The time to live in seconds of the responses of each URL. The
+        responses of the other URLs are not cached.
+    clock : Callable[[], float], optional
+        The clock in seconds, by default time.time.
+
+    Examples
+    ----------
+    >>> import requests
+    >>> directory = tempfile.mkdtemp()
+    >>> cache = ResponseCache(directory, {"https://api.twelvedata.com/stocks": 3600})
+    >>> response = requests.Response()
+    >>> response.status_code, response._content = 200, b'{"data": []}'
+    >>> cache.put("https://api.twelvedata.com/stocks", {"apikey": "foo"}, response)
+    >>> cached = cache.get("https://api.twelvedata.com/stocks", {"apikey": "bar"})
+    >>> cached.fresh, cached.json()
+    (True, {'data': []})
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttls: Dict[str, float],
+        clock: Callable[[], float] = time.time,
+    ):
+        self.directory = directory
+        self.ttls = ttls
+        self.clock = clock
+
+        os.makedirs(directory, exist_ok=True)
+
+        # Parsed result of the stored response of each file, and its version
+        self._parsed: Dict[str, Tuple[str | None, Any]] = {}
+
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0
+        self._revalidations = 0
+        self._stores = 0
+        self._parsed_hits = 0
+
+    def is_cached(self, url: str) -> bool:
+        return url in self.ttls
+
+    def path(self, url: str, params: Dict | None = None) -> str:
+        """Give the file of the response of a URL and its query parameters.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+        params : Dict | None, optional
+            The query parameters, by default None.
+
+        Returns
+        -------
+        str
+            The file path, named after a hash of the URL and the parameters
+            which change the response.
+        """
+        params = sorted(
+            (str(name), str(value))
+            for name, value in (params or {}).items()
+            if name not in IGNORED_PARAMS
+        )
+        key = hashlib.sha256(json.dumps([url, params]).encode()).hexdigest()
+
+        return os.path.join(self.directory, f"{key}.zlib")
+
+    def get(self, url: str, params: Dict | None = None) -> CachedResponse | None:
+        """Read the response of a URL, counting a hit, a stale hit or a miss.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+        params : Dict | None, optional
+            The query parameters, by default None.
+
+        Returns
+        -------
+        CachedResponse | None
+            The cached response, or None if there is none.
+        """
+        if not self.is_cached(url):
+            return None
+
+        try:
+            with open(self.path(url, params), "rb") as f:
+                metadata = json.loads(f.readline())
+                compressed = f.read()
+
+        except (OSError, ValueError):
+            with self._lock:
+                self._misses += 1
+            return None
+
+        fresh = self.clock() - metadata["storedAt"] < self.ttls[url]
+        with self._lock:
+            if fresh:
+                self._hits += 1
+            else:
+                self._stale += 1
+
+        return CachedResponse(metadata, compressed, fresh)
+
+    def revalidation_headers(self, cached: CachedResponse | None) -> Dict[str, str]:
+        """Give the headers of a conditional request of a cached response.
+
+        Parameters
+        ----------
+        cached : CachedResponse | None
+            The cached response, if any.
+
+        Returns
+        -------
+        Dict[str, str]
+            If-None-Match and If-Modified-Since from its ETag and
+            Last-Modified headers, empty if it has none.
+        """
+        if cached is None:
+            return {}
+
+        headers = {}
+        if "ETag" in cached.headers:
+            headers["If-None-Match"] = cached.headers["ETag"]
+        if "Last-Modified" in cached.headers:
+            headers["If-Modified-Since"] = cached.headers["Last-Modified"]
+
+        return headers
+
+    def _write(
+        self, url: str, params: Dict | None, metadata: Dict, compressed: bytes
+    ) -> None:
+        # Written aside then moved, so that readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(metadata).encode() + b"\n")
+                f.write(compressed)
+
+            os.replace(temp_path, self.path(url, params))
+
+        except OSError as e:
+            logger.error(f"Response of {url} could not be cached: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def parse(
+        self,
+        url: str,
+        params: Dict | None,
+        cached: CachedResponse,
+        parse: Callable[[CachedResponse], Any],
+    ) -> Any:
+        """Parse a cached response, once per stored response.
+
+        The responses of a URL must always be parsed by the same function.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+        params : Dict | None
+            The query parameters.
+        cached : CachedResponse
+            The cached response.
+        parse : Callable[[CachedResponse], Any]
+            Parses the response.
+
+        Returns
+        -------
+        Any
+            The result of parse, which must not be modified as it is kept
+            until the response is stored again.
+        """
+        path = self.path(url, params)
+        version = cached.metadata.get("version")
+
+        with self._lock:
+            parsed = self._parsed.get(path)
+            if parsed is not None and parsed[0] == version:
+                self._parsed_hits += 1
+                return parsed[1]
+
+        result = parse(cached)
+
+        with self._lock:
+            self._parsed[path] = (version, result)
+
+        return result
+
+    def put(
+        self, url: str, params: Dict | None, response: Any, parsed: Any = None
+    ) -> None:
+        """Store a successful response of a URL.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+        params : Dict | None
+            The query parameters.
+        response : Any
+            The response, e.g. requests.Response or httpx.Response.
+        parsed : Any, optional
+            If given, the result of parsing the response, see parse, by
+            default None.
+        """
+        if not self.is_cached(url):
+            return
+
+        metadata = {
+            # Changes each time a response is stored, not when revalidated
+            "version": uuid.uuid4().hex,
+            "storedAt": self.clock(),
+            "ETag": response.headers.get("ETag"),
+            "Last-Modified": response.headers.get("Last-Modified"),
+        }
+        self._write(url, params, metadata, zlib.compress(response.content))
+
+        with self._lock:
+            self._stores += 1
+            if parsed is not None:
+                self._parsed[self.path(url, params)] = (metadata["version"], parsed)
+
+    def revalidate(
+        self, url: str, params: Dict | None, cached: CachedResponse
+    ) -> CachedResponse:
+        """Renew a cached response, once it is known not to have changed.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+        params : Dict | None
+            The query parameters.
+        cached : CachedResponse
+            The cached response, e.g. answered with 304 Not Modified.
+
+        Returns
+        -------
+        CachedResponse
+            The fresh cached response.
+        """
+        metadata = {**cached.metadata, "storedAt": self.clock()}
+        self._write(url, params, metadata, cached.compressed)
+
+        with self._lock:
+            self._revalidations += 1
+
+        return CachedResponse(metadata, cached.compressed, True)
+
+    def stats(self) -> Dict[str, int]:
+        """Give the usage statistics of the cache.
+
+        Returns
+        -------
+        Dict[str, int]
+            The number of fresh hits, stale hits, misses, revalidated
+            and stored responses, and of parses saved.
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "staleHits": self._stale,
+                "misses": self._misses,
+                "revalidations": self._revalidations,
+                "stores": self._stores,
+                "parsedHits": self._parsed_hits,
+            }
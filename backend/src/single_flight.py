@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""single_flight.py:  class
+
+This module shares one run of a function between concurrent identical calls.
+"""
+
+__author__ = "Paul RÉMONDEAU"
+__copyright__ = "Paul RÉMONDEAU"
+__version__ = "1.0.0"
+__maintainer__ = "Paul RÉMONDEAU"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Production"
+__logger__ = "single_flight.py"
+
+# =================================================================================================
+#     Libs
+# =================================================================================================
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import logging
+
+logger = logging.getLogger(__logger__)
+
+# =================================================================================================
+#     Classes
+# =================================================================================================
+
+
+class Flight:
+    """A run of a function, and its outcome once done."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+    def wait(self) -> Any:
+        """Wait for the run to be done, and give its result or raise its exception."""
+        self.done.wait()
+
+        if self.error is not None:
+            raise self.error
+
+        return self.result
+
+
+class SingleFlight:
+    """Thread safe coalescing of concurrent calls with the same key.
+
+    The first call of a key runs the function. The calls of the same key
+    made while it runs wait for it and share its result, or its exception.
+    Once it is done, the next call of the key runs the function again.
+
+    A caller may also run the work of several keys at once, starting their
+    flights with start and ending them with finish.
+
+    Examples
+    ----------
+    >>> flights = SingleFlight()
+    >>> flights.do(("AAPL", "1day"), lambda: "fetched")
+    'fetched'
+    >>> flights.stats()
+    {'calls': 1, 'runs': 1, 'shared': 0, 'inFlight': 0}
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, Flight] = {}
+        self._lock = threading.Lock()
+
+        self._calls = 0
+        self._runs = 0
+        self._shared = 0
+
+    def start(self, key: Hashable) -> Tuple[Flight, bool]:
+        """Start the run of a key, or join the run in flight.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key of the call.
+
+        Returns
+        -------
+        Tuple[Flight, bool]
+            The run, and whether it was started by this call. A started
+            run must be ended with finish, otherwise the run is waited for.
+        """
+        with self._lock:
+            self._calls += 1
+            flight = self._flights.get(key)
+
+            if flight is None:
+                flight = self._flights[key] = Flight()
+                self._runs += 1
+                return flight, True
+
+            self._shared += 1
+            return flight, False
+
+    def finish(
+        self,
+        key: Hashable,
+        flight: Flight,
+        result: Any = None,
+        error: BaseException | None = None,
+    ) -> None:
+        """End a run started with start, giving its outcome to the calls waiting for it.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key of the run.
+        flight : Flight
+            The run.
+        result : Any, optional
+            The result of the run, by default None.
+        error : BaseException | None, optional
+            The exception raised by the run, by default None.
+        """
+        flight.result = result
+        flight.error = error
+
+        with self._lock:
+            del self._flights[key]
+
+        flight.done.set()
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Run a function, or wait for the run of the same key in flight.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key of the call.
+        func : Callable[[], Any]
+            The function to run.
+
+        Returns
+        -------
+        Any
+            The result of the run, which must not be modified as it may be
+            shared.
+
+        Raises
+        ------
+        BaseException
+            The exception raised by the run.
+        """
+        flight, leader = self.start(key)
+
+        if not leader:
+            logger.info(f"Waiting for the run of {key} in flight.")
+            return flight.wait()
+
+        try:
+            result = func()
+
+        except BaseException as e:
+            self.finish(key, flight, error=e)
+            raise
+
+        self.finish(key, flight, result)
+
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """Give the usage statistics of the calls.
+
+        Returns
+        -------
+        Dict[str, int]
+            The number of calls, runs of the function, calls that shared
+            the run of another one, and runs in flight.
+        """
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "runs": self._runs,
+                "shared": self._shared,
+                "inFlight": len(self._flights),
+            }
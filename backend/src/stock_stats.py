@@ -18,20 +18,28 @@ __logger__ = "stocks_stats.py"
 #     Libs
 # =================================================================================================
 
-from typing import Dict
+import math
+import re
+from typing import Dict, List, Sequence
 
 import numpy as np
 import pandas as pd
 
 from dateutil.relativedelta import relativedelta
 
+TRADING_DAYS_PER_YEAR = 252
+# Regular session of the US exchanges, from 9:30 to 16:00
+TRADING_MINUTES_PER_DAY = 390
+
 
 # =================================================================================================
 #     Functions
 # =================================================================================================
 
 
-def evaluate_stats_information(data: pd.Series, symbol: str) -> Dict[str, float | str]:
+def evaluate_stats_information(
+    data: pd.Series, symbol: str, assume_sorted: bool = False, time_delta: str = "1day"
+) -> Dict[str, float | str]:
     """Gives several statistics about stock time-series.
 
     This function evaluates several statistics about a
@@ -40,14 +48,25 @@ def evaluate_stats_information(data: pd.Series, symbol: str) -> Dict[str, float
     - annualized cumulative return
     - annualized volatility
 
+    The data is sorted once for all the statistics, and the price one
+    year ago is found once for the annualized return and volatility.
+
     Parameters
     ----------
     data : pd.Series
-        The data, sorted in ascending time.
+        The data.
 
     symbol : str
         The stock symbol.
 
+    assume_sorted : bool, optional
+        If true, the data is known to be sorted in ascending time and
+        is not checked, by default False.
+
+    time_delta : str, optional
+        The interval between two points of the data, see
+        :func:`periods_per_year`, by default "1day".
+
     Returns
     -------
     Dict[str, float | str]
@@ -69,15 +88,28 @@ def evaluate_stats_information(data: pd.Series, symbol: str) -> Dict[str, float
     ...     ),
     ... )
     >>> evaluate_stats_information(data, "AAPL")
-    {'symbol': 'AAPL', 'cumulativeReturn': -40.0, 'annualizedCumulativeReturn': 200.0, 'annualizedVolatility': 2.41}
+    {'symbol': 'AAPL', 'cumulativeReturn': -40.0, 'annualizedCumulativeReturn': 200.0, 'annualizedVolatility': 2273.77}
 
     """
 
-    cumulative_return: float = evaluate_cumulative_return(data)
+    if not assume_sorted and not data.index.is_monotonic_increasing:
+        data = data.sort_index()
+
+    cumulative_return: float = evaluate_cumulative_return(data, assume_sorted=True)
+
+    one_year_ago = n_years_ago_position(data, n_years=1, assume_sorted=True)
 
-    annualized_cumulative_return = evaluate_annualized_return(data, n_years=1)
+    annualized_cumulative_return = evaluate_annualized_return(
+        data, n_years=1, assume_sorted=True, n_years_ago=one_year_ago
+    )
 
-    annualized_volatility: float = evaluate_annualized_volatility(data)
+    annualized_volatility: float = evaluate_annualized_volatility(
+        data,
+        n_years=1,
+        time_delta=time_delta,
+        assume_sorted=True,
+        n_years_ago=one_year_ago,
+    )
 
     json_stats: Dict[str, Dict[str, float | str]] = {
         "symbol": symbol,
@@ -89,7 +121,9 @@ def evaluate_stats_information(data: pd.Series, symbol: str) -> Dict[str, float
     return json_stats
 
 
-def evaluate_cumulative_return(data: pd.Series) -> float | str:
+def evaluate_cumulative_return(
+    data: pd.Series, assume_sorted: bool = False
+) -> float | str:
     """Evaluate the cumulative return of a series in percent.
 
     Lets write P_initial the initial value of our series,
@@ -102,6 +136,9 @@ def evaluate_cumulative_return(data: pd.Series) -> float | str:
     ----------
     data : pd.Series
         The data series of stock price.
+    assume_sorted : bool, optional
+        If true, the data is known to be sorted in ascending time and
+        is not checked, by default False.
 
     Returns
     -------
@@ -110,31 +147,135 @@ def evaluate_cumulative_return(data: pd.Series) -> float | str:
         If data is not long enough, return np.nan.
     """
 
-    if not data.index.is_monotonic_increasing:
+    if not assume_sorted and not data.index.is_monotonic_increasing:
         data = data.sort_index()
 
     if len(data) < 2:
         cumulative_return = "-"
 
     else:
-        cumulative_return: float = (data[-1] - data[-2]) / data[-2] * 100
+        cumulative_return: float = (data.iloc[-1] - data.iloc[-2]) / data.iloc[-2] * 100
         cumulative_return = float(f"{cumulative_return:.2f}")
 
     return cumulative_return
 
 
-def evaluate_annualized_return(data: pd.Series, n_years: int) -> float:
+def periods_per_year(time_delta: str) -> float:
+    """Give the number of data points in a year of trading.
+
+    Intraday points are counted over the regular session of
+    TRADING_MINUTES_PER_DAY minutes, the last point of a day being
+    possibly shorter, and days over TRADING_DAYS_PER_YEAR.
+
+    Parameters
+    ----------
+    time_delta : str
+        The interval between two points, e.g. "5min", "1h", "1day",
+        "1week" or "1month".
+
+    Returns
+    -------
+    float
+        The number of points per year.
+
+    Raises
+    ------
+    ValueError
+        If time_delta is not a known interval.
+
+    Examples
+    ----------
+
+    >>> periods_per_year("1day")
+    252.0
+    >>> periods_per_year("1h")
+    1764.0
+    >>> periods_per_year("1week")
+    52.0
+    """
+    match = re.fullmatch(r"([1-9][0-9]*)(min|h|day|week|month)", time_delta)
+    if match is None:
+        raise ValueError(f"{time_delta} is not a known interval.")
+
+    count, unit = int(match.group(1)), match.group(2)
+    if unit in ("min", "h"):
+        minutes = count * 60 if unit == "h" else count
+        points_per_day = math.ceil(TRADING_MINUTES_PER_DAY / minutes)
+        return float(points_per_day * TRADING_DAYS_PER_YEAR)
+
+    points_per_unit = {"day": TRADING_DAYS_PER_YEAR, "week": 52, "month": 12}[unit]
+    return points_per_unit / count
+
+
+def n_years_ago_position(
+    data: pd.Series, n_years: int, assume_sorted: bool = False
+) -> int:
+    """Find the position of the price n_years before the most recent one.
+
+    The position is the one of the last date up to n_years before the
+    most recent date, found by binary search in the dates.
+
+    Parameters
+    ----------
+    data : pd.Series
+        The data series of stock price.
+    n_years: int
+        The number of years to look back.
+    assume_sorted : bool, optional
+        If true, the data is known to be sorted in ascending time and
+        is not checked, by default False.
+
+    Returns
+    -------
+    int
+        The position in the sorted data, -1 if the data does not go
+        back n_years.
+
+    Examples
+    ----------
+
+    >>> data = pd.Series([1, 2, 3], index=pd.to_datetime([0, 300, 400], unit="d"))
+    >>> n_years_ago_position(data, n_years=1)
+    0
+    >>> n_years_ago_position(data, n_years=2)
+    -1
+    """
+    if not assume_sorted and not data.index.is_monotonic_increasing:
+        data = data.sort_index()
+
+    if data.empty:
+        return -1
+
+    n_years_ago_date = data.index[-1] - relativedelta(years=n_years)
+
+    return int(data.index.searchsorted(n_years_ago_date, side="right")) - 1
+
+
+def evaluate_annualized_return(
+    data: pd.Series,
+    n_years: int,
+    assume_sorted: bool = False,
+    n_years_ago: int | None = None,
+) -> float:
     """Evaluate the annualized return.
 
     The annualized return for n_years is
     ((1+ Rc) ^ (1/n_years)) - 1
 
+    The price n_years ago is found by binary search in the dates.
+
     Parameters
     ----------
     data : pd.Series
         The data series of stock price.
     n_years: int
         The number of years we want to calculate the return for.
+    assume_sorted : bool, optional
+        If true, the data is known to be sorted in ascending time and
+        is not checked, by default False.
+    n_years_ago : int | None, optional
+        The position of the price n_years ago in the sorted data, see
+        :func:`n_years_ago_position`, found if None, by default None.
 
     Returns
     -------
@@ -142,23 +283,24 @@ def evaluate_annualized_return(data: pd.Series, n_years: int) -> float:
         The annualized cumulative return.
         If data is not long enough, return np.nan.
     """
-    if not data.index.is_monotonic_increasing:
+    if not assume_sorted and not data.index.is_monotonic_increasing:
         data = data.sort_index()
 
-    most_recent_date = data.index[-1]
-    data_n_years_ago = data[
-        data.index <= (most_recent_date - relativedelta(years=n_years))
-    ]
+    if data.empty:
+        return "-"
+
+    if n_years_ago is None:
+        n_years_ago = n_years_ago_position(data, n_years, assume_sorted=True)
 
-    if data_n_years_ago.empty:
+    if n_years_ago < 0:
         # Stock price is not long enough to evaluate the annualized return for this n_years
         annualized_cumulative_return = "-"
 
     else:
-        stock_price_n_years_ago = data_n_years_ago[-1]
+        stock_price_n_years_ago = data.iloc[n_years_ago]
 
         cumulative_return: float = (
-            data[-1] - stock_price_n_years_ago
+            data.iloc[-1] - stock_price_n_years_ago
         ) / stock_price_n_years_ago
 
         annualized_cumulative_return = (
@@ -169,26 +311,487 @@ def evaluate_annualized_return(data: pd.Series, n_years: int) -> float:
     return annualized_cumulative_return
 
 
-# TODO: review this
-def evaluate_annualized_volatility(data: pd.Series, n_years: int = 1) -> float:
-    """Evaluate the annualized volatility.
+def align_series(series: Dict[str, pd.Series]) -> pd.DataFrame:
+    """Align stock time-series on the union of their dates.
+
+    Parameters
+    ----------
+    series : Dict[str, pd.Series]
+        The data of each stock symbol, indexed by datetime without duplicates.
+
+    Returns
+    -------
+    pd.DataFrame
+        The data, one column per stock symbol, sorted in ascending time.
+        Dates a series has no data for are NaN.
+
+    Examples
+    ----------
+
+    >>> align_series(
+    ...     {
+    ...         "AAPL": pd.Series([1.0, 2.0], index=pd.to_datetime([1, 2], unit="d")),
+    ...         "MSFT": pd.Series([3.0], index=pd.to_datetime([0], unit="d")),
+    ...     }
+    ... )
+                AAPL  MSFT
+    1970-01-01   NaN   3.0
+    1970-01-02   1.0   NaN
+    1970-01-03   2.0   NaN
+    """
+    if not series:
+        return pd.DataFrame()
+
+    dates = pd.DatetimeIndex(
+        np.unique(
+            np.concatenate([timeseries.index.values for timeseries in series.values()])
+        )
+    )
+
+    values = np.full((len(dates), len(series)), np.nan)
+    for column, timeseries in enumerate(series.values()):
+        values[dates.searchsorted(timeseries.index), column] = timeseries.to_numpy(
+            dtype="float64"
+        )
+
+    return pd.DataFrame(values, index=dates, columns=list(series))
+
+
+def evaluate_stats_information_batch(
+    data: pd.DataFrame, time_delta: str = "1day"
+) -> List[Dict[str, float | str]]:
+    """Gives the statistics of several stock time-series at once.
+
+    The statistics are the ones of :func:`evaluate_stats_information`,
+    evaluated for all the series in a few vectorized passes instead of
+    one call per series. Missing values are taken as no data point, so
+    that series of different dates can be aligned in one DataFrame.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The data, one column per stock symbol, indexed by datetime.
+    time_delta : str, optional
+        The interval between two points of the data, see
+        :func:`periods_per_year`, by default "1day".
+
+    Returns
+    -------
+    List[Dict[str, float | str]]
+        The result dicts, in the order of the columns.
+
+    Examples
+    ----------
+
+    >>> data = pd.DataFrame(
+    ...     {"AAPL": [1, 5, 7, 2, 3], "MSFT": [np.nan, np.nan, 1, 2, np.nan]},
+    ...     index=pd.to_datetime([0, 7, 3, 4, 365], unit="d"),
+    ... )
+    >>> evaluate_stats_information_batch(data)[0]
+    {'symbol': 'AAPL', 'cumulativeReturn': -40.0, 'annualizedCumulativeReturn': 200.0, 'annualizedVolatility': 2273.77}
+    >>> evaluate_stats_information_batch(data)[1]
+    {'symbol': 'MSFT', 'cumulativeReturn': 100.0, 'annualizedCumulativeReturn': '-', 'annualizedVolatility': nan}
+    """
+    if data.empty:
+        return [
+            {
+                "symbol": symbol,
+                "cumulativeReturn": "-",
+                "annualizedCumulativeReturn": "-",
+                "annualizedVolatility": np.nan,
+            }
+            for symbol in data.columns
+        ]
+
+    if not data.index.is_monotonic_increasing:
+        data = data.sort_index()
+
+    # One row per symbol, so that each reduction runs on contiguous values
+    values = data.to_numpy(dtype="float64").T
+    symbols = np.arange(values.shape[0])
+    dates = np.arange(values.shape[1])
+    valid = ~np.isnan(values)
+
+    # Date of the last value up to each date, -1 before the first value
+    last_valid = np.maximum.accumulate(np.where(valid, dates, -1), axis=1)
+    last = last_valid[:, -1]
+    previous = np.where(last >= 1, last_valid[symbols, np.maximum(last - 1, 0)], -1)
+
+    # Date of the last value one year before the most recent one
+    year_ago_dates = data.index[np.maximum(last, 0)] - pd.DateOffset(years=1)
+    year_ago = data.index.searchsorted(year_ago_dates, side="right") - 1
+    year_ago = np.where(year_ago >= 0, last_valid[symbols, np.maximum(year_ago, 0)], -1)
+
+    # The volatility starts one year ago, or at the first value if none
+    first = np.argmax(valid, axis=1)
+    year_start = np.where(year_ago >= 0, year_ago, first)
+    # Date of the value each return is taken from, -1 for none
+    return_from = np.concatenate(
+        [np.full((len(symbols), 1), -1), last_valid[:, :-1]], axis=1
+    )
+    in_year = valid & (return_from >= year_start[:, None])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        last_price = values[symbols, last]
+        previous_price = values[symbols, previous]
+        cumulative_returns = (last_price - previous_price) / previous_price * 100
+
+        # Computed as evaluate_annualized_return does for one year
+        year_ago_price = values[symbols, year_ago]
+        year_returns = (last_price - year_ago_price) / year_ago_price
+        annualized_returns = ((1 + year_returns) - 1) * 100
+
+        # Sample standard deviation of the log returns over the last year
+        log_values = np.log(values)
+        log_returns = log_values - log_values[symbols[:, None], return_from]
+        counts = in_year.sum(axis=1)
+        means = np.where(in_year, log_returns, 0).sum(axis=1) / counts
+        squares = np.where(in_year, log_returns - means[:, None], 0) ** 2
+        scale = math.sqrt(periods_per_year(time_delta)) * 100
+        volatilities = np.sqrt(squares.sum(axis=1) / (counts - 1)) * scale
+        volatilities = np.where(counts > 1, volatilities, np.nan)
+
+    return [
+        {
+            "symbol": symbol,
+            "cumulativeReturn": (
+                float(f"{cumulative_return:.2f}") if has_previous else "-"
+            ),
+            "annualizedCumulativeReturn": (
+                float(f"{annualized_return:.2f}") if has_year_ago else "-"
+            ),
+            "annualizedVolatility": float(f"{volatility:.2f}"),
+        }
+        for (
+            symbol,
+            cumulative_return,
+            has_previous,
+            annualized_return,
+            has_year_ago,
+            volatility,
+        ) in zip(
+            data.columns,
+            cumulative_returns.tolist(),
+            (previous >= 0).tolist(),
+            annualized_returns.tolist(),
+            (year_ago >= 0).tolist(),
+            volatilities.tolist(),
+        )
+    ]
+
+
+def evaluate_annualized_volatility(
+    data: pd.Series,
+    n_years: int = 1,
+    time_delta: str = "1day",
+    assume_sorted: bool = False,
+    n_years_ago: int | None = None,
+) -> float:
+    """Evaluate the annualized volatility in percent.
+
+    The annualized volatility is the sample standard deviation of the
+    log returns over the last n_years, from the price n_years ago as for
+    :func:`evaluate_annualized_return`, scaled by the square root of the
+    number of points per year. If the data does not go back n_years,
+    all of it is used. Missing values are taken as no data point.
 
     Parameters
     ----------
     data : pd.Series
-        The data.
+        The data series of stock price.
     n_years: int
         The number of years we want to calculate the volatility for.
+    time_delta : str, optional
+        The interval between two points of the data, see
+        :func:`periods_per_year`, by default "1day".
+    assume_sorted : bool, optional
+        If true, the data is known to be sorted in ascending time and
+        is not checked, by default False.
+    n_years_ago : int | None, optional
+        The position of the price n_years ago in the sorted data, see
+        :func:`n_years_ago_position`, found if None, by default None.
 
     Returns
     -------
     float
         The annualized volatility.
+        If there are less than two returns, return np.nan.
+
+    Examples
+    ----------
+
+    >>> data = pd.Series(
+    ...     [100, 110, 100, 110], index=pd.to_datetime([0, 1, 2, 3], unit="d")
+    ... )
+    >>> evaluate_annualized_volatility(data)
+    174.71
+    >>> evaluate_annualized_volatility(data, time_delta="1week")
+    79.36
     """
+    if not assume_sorted and not data.index.is_monotonic_increasing:
+        data = data.sort_index()
+
+    if n_years_ago is None:
+        n_years_ago = n_years_ago_position(data, n_years, assume_sorted=True)
 
-    annualized_volatility: float = (
-        data[data.index >= data.index[-1] - relativedelta(years=1)]
-    ).std()
+    prices = data.to_numpy(dtype="float64")[max(n_years_ago, 0) :]
+    prices = prices[~np.isnan(prices)]
+    if len(prices) < 3:
+        return np.nan
+
+    log_returns = np.diff(np.log(prices))
+    scale = math.sqrt(periods_per_year(time_delta)) * 100
+    annualized_volatility: float = log_returns.std(ddof=1) * scale
     annualized_volatility = float(f"{annualized_volatility:.2f}")
 
     return annualized_volatility
+
+
+def evaluate_rolling_analytics(
+    data: pd.Series, window: int, assume_sorted: bool = False
+) -> pd.DataFrame:
+    """Evaluate rolling analytics of a stock time-series.
+
+    The analytics are evaluated over the last window points at each
+    date, with the rolling kernels of pandas:
+    - sma: simple moving average of the price
+    - ema: exponential moving average of the price, of span window
+    - volatility: standard deviation of the log returns, in percent
+    - sharpe: mean over standard deviation of the log returns, with a
+      risk free rate of zero
+    - drawdown: decline of the price from its highest value, in percent
+
+    Volatility and Sharpe ratio are given per point, not annualized.
+    The first points, without enough history, are NaN.
+
+    Parameters
+    ----------
+    data : pd.Series
+        The data series of stock price.
+    window : int
+        The number of points of the rolling window, at least 2.
+    assume_sorted : bool, optional
+        If true, the data is known to be sorted in ascending time and
+        is not checked, by default False.
+
+    Returns
+    -------
+    pd.DataFrame
+        The analytics, one column each, indexed as the sorted data.
+
+    Raises
+    ------
+    ValueError
+        If window is lower than 2.
+
+    Examples
+    ----------
+
+    >>> data = pd.Series(
+    ...     [1.0, 2.0, 4.0, 2.0], index=pd.to_datetime([0, 1, 2, 3], unit="d")
+    ... )
+    >>> evaluate_rolling_analytics(data, window=2)[["sma", "ema", "drawdown"]]
+                sma       ema  drawdown
+    1970-01-01  NaN  1.000000       0.0
+    1970-01-02  1.5  1.666667       0.0
+    1970-01-03  3.0  3.222222       0.0
+    1970-01-04  3.0  2.407407     -50.0
+    """
+    if window < 2:
+        raise ValueError(f"window should be at least 2, got {window}.")
+
+    if not assume_sorted and not data.index.is_monotonic_increasing:
+        data = data.sort_index()
+
+    data = data.astype("float64")
+    log_returns = np.log(data).diff()
+    returns_mean = log_returns.rolling(window).mean()
+    returns_std = log_returns.rolling(window).std()
+
+    return pd.DataFrame(
+        {
+            "sma": data.rolling(window).mean(),
+            "ema": data.ewm(span=window, adjust=False).mean(),
+            "volatility": returns_std * 100,
+            "sharpe": returns_mean / returns_std,
+            "drawdown": (data / data.rolling(window, min_periods=1).max() - 1) * 100,
+        }
+    )
+
+
+def evaluate_max_drawdown(data: pd.Series, assume_sorted: bool = False) -> float | str:
+    """Evaluate the maximum drawdown in percent.
+
+    The maximum drawdown is the largest decline of the price from its
+    highest previous value.
+
+    Parameters
+    ----------
+    data : pd.Series
+        The data series of stock price.
+    assume_sorted : bool, optional
+        If true, the data is known to be sorted in ascending time and
+        is not checked, by default False.
+
+    Returns
+    -------
+    float | str
+        The maximum drawdown, as a negative percentage.
+        If data is empty, return "-".
+
+    Examples
+    ----------
+
+    >>> data = pd.Series(
+    ...     [1, 4, 2, 3, 1], index=pd.to_datetime([0, 1, 2, 3, 4], unit="d")
+    ... )
+    >>> evaluate_max_drawdown(data)
+    -75.0
+    """
+    if not assume_sorted and not data.index.is_monotonic_increasing:
+        data = data.sort_index()
+
+    if data.empty:
+        return "-"
+
+    max_drawdown: float = ((data / data.cummax()).min() - 1) * 100
+
+    return float(f"{max_drawdown:.2f}")
+
+
+def evaluate_returns_correlation(
+    data: pd.DataFrame, min_periods: int = 2
+) -> Dict[str, pd.DataFrame]:
+    """Evaluate the correlation and covariance matrices of stock returns.
+
+    The returns are the log returns of each series between its own
+    consecutive values, missing values being taken as no data point.
+    Each pair of series is compared on the dates both have a return, all
+    the pairs at once with matrix products.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The data, one column per stock symbol, indexed by datetime.
+    min_periods : int, optional
+        The minimum number of common returns of a pair, below which its
+        correlation and covariance are NaN, by default 2.
+
+    Returns
+    -------
+    Dict[str, pd.DataFrame]
+        The correlation and covariance matrices of the returns, and the
+        number of common returns of each pair (observations), indexed by
+        symbol in both directions.
+
+    Examples
+    ----------
+
+    >>> data = pd.DataFrame(
+    ...     {"AAPL": [1, 2, 4, 2], "MSFT": [3, 6, 12, 6], "GOOG": [1, 1, 1, np.nan]},
+    ...     index=pd.to_datetime([0, 1, 2, 3], unit="d"),
+    ... )
+    >>> evaluate_returns_correlation(data)["correlation"]
+          AAPL  MSFT  GOOG
+    AAPL   1.0   1.0   NaN
+    MSFT   1.0   1.0   NaN
+    GOOG   NaN   NaN   NaN
+    >>> evaluate_returns_correlation(data)["observations"]
+          AAPL  MSFT  GOOG
+    AAPL     3     3     2
+    MSFT     3     3     2
+    GOOG     2     2     2
+    """
+    if not data.index.is_monotonic_increasing:
+        data = data.sort_index()
+
+    prices = data.to_numpy(dtype="float64")
+    previous_prices = data.ffill().shift(1).to_numpy(dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.log(prices / previous_prices)
+
+    valid = ~np.isnan(returns)
+    counts = valid.sum(axis=0)
+
+    # Centered on the mean of each series, to limit cancellation
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.where(valid, returns, 0).sum(axis=0) / counts
+    centered = np.where(valid, returns - means, 0)
+    weights = valid.astype("float64")
+
+    # Sums over the dates both series of a pair have a return
+    observations = weights.T @ weights
+    sums = centered.T @ weights
+    squares = (centered * centered).T @ weights
+    products = centered.T @ centered
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = (products - sums * sums.T / observations) / (observations - 1)
+        variances = (squares - sums * sums / observations) / (observations - 1)
+        correlation = covariance / np.sqrt(variances * variances.T)
+
+    not_enough = observations < max(min_periods, 2)
+    covariance[not_enough] = np.nan
+    correlation[not_enough] = np.nan
+    correlation = np.clip(correlation, -1, 1)
+    diagonal = np.diag_indices_from(correlation)
+    correlation[diagonal] = np.where(np.isnan(correlation[diagonal]), np.nan, 1.0)
+
+    symbols = data.columns
+    return {
+        "correlation": pd.DataFrame(correlation, index=symbols, columns=symbols),
+        "covariance": pd.DataFrame(covariance, index=symbols, columns=symbols),
+        "observations": pd.DataFrame(
+            observations.astype("int64"), index=symbols, columns=symbols
+        ),
+    }
+
+
+def evaluate_portfolio_value(data: pd.DataFrame, weights: Sequence[float]) -> pd.Series:
+    """Evaluate the value of a portfolio of stocks bought at the same date.
+
+    The prices are forward filled across the dates a stock is not
+    traded (e.g. the holidays of its exchange), and the portfolio starts
+    at the first date all the stocks have a price. Its value is the
+    weighted sum of the prices relative to that date, without
+    rebalancing.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The data, one column per stock symbol, indexed by datetime.
+    weights : Sequence[float]
+        The weight of each stock symbol at the start of the portfolio,
+        normalized by their sum.
+
+    Returns
+    -------
+    pd.Series
+        The value of the portfolio, starting at 100, sorted in ascending time.
+
+    Examples
+    ----------
+
+    >>> data = pd.DataFrame(
+    ...     {"AAPL": [np.nan, 1, 2, 4], "MSFT": [4, 4, np.nan, 2]},
+    ...     index=pd.to_datetime([0, 1, 2, 3], unit="d"),
+    ... )
+    >>> evaluate_portfolio_value(data, [3, 1])
+    1970-01-02    100.0
+    1970-01-03    175.0
+    1970-01-04    312.5
+    dtype: float64
+    """
+    if not data.index.is_monotonic_increasing:
+        data = data.sort_index()
+
+    data = data.ffill().dropna()
+    prices = data.to_numpy(dtype="float64")
+    weights = np.asarray(weights, dtype="float64")
+
+    if len(prices) == 0:
+        return pd.Series([], index=data.index, dtype="float64")
+
+    values = prices / prices[0] @ (weights / weights.sum()) * 100
+
+    return pd.Series(values, index=data.index)
@@ -20,8 +20,8 @@ __logger__ = "utils.py"
 
 import json
 from typing import List
-from copy import deepcopy
 
+import numpy as np
 import pandas as pd
 
 # =================================================================================================
@@ -46,7 +46,22 @@ def read_twelvedata_api_config_file(file_path: str):
 
     >>> import pprint
     >>> pprint.pprint((read_twelvedata_api_config_file("config/twelvedata_api_info.json")))
-    {'market_keys': {'code',
+    {'credit_scheduler': {'interactive_max_wait': 10,
+                          'plans': {'Basic': {'per_day': 800, 'per_minute': 8},
+                                    'Enterprise': {'per_day': None,
+                                                   'per_minute': 10946},
+                                    'Grow': {'per_day': None, 'per_minute': 55},
+                                    'Pro': {'per_day': None, 'per_minute': 610},
+                                    'Ultra': {'per_day': None,
+                                              'per_minute': 2584}}},
+     'http_client': {'backoff_factor': 0.5,
+                     'connect_timeout': 3.05,
+                     'max_retries': 3,
+                     'pool_connections': 4,
+                     'pool_maxsize': 10,
+                     'read_timeout': 30,
+                     'retry_status_codes': [500, 502, 503, 504]},
+     'market_keys': {'code',
                      'country',
                      'is_market_open',
                      'name',
@@ -54,7 +69,10 @@ def read_twelvedata_api_config_file(file_path: str):
                      'time_to_close',
                      'time_to_open'},
      'market_url': 'https://api.twelvedata.com/market_state',
+     'response_cache': {'directory': 'cache/twelvedata_api',
+                        'ttl': {'market_url': 60, 'symbols_url': 86400}},
      'symbols_url': 'https://api.twelvedata.com/stocks',
+     'timeseries_batch_size': 120,
      'timeseries_meta_keys': {'currency',
                               'exchange',
                               'exchange_timezone',
@@ -89,9 +107,133 @@ def read_twelvedata_api_config_file(file_path: str):
     return res
 
 
+def parse_datetime(value: str) -> pd.Timestamp:
+    """Parse a datetime query parameter.
+
+    The value is either a date or datetime string, or milliseconds since
+    epoch as given in the timeseries sent to the frontend. Both are read
+    as naive datetimes, in the timezone of the stored bars.
+
+    Parameters
+    ----------
+    value : str
+        The parameter value.
+
+    Returns
+    -------
+    pd.Timestamp
+        The naive datetime.
+
+    Raises
+    ------
+    ValueError
+        If the value is not a datetime or has a timezone.
+
+    Examples
+    ----------
+    >>> parse_datetime("2023-01-02 09:30")
+    Timestamp('2023-01-02 09:30:00')
+    >>> parse_datetime("1672651800000")
+    Timestamp('2023-01-02 09:30:00')
+    >>> parse_datetime("yesterday")
+    Traceback (most recent call last):
+        ...
+    ValueError: yesterday is not a datetime.
+    """
+    try:
+        if value.lstrip("-").isdigit():
+            timestamp = pd.Timestamp(int(value), unit="ms")
+        else:
+            timestamp = pd.Timestamp(value)
+
+    except (ValueError, OverflowError):
+        timestamp = pd.NaT
+
+    if timestamp is pd.NaT:
+        raise ValueError(f"{value} is not a datetime.")
+
+    if timestamp.tzinfo is not None:
+        raise ValueError(f"{value} should not have a timezone.")
+
+    return timestamp
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Select the points to keep with Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept, the others are split in
+    max_points - 2 buckets. In each bucket, the point kept is the one
+    forming the largest triangle with the point kept in the previous
+    bucket and the average point of the next bucket, which keeps the
+    peaks and the shape of the line.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        The x values, in ascending order.
+    y : np.ndarray
+        The y values. Points with a NaN value are only kept if their
+        whole bucket is NaN.
+    max_points : int
+        The number of points to keep, at least 3.
+
+    Returns
+    -------
+    np.ndarray
+        The indices of the kept points, in ascending order.
+
+    Examples
+    ----------
+    >>> x = np.arange(8, dtype=float)
+    >>> y = np.array([0, 1, 0, 0, 5, 0, 1, 0], dtype=float)
+    >>> lttb_indices(x, y, 4)
+    array([0, 3, 4, 7])
+    """
+    n_points = len(x)
+    if max_points >= n_points:
+        return np.arange(n_points)
+
+    if max_points < 3:
+        raise ValueError(f"max_points should be at least 3, got {max_points}.")
+
+    # Bucket i is edges[i]:edges[i + 1], the last point is its own bucket
+    edges = np.linspace(1, n_points - 1, max_points - 1).astype(np.int64)
+    edges = np.append(edges, n_points)
+    bucket_sizes = np.diff(edges)
+    means_x = np.add.reduceat(x, edges[:-1]) / bucket_sizes
+    means_y = np.add.reduceat(y, edges[:-1]) / bucket_sizes
+
+    indices = np.empty(max_points, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n_points - 1
+
+    # Each bucket depends on the point kept in the previous one
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_x, next_y = means_x[bucket + 1], means_y[bucket + 1]
+
+        # Twice the triangle areas, with the previous point as origin
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        best = int(np.argmax(areas))
+        if np.isnan(areas[best]):
+            areas[np.isnan(areas)] = -1
+            best = int(np.argmax(areas))
+
+        previous = start + best
+        indices[bucket + 1] = previous
+
+    return indices
+
+
 def series_to_apexcharts(
     timeseries: pd.Series | None,
     performance: bool = True,
+    max_points: int | None = None,
+    decimals: int = 2,
 ) -> List[List[int | float]]:
     """Format data to send to the frontend.
 
@@ -105,6 +247,11 @@ def series_to_apexcharts(
     performance : bool, optional
         If true, transforms data to create performance data, by
         default True
+    max_points : int | None, optional
+        If given, the series is downsampled to this number of
+        points with :func:`lttb_indices`, by default None
+    decimals : int, optional
+        The number of decimals the values are rounded to, by default 2
 
     Returns
     -------
@@ -125,24 +272,48 @@ def series_to_apexcharts(
     [[1672531200000, 3.0], [1672704000000, 1.0], [1672617600000, 2.0]]
     >>> series_to_apexcharts(timeseries, performance = True)
     [[1672531200000, 100.0], [1672704000000, 33.33], [1672617600000, 66.67]]
+    >>> series_to_apexcharts(timeseries.sort_index(), performance = False, max_points = 2)
+    Traceback (most recent call last):
+    ...
+    ValueError: max_points should be at least 3, got 2.
     """
 
-    result = deepcopy(timeseries)
-
-    if timeseries is None:
-        result = []
+    if timeseries is None or timeseries.empty:
+        return []
 
+    # Epoch in ms, as int(index.timestamp() * 1000) for whole seconds
+    epochs = pd.DatetimeIndex(timeseries.index).as_unit("ns").asi8
+    if np.all(epochs % 10**9 == 0):
+        epochs_ms = epochs // 10**6
     else:
-        result = [
-            [
-                int(index.timestamp() * 1000),
-                (
-                    float(f"{value / result[0] * 100:.2f}")
-                    if performance
-                    else float(f"{value:.2f}")
-                ),
-            ]
-            for index, value in result.items()
-        ]
-
-    return result
+        epochs_ms = np.array(
+            [int(index.timestamp() * 1000) for index in timeseries.index],
+            dtype=np.int64,
+        )
+
+    values = timeseries.to_numpy(dtype=np.float64)
+    if performance:
+        values = values / values[0] * 100
+
+    if max_points is not None and max_points < len(values):
+        indices = lttb_indices(epochs_ms.astype(np.float64), values, max_points)
+        epochs_ms = epochs_ms[indices]
+        values = values[indices]
+
+    rounded_values = np.round(values, decimals)
+
+    # Round as float(f"{value:.2f}") where the scaling by 100 of np.round may
+    # fall on the other side of a half, or is not exact
+    scaled_values = values * 10**decimals
+    with np.errstate(invalid="ignore"):
+        unsure = ~(
+            (np.abs(np.abs(scaled_values - np.trunc(scaled_values)) - 0.5) > 1e-6)
+            & (np.abs(scaled_values) < 2**52)
+        )
+    for i in np.flatnonzero(unsure):
+        rounded_values[i] = float(f"{values[i]:.{decimals}f}")
+
+    return [
+        [epoch_ms, value]
+        for epoch_ms, value in zip(epochs_ms.tolist(), rounded_values.tolist())
+    ]
@@ -0,0 +1,358 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""test_app.py: tests
+
+Contains route level tests for app.py, with Twelve Data API mocked"""
+
+__author__ = "Paul Rémondeau"
+__copyright__ = "Paul Rémondeau"
+__version__ = "1.0.0"
+__maintainer__ = "Paul Rémondeau"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Production"
+
+# ===============================
+#  Libs
+# ===============================
+
+
+import pytest
+
+import os
+import sys
+import types
+import urllib.parse
+
+import numpy as np
+import pandas as pd
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(parent)
+
+try:
+    from config import API_KEY
+except ImportError:
+    # backend/config.py is not versioned (see README), the tests give their
+    # own configuration to create_app anyway
+    config = types.ModuleType("config")
+    config.API_KEY = "foo"
+    config.API_PLAN = "Basic"
+    config.FRONTEND_URL = "http://localhost:8080"
+    sys.modules["config"] = config
+
+import app as backend
+from src import request_twelvedata_api
+from src.credit_scheduler import CreditScheduler
+from src.refresh_scheduler import RefreshScheduler
+from src.response_cache import ResponseCache
+
+# ===============================
+#  Fixtures
+# ===============================
+
+
+def make_values(closes, start="2023-01-02"):
+    """Values of a Twelve Data API daily timeseries, most recent first."""
+    dates = pd.bdate_range(start, periods=len(closes))
+    return [
+        {
+            "datetime": date.strftime("%Y-%m-%d"),
+            "open": f"{close:.5f}",
+            "high": f"{close:.5f}",
+            "low": f"{close:.5f}",
+            "close": f"{close:.5f}",
+            "volume": "1000",
+        }
+        for date, close in zip(dates, closes)
+    ][::-1]
+
+
+@pytest.fixture
+def twelvedata_values():
+    # Values served by the mocked Twelve Data API for each symbol
+    rng = np.random.default_rng(0)
+    return {
+        symbol: make_values(100 * np.cumprod(1 + rng.normal(0, 0.01, 30)))
+        for symbol in ["AAPL", "MSFT", "GOOG"]
+    }
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path, requests_mock, twelvedata_values):
+    app = backend.create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(tmp_path / "db.sqlite"),
+            "API_KEY": "foo",
+            "API_PLAN": "Basic",
+            "FRONTEND_URL": "http://localhost:8080",
+            "LOG_CONFIG_FILE": None,
+        }
+    )
+
+    # Tests should not wait for API credits, nor share cached responses or jobs
+    monkeypatch.setattr(
+        request_twelvedata_api, "credit_scheduler", CreditScheduler(per_minute=1000)
+    )
+    monkeypatch.setattr(
+        request_twelvedata_api, "response_cache", ResponseCache(str(tmp_path), {})
+    )
+    monkeypatch.setattr(backend, "refresh_scheduler", RefreshScheduler())
+    for cache in [
+        backend.stats_cache,
+        backend.analytics_cache,
+        backend.correlation_cache,
+        backend.portfolio_cache,
+    ]:
+        cache.invalidate()
+
+    def timeseries(request, context):
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(request.url).query)
+        symbol = query["symbol"][0]
+        if symbol not in twelvedata_values:
+            return {"status": "error", "code": 400, "message": f"{symbol} not found"}
+
+        return {
+            "meta": {
+                "symbol": symbol,
+                "interval": "1day",
+                "currency": "USD",
+                "exchange_timezone": "America/New_York",
+                "exchange": "NASDAQ",
+                "mic_code": "XNAS",
+                "type": "Common Stock",
+            },
+            "values": twelvedata_values[symbol],
+            "status": "ok",
+        }
+
+    config = request_twelvedata_api.load_twelvedata_api_config()
+    requests_mock.get(config["timeseries_url"], json=timeseries)
+
+    with app.app_context():
+        # The stored bars are old, so a refresh is requested while NASDAQ is open
+        backend.db.session.add(
+            backend.MarketState(
+                exchange="NASDAQ",
+                country="United States",
+                isMarketOpen=True,
+                timeToOpen="0",
+                timeToClose="1",
+                dateCheck=0,
+            )
+        )
+        backend.db.session.commit()
+
+    return app.test_client()
+
+
+def create_symbols(client, *symbols):
+    for symbol in symbols:
+        response = client.post("/symbols", json={"symbol": symbol, "timeDelta": "1day"})
+        assert response.status_code == 201
+
+
+# ===============================
+#  Tests
+# ===============================
+
+
+def test_get_symbol(client, twelvedata_values):
+    # region Should answer 204 if the symbol is not stored
+    response = client.get("/symbols/AAPL?timeDelta=1day&performance=false")
+    assert response.status_code == 204
+    # endregion
+
+    # region Should give the timeseries and stats with an ETag
+    create_symbols(client, "AAPL")
+
+    response = client.get("/symbols/AAPL?timeDelta=1day&performance=false")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "no-cache"
+    etag = response.headers["ETag"]
+
+    timeseries = response.json["timeseries"]
+    assert len(timeseries) == 30
+    assert timeseries[-1][1] == round(float(twelvedata_values["AAPL"][0]["close"]), 2)
+    assert response.json["stats"]["symbol"] == "AAPL"
+    # endregion
+
+    # region Should answer 304 if the data did not change
+    response = client.get(
+        "/symbols/AAPL?timeDelta=1day&performance=false",
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == 304
+    assert response.data == b""
+    # endregion
+
+    # region Should drop the stored payload when a refresh stores new bars
+    twelvedata_values["AAPL"] = make_values([50.0], start="2023-02-13") + (
+        twelvedata_values["AAPL"]
+    )
+    response = client.put("/symbols/AAPL?timeDelta=1day")
+    assert response.status_code == 200
+
+    response = client.get(
+        "/symbols/AAPL?timeDelta=1day&performance=false",
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.json["timeseries"]) == 31
+    assert response.json["timeseries"][-1][1] == 50.0
+    # endregion
+
+
+def test_get_symbol_window(client):
+    create_symbols(client, "AAPL")
+    url = "/symbols/AAPL?timeDelta=1day&performance=false"
+
+    # region Should walk through the pages with the cursor
+    pages = []
+    response = client.get(f"{url}&limit=12")
+    while True:
+        assert response.status_code == 200
+        pages.append(response.json["timeseries"])
+        cursor = response.json["nextCursor"]
+        if cursor is None:
+            break
+
+        assert cursor == pages[-1][0][0]
+        response = client.get(f"{url}&limit=12&cursor={cursor}")
+
+    assert [len(page) for page in pages] == [12, 12, 6]
+    dates = [point[0] for page in reversed(pages) for point in page]
+    assert dates == sorted(set(dates))
+    # endregion
+
+    # region Should read a time range
+    response = client.get(f"{url}&start=2023-01-09&end=2023-01-13")
+    assert response.status_code == 200
+    assert len(response.json["timeseries"]) == 5
+    assert "nextCursor" not in response.json
+
+    response = client.get(f"{url}&start=2023-01-09&end=2023-01-13&limit=3")
+    assert len(response.json["timeseries"]) == 3
+    assert response.json["nextCursor"] == response.json["timeseries"][0][0]
+    # endregion
+
+    # region Should answer 400 if a parameter is not valid
+    for query in ["limit=0", "limit=foo", "start=foo", "cursor=foo"]:
+        response = client.get(f"{url}&{query}")
+        assert response.status_code == 400
+        assert "message" in response.json
+    # endregion
+
+
+def test_get_symbol_analytics(client):
+    url = "/symbols/AAPL/analytics?timeDelta=1day"
+
+    # region Should answer 204 if the symbol is not stored
+    assert client.get(url).status_code == 204
+    # endregion
+
+    # region Should give the rolling analytics of the requested metrics
+    create_symbols(client, "AAPL")
+
+    response = client.get(f"{url}&window=5&metrics=sma,volatility")
+    assert response.status_code == 200
+    assert response.json["symbol"] == "AAPL"
+    assert response.json["window"] == 5
+    assert "ema" not in response.json
+    assert len(response.json["sma"]) == 26
+    assert len(response.json["volatility"]) == 25
+    assert response.json["maxDrawdown"] <= 0
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert all(metric in response.json for metric in backend.ANALYTICS_METRICS)
+    # endregion
+
+    # region Should answer 400 if a parameter is not valid
+    for query in ["window=1", "maxPoints=2", "metrics=sma,foo"]:
+        response = client.get(f"{url}&{query}")
+        assert response.status_code == 400
+        assert "message" in response.json
+    # endregion
+
+
+def test_get_symbols_correlation(client, twelvedata_values):
+    create_symbols(client, "AAPL", "MSFT", "GOOG")
+    url = "/symbols-correlation?timeDelta=1day"
+
+    # region Should give the matrices of all the stored symbols
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.json["symbols"] == ["AAPL", "GOOG", "MSFT"]
+    assert np.allclose(np.diag(response.json["correlation"]), 1)
+    assert response.json["observations"] == [[29] * 3] * 3
+    # endregion
+
+    # region Should keep the order of the requested symbols
+    response = client.get(f"{url}&symbols=MSFT,AAPL&start=2023-01-09&end=2023-01-13")
+    assert response.status_code == 200
+    assert response.json["symbols"] == ["MSFT", "AAPL"]
+    assert response.json["observations"] == [[4, 4], [4, 4]]
+
+    response = client.get(f"{url}&symbols=MSFT,AAPL&minPeriods=30")
+    assert response.json["correlation"] == [[None, None], [None, None]]
+    # endregion
+
+    # region Should evaluate the matrices again once new bars are stored
+    twelvedata_values["AAPL"] = make_values([50.0], start="2023-02-13") + (
+        twelvedata_values["AAPL"]
+    )
+    assert client.put("/symbols/AAPL?timeDelta=1day").status_code == 200
+
+    response = client.get(f"{url}&symbols=MSFT,AAPL")
+    assert response.json["observations"] == [[29, 29], [29, 30]]
+    # endregion
+
+    # region Should answer 400 if a parameter is not valid
+    for query in ["symbols=AAPL,FOO", "minPeriods=1", "start=foo"]:
+        response = client.get(f"{url}&{query}")
+        assert response.status_code == 400
+        assert "message" in response.json
+    # endregion
+
+
+def test_get_portfolio(client):
+    create_symbols(client, "AAPL", "MSFT")
+    url = "/portfolio?timeDelta=1day"
+
+    # region Should give the value and stats of the weighted portfolio
+    response = client.get(f"{url}&symbols=AAPL,MSFT&weights=3,1&name=Tech")
+    assert response.status_code == 200
+    assert response.json["symbols"] == ["AAPL", "MSFT"]
+    assert response.json["weights"] == [0.75, 0.25]
+    assert len(response.json["timeseries"]) == 30
+    assert response.json["stats"]["symbol"] == "Tech"
+
+    response = client.get(f"{url}&symbols=AAPL,MSFT&maxPoints=10")
+    assert response.status_code == 200
+    assert response.json["weights"] == [0.5, 0.5]
+    assert len(response.json["timeseries"]) == 10
+
+    response = client.get(f"{url}&symbols=AAPL&start=2023-01-09&end=2023-01-13")
+    assert len(response.json["timeseries"]) == 5
+    # endregion
+
+    # region Should answer 400 if the symbols or weights are not valid
+    for query in [
+        "",
+        "symbols=AAPL,AAPL",
+        "symbols=AAPL,FOO",
+        "symbols=AAPL,MSFT&weights=1",
+        "symbols=AAPL,MSFT&weights=1,-1",
+        "symbols=AAPL,MSFT&weights=0,0",
+        "symbols=AAPL,MSFT&weights=foo,1",
+        "symbols=AAPL,MSFT&maxPoints=2",
+        "symbols=AAPL,MSFT&start=foo",
+    ]:
+        response = client.get(f"{url}&{query}")
+        assert response.status_code == 400
+        assert "message" in response.json
+    # endregion
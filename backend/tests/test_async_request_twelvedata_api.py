@@ -0,0 +1,340 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""test_async_request_twelvedata_api.py: tests
+
+Contains unit tests for src.async_request_twelvedata_api.py"""
+
+__author__ = "Paul Rémondeau"
+__copyright__ = "Paul Rémondeau"
+__version__ = "1.0.0"
+__maintainer__ = "Paul Rémondeau"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Production"
+
+# ===============================
+#  Libs
+# ===============================
+
+
+import pytest
+
+import os
+import sys
+import json
+import time
+import asyncio
+import threading
+from copy import deepcopy
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(parent)
+
+from src import request_twelvedata_api
+from src.async_request_twelvedata_api import AsyncTwelveDataApi
+from src.credit_scheduler import CreditScheduler
+from src.http_client import HttpClient
+from src.response_cache import ResponseCache
+from src.utils import read_twelvedata_api_config_file
+
+twelvedata_api_config_path = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..",
+    "config",
+    "twelvedata_api_info.json",
+)
+
+meta = {
+    "symbol": "AAPL",
+    "interval": "1day",
+    "currency": "USD",
+    "exchange_timezone": "America/New_York",
+    "exchange": "NASDAQ",
+    "mic_code": "XNAS",
+    "type": "Common Stock",
+}
+values = [
+    {
+        "datetime": f"2023-06-{day:02d}",
+        "open": f"{100 + day}.5",
+        "high": f"{101 + day}.0",
+        "low": f"{99 + day}.0",
+        "close": f"{100 + day}.25",
+        "volume": str(1000 * day),
+    }
+    for day in range(12, 5, -1)
+]
+markets = [
+    {
+        "name": "NASDAQ",
+        "code": "XNGS",
+        "country": "United States",
+        "is_market_open": True,
+        "time_to_open": "00:00:00",
+        "time_to_close": "02:56:09",
+        "time_after_open": "03:33:51",
+    }
+]
+stocks = [
+    {"symbol": "AAPL", "exchange": "NASDAQ", "access": {"plan": "Basic"}},
+    {"symbol": "FOO", "exchange": "NYSE", "access": {"plan": "Pro"}},
+]
+
+# ===============================
+#  Fixtures
+# ===============================
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers the queued status codes, then the body of the path after a delay.
+
+    Also counts the requests being answered at once.
+    """
+
+    protocol_version = "HTTP/1.1"
+    status_codes = []
+    bodies = {}
+    delay = 0
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def do_GET(self):
+        with self.lock:
+            StubHandler.in_flight += 1
+            StubHandler.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        time.sleep(self.delay)
+        status_code = self.status_codes.pop(0) if self.status_codes else 200
+        body = json.dumps(self.bodies.get(urlsplit(self.path).path)).encode()
+
+        with self.lock:
+            StubHandler.in_flight -= 1
+
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(monkeypatch, tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    # Twelve Data API is the stub server, which should not be waited for
+    url = f"http://127.0.0.1:{server.server_port}"
+    config = deepcopy(read_twelvedata_api_config_file(twelvedata_api_config_path))
+    config["timeseries_url"] = f"{url}/time_series"
+    config["market_url"] = f"{url}/market_state"
+    config["symbols_url"] = f"{url}/stocks"
+    config["http_client"]["backoff_factor"] = 0
+    monkeypatch.setattr(request_twelvedata_api, "twelvedata_api_config", config)
+    monkeypatch.setattr(
+        request_twelvedata_api, "http_client", HttpClient(**config["http_client"])
+    )
+    monkeypatch.setattr(
+        request_twelvedata_api, "credit_scheduler", CreditScheduler(per_minute=1000)
+    )
+    monkeypatch.setattr(
+        request_twelvedata_api, "response_cache", ResponseCache(str(tmp_path), {})
+    )
+
+    StubHandler.bodies = {
+        "/time_series": {"meta": meta, "values": values, "status": "ok"},
+        "/market_state": markets,
+        "/stocks": {"data": stocks, "status": "ok"},
+    }
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+    StubHandler.status_codes = []
+    StubHandler.delay = 0
+    StubHandler.max_in_flight = 0
+
+
+async def gather(twelvedata_api, *coroutines):
+    async with twelvedata_api:
+        return await asyncio.gather(*coroutines)
+
+
+# ===============================
+#  Tests
+# ===============================
+
+
+def test_async_twelvedata_api_results(stub_server):
+    twelvedata_api = AsyncTwelveDataApi()
+
+    # Should give the same results as the synchronous functions
+    stock_timeseries, stocks_timeseries, markets_state, symbols_list = asyncio.run(
+        gather(
+            twelvedata_api,
+            twelvedata_api.get_stock_timeseries("AAPL", "1day", "foo"),
+            twelvedata_api.get_stocks_timeseries(["AAPL"], "1day", "foo"),
+            twelvedata_api.get_markets_state("foo"),
+            twelvedata_api.get_available_symbols_list("foo", "Basic"),
+        )
+    )
+
+    expected = request_twelvedata_api.get_stock_timeseries("AAPL", "1day", "foo")
+    assert stock_timeseries["status"] == "ok"
+    assert stock_timeseries["exchange"] == expected["exchange"]
+    assert stock_timeseries["data"].equals(expected["data"])
+    assert stocks_timeseries["data"]["AAPL"]["data"].equals(expected["data"])
+
+    expected = request_twelvedata_api.get_markets_state("foo")
+    assert markets_state["data"].equals(expected["data"])
+
+    assert symbols_list == request_twelvedata_api.get_available_symbols_list(
+        "foo", "Basic"
+    )
+    assert symbols_list["data"] == {"NASDAQ": ["AAPL"]}
+
+    # Should check the responses and give the same errors
+    StubHandler.bodies["/time_series"] = {"meta": meta, "values": [], "status": "ok"}
+    StubHandler.bodies["/market_state"] = {
+        "status": "error",
+        "code": 400,
+        "message": "foo",
+    }
+    twelvedata_api = AsyncTwelveDataApi()
+    stock_timeseries, markets_state = asyncio.run(
+        gather(
+            twelvedata_api,
+            twelvedata_api.get_stock_timeseries("AAPL", "1day", "foo"),
+            twelvedata_api.get_markets_state("foo"),
+        )
+    )
+
+    assert stock_timeseries == {
+        "status": "error",
+        "code": 500,
+        "message": "Data value is empty, check Twelve Data API",
+    }
+    assert markets_state == {"status": "error", "code": 400, "message": "foo"}
+
+    StubHandler.status_codes = [404]
+    twelvedata_api = AsyncTwelveDataApi()
+    (symbols_list,) = asyncio.run(
+        gather(twelvedata_api, twelvedata_api.get_available_symbols_list("foo"))
+    )
+    assert symbols_list == {"status": "error", "code": 404, "message": "Not found"}
+
+
+def test_async_twelvedata_api_concurrency(stub_server):
+    StubHandler.delay = 0.2
+    twelvedata_api = AsyncTwelveDataApi(max_concurrency=3)
+
+    # Should overlap the requests, at most max_concurrency at once
+    start = time.perf_counter()
+    results = asyncio.run(
+        gather(
+            twelvedata_api,
+            *(twelvedata_api.get_markets_state("foo") for _ in range(6)),
+        )
+    )
+    duration = time.perf_counter() - start
+
+    assert all(result["status"] == "ok" for result in results)
+    assert StubHandler.max_in_flight == 3
+    assert 0.4 <= duration < 1
+
+    stats = twelvedata_api.stats()
+    assert stats["requests"] == 6
+    assert stats["maxInFlight"] == 3
+    assert stats["inFlight"] == 0
+    assert stats["maxConcurrency"] == 3
+
+    # Should use the API credits of the requests
+    credit_scheduler = request_twelvedata_api.get_credit_scheduler()
+    assert credit_scheduler.stats()["granted"] == 6
+
+
+def test_async_twelvedata_api_errors(stub_server):
+    twelvedata_api = AsyncTwelveDataApi()
+
+    # Should retry on retryable status codes, each attempt using API credits
+    StubHandler.status_codes = [503, 502]
+    (result,) = asyncio.run(
+        gather(twelvedata_api, twelvedata_api.get_markets_state("foo"))
+    )
+    assert result["status"] == "ok"
+    assert twelvedata_api.stats()["retries"] == 2
+    assert request_twelvedata_api.get_credit_scheduler().stats()["granted"] == 3
+
+    # Should not retry once the API credits are exhausted, even if configured
+    request_twelvedata_api.twelvedata_api_config["http_client"][
+        "retry_status_codes"
+    ].append(429)
+    StubHandler.status_codes = [429, 429]
+    (result,) = asyncio.run(
+        gather(twelvedata_api, twelvedata_api.get_markets_state("foo"))
+    )
+    assert result["code"] == 429
+    assert "retryAfter" in result
+    assert twelvedata_api.stats()["retries"] == 2
+    assert StubHandler.status_codes == [429]
+    StubHandler.status_codes = []
+    request_twelvedata_api.credit_scheduler = CreditScheduler(per_minute=1000)
+
+    # Should give the last response when retries are exhausted
+    StubHandler.status_codes = [500] * 4
+    (result,) = asyncio.run(
+        gather(twelvedata_api, twelvedata_api.get_markets_state("foo"))
+    )
+    assert result == {
+        "status": "error",
+        "code": 503,
+        "message": "Twelve Data API is unavailable",
+    }
+
+    # Should map a timeout
+    request_twelvedata_api.twelvedata_api_config["http_client"]["read_timeout"] = 0.05
+    StubHandler.delay = 0.2
+    twelvedata_api = AsyncTwelveDataApi()
+    (result,) = asyncio.run(
+        gather(twelvedata_api, twelvedata_api.get_markets_state("foo"))
+    )
+    assert result == {
+        "status": "error",
+        "code": 504,
+        "message": "Twelve Data API did not answer in time",
+    }
+    assert twelvedata_api.stats()["errors"] == 1
+
+    # Should map a connection failure
+    stub_server.shutdown()
+    stub_server.server_close()
+    request_twelvedata_api.twelvedata_api_config["http_client"]["max_retries"] = 0
+    twelvedata_api = AsyncTwelveDataApi()
+    (result,) = asyncio.run(
+        gather(twelvedata_api, twelvedata_api.get_markets_state("foo"))
+    )
+    assert result == {
+        "status": "error",
+        "code": 503,
+        "message": "Twelve Data API could not be reached",
+    }
+
+    # Should give the rejection of the credit scheduler
+    request_twelvedata_api.credit_scheduler = CreditScheduler(per_minute=1)
+    request_twelvedata_api.credit_scheduler.acquire(1)
+    request_twelvedata_api.twelvedata_api_config["credit_scheduler"][
+        "interactive_max_wait"
+    ] = 0
+    (result,) = asyncio.run(
+        gather(twelvedata_api, twelvedata_api.get_markets_state("foo"))
+    )
+    assert result["code"] == 429
+    assert "retryAfter" in result
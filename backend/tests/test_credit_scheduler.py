@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""test_credit_scheduler.py: tests
+
+Contains unit tests for src.credit_scheduler.py"""
+
+__author__ = "Paul Rémondeau"
+__copyright__ = "Paul Rémondeau"
+__version__ = "1.0.0"
+__maintainer__ = "Paul Rémondeau"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Production"
+
+# ===============================
+#  Libs
+# ===============================
+
+
+import pytest
+
+import os
+import sys
+import time
+import doctest
+import threading
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(parent)
+
+from src import credit_scheduler
+from src.credit_scheduler import CreditScheduler, INTERACTIVE, BACKGROUND
+from src.exceptions_twelvedata_api import TwelveDataApiException
+
+# ===============================
+#  Tests
+# ===============================
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_credit_scheduler_budget():
+    clock = FakeClock()
+
+    # Should grant credits within the minute budget
+    scheduler = CreditScheduler(per_minute=8, per_day=800, clock=clock)
+    for _ in range(8):
+        assert scheduler.acquire(max_wait=0) == 0
+
+    # Should give a wait estimate instead of waiting too long
+    with pytest.raises(TwelveDataApiException) as e:
+        scheduler.acquire(max_wait=1)
+    assert e.value.code == 429
+    assert e.value.retry_after == 60
+
+    # Should grant credits again once the minute of their grant is over
+    clock.now = 59.9
+    assert scheduler.estimate_wait() == pytest.approx(0.1)
+    clock.now = 60
+    for _ in range(8):
+        assert scheduler.acquire(max_wait=0) == 0
+
+    # Should respect the day budget
+    scheduler = CreditScheduler(per_minute=8, per_day=10, clock=clock)
+    scheduler.acquire(credits=8)
+    clock.now += 60
+    scheduler.acquire(credits=2)
+    clock.now += 60
+    assert scheduler.estimate_wait() == 24 * 60 * 60 - 120
+
+    # Should refuse requests bigger than the plan
+    with pytest.raises(TwelveDataApiException) as e:
+        scheduler.acquire(credits=9)
+    assert e.value.code == 429
+
+    stats = scheduler.stats()
+    assert stats["granted"] == 2
+    assert stats["queued"] == 0
+    assert [window["capacity"] for window in stats["windows"]] == [8, 10]
+    assert [window["available"] for window in stats["windows"]] == [8, 0]
+
+
+def test_credit_scheduler_window():
+    clock = FakeClock()
+    scheduler = CreditScheduler(per_minute=8, clock=clock)
+
+    # Should grant at most the credits per minute in any minute
+    granted = []
+    while clock.now < 300:
+        try:
+            scheduler.acquire(credits=1 + len(granted) % 3, max_wait=0)
+            granted.append((clock.now, 1 + len(granted) % 3))
+        except TwelveDataApiException:
+            clock.now += 0.5
+
+    for start, _ in granted:
+        assert sum(c for t, c in granted if start <= t < start + 60) <= 8
+
+    # Should use the whole budget of each minute
+    assert sum(c for t, c in granted if t < 60) >= 7
+    assert sum(c for _, c in granted) >= 5 * 6
+
+    # Should estimate the wait of credits beyond the free ones, in order
+    clock.now = 1000
+    scheduler = CreditScheduler(per_minute=8, clock=clock)
+    scheduler.acquire(credits=3)
+    clock.now += 10
+    scheduler.acquire(credits=5)
+    assert scheduler.estimate_wait(credits=3) == 50
+    assert scheduler.estimate_wait(credits=4) == 60
+    assert scheduler.estimate_wait(credits=12) == 120
+
+
+def test_credit_scheduler_drain():
+    clock = FakeClock()
+    scheduler = CreditScheduler(per_minute=8, clock=clock)
+
+    scheduler.drain()
+    assert scheduler.estimate_wait() == 60
+
+
+def test_credit_scheduler_priority():
+    clock = FakeClock()
+    scheduler = CreditScheduler(per_minute=8, clock=clock)
+    scheduler.acquire(credits=8)
+
+    order = []
+
+    def acquire(name, priority):
+        scheduler.acquire(priority=priority)
+        order.append(name)
+
+    background = [
+        threading.Thread(target=acquire, args=(f"background{i}", BACKGROUND))
+        for i in range(2)
+    ]
+    for thread in background:
+        thread.start()
+    time.sleep(0.01)
+
+    # Should serve interactive requests before queued background ones,
+    # the credits being granted again once the interactive one arrives
+    clock.now = 60
+    interactive = threading.Thread(target=acquire, args=("interactive", INTERACTIVE))
+    interactive.start()
+
+    for thread in [*background, interactive]:
+        thread.join(timeout=5)
+
+    assert order == ["interactive", "background0", "background1"]
+    assert scheduler.stats()["granted"] == 4
+
+
+def test_credit_scheduler_examples():
+    # python -m doctest can not import the module, which has relative imports
+    results = doctest.testmod(credit_scheduler)
+    assert results.attempted > 0
+    assert results.failed == 0
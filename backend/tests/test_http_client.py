@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""test_http_client.py: tests
+
+Contains unit tests for src.http_client.py"""
+
+__author__ = "Paul Rémondeau"
+__copyright__ = "Paul Rémondeau"
+__version__ = "1.0.0"
+__maintainer__ = "Paul Rémondeau"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Production"
+
+# ===============================
+#  Libs
+# ===============================
+
+
+import pytest
+
+import os
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+import requests_mock
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(parent)
+
+from src.http_client import HttpClient
+
+# ===============================
+#  Fixtures
+# ===============================
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers the queued status codes, then 200."""
+
+    protocol_version = "HTTP/1.1"
+    status_codes = []
+
+    def do_GET(self):
+        status_code = self.status_codes.pop(0) if self.status_codes else 200
+        body = json.dumps({"status": "ok"}).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    StubHandler.status_codes = []
+
+
+# ===============================
+#  Tests
+# ===============================
+
+
+def test_http_client_reuses_connections(stub_server):
+    client = HttpClient(pool_maxsize=2)
+    url = f"http://127.0.0.1:{stub_server.server_port}/time_series"
+
+    for _ in range(3):
+        assert client.get(url, params={"symbol": "foo"}).json() == {"status": "ok"}
+
+    stats = client.pool_stats()
+    assert stats["requests"] == 3
+    assert stats["retries"] == 0
+    assert stats["errors"] == 0
+    assert len(stats["pools"]) == 1
+
+    pool_stats = stats["pools"][0]
+    assert pool_stats["host"] == "127.0.0.1"
+    assert pool_stats["connections"] == 1
+    assert pool_stats["requests"] == 3
+    assert pool_stats["maxsize"] == 2
+
+
+def test_http_client_retries(stub_server):
+    client = HttpClient(max_retries=2, backoff_factor=0)
+    url = f"http://127.0.0.1:{stub_server.server_port}/time_series"
+
+    # Should retry on retryable status codes
+    StubHandler.status_codes = [503, 502]
+    assert client.get(url).status_code == 200
+    assert client.pool_stats()["retries"] == 2
+
+    # Should give back the last response when retries are exhausted
+    StubHandler.status_codes = [500, 500, 500]
+    assert client.get(url).status_code == 500
+
+    # Should not retry on other status codes, nor on exhausted API credits
+    StubHandler.status_codes = [404]
+    assert client.get(url).status_code == 404
+    StubHandler.status_codes = [429]
+    assert client.get(url).status_code == 429
+    assert client.pool_stats()["retries"] == 4
+
+
+def test_http_client_timeout(requests_mock):
+    client = HttpClient(connect_timeout=1, read_timeout=2)
+
+    # Should send every request with the timeouts
+    requests_mock.get("https://api.twelvedata.com/foo", json={})
+    client.get("https://api.twelvedata.com/foo")
+    assert requests_mock.last_request.timeout == (1, 2)
+
+    # Should send the headers
+    client.get("https://api.twelvedata.com/foo", headers={"If-None-Match": '"abc"'})
+    assert requests_mock.last_request.headers["If-None-Match"] == '"abc"'
+
+    # Should count and raise errors
+    requests_mock.get(
+        "https://api.twelvedata.com/foo", exc=requests.exceptions.ReadTimeout
+    )
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        client.get("https://api.twelvedata.com/foo")
+
+    assert client.pool_stats()["errors"] == 1
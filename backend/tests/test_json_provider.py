@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""test_json_provider.py: tests
+
+Contains unit tests for src.json_provider.py"""
+
+__author__ = "Paul Rémondeau"
+__copyright__ = "Paul Rémondeau"
+__version__ = "1.0.0"
+__maintainer__ = "Paul Rémondeau"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Production"
+
+# ===============================
+#  Libs
+# ===============================
+
+
+import pytest
+
+import os
+import sys
+import json
+import datetime
+
+import numpy as np
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(parent)
+
+from src.json_provider import FastJSONProvider
+
+# ===============================
+#  Fixtures
+# ===============================
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    return app
+
+
+# ===============================
+#  Tests
+# ===============================
+
+
+def test_fast_json_provider_output(app):
+    default_provider = DefaultJSONProvider(app)
+    payload = {
+        "timeseries": [
+            {
+                "symbol": "AAPL",
+                "timeDelta": "1day",
+                "marketChecked": False,
+                "timeseries": [[1672531200000, 100.0], [1672617600000, 33.33]],
+            }
+        ],
+        "stats": [{"symbol": "AAPL", "cumulativeReturn": -0.12, "volume": None}],
+    }
+
+    # Should give the bytes of the default provider
+    with app.test_request_context():
+        assert (
+            app.json.response(payload).data == default_provider.response(payload).data
+        )
+
+    assert app.json.dumps(payload) == default_provider.dumps(
+        payload, separators=(",", ":")
+    )
+    assert app.json.loads(app.json.dumps(payload)) == payload
+
+    # Should fall back to the default provider for non ASCII output and dates
+    payload = {"country": "Côte d'Ivoire", "date": datetime.date(2023, 1, 2)}
+    assert app.json.dumps(payload) == default_provider.dumps(
+        payload, separators=(",", ":")
+    )
+
+    # Should use the default provider when arguments are given
+    assert app.json.dumps({"a": 1}, indent=2) == '{\n  "a": 1\n}'
+
+
+def test_fast_json_provider_numpy(app):
+    # Should encode NumPy arrays and scalars
+    payload = {"values": np.array([1.5, 2.0]), "count": np.int64(2)}
+    assert app.json.dumps(payload) == '{"count":2,"values":[1.5,2.0]}'
+
+    # Should give valid JSON for non finite values
+    assert json.loads(app.json.dumps([np.nan, np.inf])) == [None, None]
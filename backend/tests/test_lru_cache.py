@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""test_lru_cache.py: tests
+
+Contains unit tests for src.lru_cache.py"""
+
+__author__ = "Paul Rémondeau"
+__copyright__ = "Paul Rémondeau"
+__version__ = "1.0.0"
+__maintainer__ = "Paul Rémondeau"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Production"
+
+# ===============================
+#  Libs
+# ===============================
+
+
+import pytest
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(parent)
+
+from src.lru_cache import LRUCache, approximate_size
+
+# ===============================
+#  Tests
+# ===============================
+
+
+def test_approximate_size():
+    # Should count the content of containers, arrays and DataFrames
+    values = np.zeros(1000)
+    assert approximate_size([values]) > values.nbytes
+    assert approximate_size(pd.Series(values)) > values.nbytes
+    data = pd.DataFrame({"a": values, "b": values})
+    assert approximate_size(data) > 2 * values.nbytes
+
+
+def test_lru_cache_hits_and_misses():
+    cache = LRUCache(max_bytes=10_000)
+    computed = []
+
+    def compute():
+        computed.append(1)
+        return {"symbol": "foo", "cumulativeReturn": 1.5}
+
+    # Should compute only on the first call
+    assert cache.get_or_compute(("foo", "1day", 1), compute) == {
+        "symbol": "foo",
+        "cumulativeReturn": 1.5,
+    }
+    cache.get_or_compute(("foo", "1day", 1), compute)
+    assert len(computed) == 1
+
+    # Should compute again for another last bar
+    cache.get_or_compute(("foo", "1day", 2), compute)
+    assert len(computed) == 2
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["bytes"] == sum(
+        approximate_size(("foo", "1day", i)) + approximate_size(compute())
+        for i in (1, 2)
+    )
+
+
+def test_lru_cache_invalidate():
+    cache = LRUCache(max_bytes=10_000)
+    cache.put(("foo", "1day", 1), "a")
+    cache.put(("foo", "1h", 1), "b")
+    cache.put(("bar", "1day", 1), "c")
+
+    # Should only remove the entries of the symbol and time delta
+    cache.invalidate("foo", "1day")
+    assert cache.get(("foo", "1day", 1)) is None
+    assert cache.get(("foo", "1h", 1)) == "b"
+
+    # Should remove all the entries of the symbol
+    cache.invalidate("foo")
+    assert cache.get(("foo", "1h", 1)) is None
+    assert cache.get(("bar", "1day", 1)) == "c"
+
+    # Should remove all the entries
+    cache.invalidate()
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+
+
+def test_lru_cache_eviction():
+    entry_size = approximate_size(("foo", 0)) + approximate_size("value")
+    cache = LRUCache(max_bytes=3 * entry_size)
+
+    for i in range(3):
+        cache.put(("foo", i), "value")
+
+    # Should evict the least recently used entry above the memory cap
+    cache.get(("foo", 0))
+    cache.put(("foo", 3), "value")
+    assert cache.get(("foo", 1)) is None
+    assert cache.get(("foo", 0)) == "value"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+    # Should not cache entries larger than the memory cap
+    cache.put(("foo", 4), "value" * 1000)
+    assert cache.get(("foo", 4)) is None
+    assert cache.stats()["entries"] == 3
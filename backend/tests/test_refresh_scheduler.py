@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""test_refresh_scheduler.py: tests
+
+Contains unit tests for src.refresh_scheduler.py"""
+
+__author__ = "Paul Rémondeau"
+__copyright__ = "Paul Rémondeau"
+__version__ = "1.0.0"
+__maintainer__ = "Paul Rémondeau"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Production"
+
+# ===============================
+#  Libs
+# ===============================
+
+
+import pytest
+
+import os
+import sys
+import time
+import asyncio
+import threading
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(parent)
+
+from src.refresh_scheduler import RefreshScheduler
+
+# ===============================
+#  Tests
+# ===============================
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_refresh_scheduler_run_pending():
+    clock = FakeClock()
+    scheduler = RefreshScheduler(clock=clock)
+    runs = []
+
+    scheduler.add_job("fast", 60, lambda: runs.append("fast"))
+    scheduler.add_job("slow", 300, lambda: runs.append("slow"), delay=100)
+
+    # Should only run the jobs that are due
+    assert scheduler.run_pending() == 1
+    assert runs == ["fast"]
+
+    clock.now = 59
+    assert scheduler.run_pending() == 0
+
+    # Should run the late jobs in the order they were due
+    clock.now = 130
+    assert scheduler.run_pending() == 2
+    assert runs == ["fast", "fast", "slow"]
+
+    stats = scheduler.stats()
+    assert stats["running"] is False
+    assert stats["jobs"]["fast"]["runs"] == 2
+    assert stats["jobs"]["fast"]["lastLag"] == 70
+    assert stats["jobs"]["fast"]["maxLag"] == 70
+    assert stats["jobs"]["slow"]["lastLag"] == 30
+
+    # Should keep the cadence of a late job without running it again at once
+    assert stats["jobs"]["fast"]["nextRunIn"] == 50
+    assert scheduler.run_pending() == 0
+    clock.now = 180
+    assert scheduler.run_pending() == 1
+
+    # Should not run removed jobs
+    scheduler.remove_job("fast")
+    assert not scheduler.has_job("fast")
+    clock.now = 1000
+    assert scheduler.run_pending() == 1
+    assert runs == ["fast", "fast", "slow", "fast", "slow"]
+
+
+def test_refresh_scheduler_metrics():
+    clock = FakeClock()
+    scheduler = RefreshScheduler(clock=clock)
+
+    def slow_job():
+        clock.now += 2
+
+    def failing_job():
+        raise RuntimeError("No market data for foo")
+
+    scheduler.add_job("slow", 60, slow_job)
+    scheduler.add_job("failing", 60, failing_job)
+
+    # Should time the runs, and the lag caused by the jobs before
+    scheduler.run_pending()
+    stats = scheduler.stats()["jobs"]
+    assert stats["slow"]["lastDuration"] == 2
+    assert stats["slow"]["meanDuration"] == 2
+    assert stats["failing"]["lastLag"] == 2
+
+    # Should record failures without stopping the other jobs
+    assert stats["failing"]["runs"] == 1
+    assert stats["failing"]["failures"] == 1
+    assert stats["failing"]["lastError"] == "No market data for foo"
+    assert stats["slow"]["failures"] == 0
+
+
+def test_refresh_scheduler_async_jobs():
+    scheduler = RefreshScheduler(max_concurrency=2)
+    runs = []
+
+    async def waiting_job():
+        await asyncio.sleep(0.2)
+        runs.append("waiting")
+
+    async def failing_job():
+        await asyncio.sleep(0.2)
+        raise RuntimeError("No market data for foo")
+
+    for i in range(3):
+        scheduler.add_job(f"waiting{i}", 60, waiting_job)
+    scheduler.add_job("failing", 60, failing_job)
+    scheduler.add_job("sync", 60, lambda: runs.append("sync"))
+
+    # Should run the other jobs first, then the coroutine jobs concurrently
+    start = time.perf_counter()
+    assert scheduler.run_pending() == 5
+    duration = time.perf_counter() - start
+    assert runs == ["sync", "waiting", "waiting", "waiting"]
+
+    # Should not run more than max_concurrency coroutine jobs at once
+    assert 0.4 <= duration < 0.7
+
+    stats = scheduler.stats()["jobs"]
+    assert stats["waiting0"]["lastDuration"] == pytest.approx(0.2, abs=0.05)
+    assert stats["failing"]["failures"] == 1
+    assert stats["failing"]["lastError"] == "No market data for foo"
+    assert stats["waiting2"]["nextRunIn"] > 59
+
+    scheduler.stop()
+
+
+def test_refresh_scheduler_thread():
+    scheduler = RefreshScheduler()
+    ran = threading.Event()
+
+    scheduler.start()
+    assert scheduler.stats()["running"] is True
+
+    # Should wake up when a job is added
+    scheduler.add_job("job", 60, ran.set)
+    assert ran.wait(timeout=5)
+
+    scheduler.stop(timeout=5)
+    assert scheduler.stats()["running"] is False
+    assert scheduler.stats()["jobs"]["job"]["runs"] == 1
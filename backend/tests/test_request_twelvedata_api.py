@@ -25,17 +25,26 @@ import json
 
 import pandas as pd
 
+import requests
 import requests_mock
 
 current = os.path.dirname(os.path.realpath(__file__))
 parent = os.path.dirname(current)
 sys.path.append(parent)
 
+from src import request_twelvedata_api
 from src.request_twelvedata_api import (
     get_stock_timeseries,
+    get_stocks_timeseries,
     get_markets_state,
+    get_available_symbols_list,
+    parse_stock_timeseries,
+    parse_symbols_catalogue,
+    read_values_columns,
 )
 
+from src.credit_scheduler import CreditScheduler
+from src.response_cache import ResponseCache
 from src.utils import read_twelvedata_api_config_file
 
 twelvedata_api_config_path = os.path.join(
@@ -48,9 +57,53 @@ twelvedata_api_config_path = os.path.join(
 twelvedata_api_config = read_twelvedata_api_config_file(twelvedata_api_config_path)
 
 
-def test_request_stock_time_series(requests_mock):
+@pytest.fixture(autouse=True)
+def credit_scheduler(monkeypatch):
+    # Tests should not wait for API credits
+    scheduler = CreditScheduler(per_minute=1000)
+    monkeypatch.setattr(request_twelvedata_api, "credit_scheduler", scheduler)
+    return scheduler
+
+
+@pytest.fixture(autouse=True)
+def response_cache(monkeypatch, tmp_path):
+    # Tests should not share cached responses
+    cache = ResponseCache(
+        str(tmp_path),
+        {
+            twelvedata_api_config["market_url"]: 60,
+            twelvedata_api_config["symbols_url"]: 86400,
+        },
+    )
+    monkeypatch.setattr(request_twelvedata_api, "response_cache", cache)
+    return cache
+
+
+def test_request_stock_time_series(requests_mock, monkeypatch):
     # region Should handle exceptions
 
+    # region Should handle network errors
+    requests_mock.get(
+        twelvedata_api_config["timeseries_url"],
+        exc=requests.exceptions.ConnectTimeout,
+    )
+    assert get_stock_timeseries("foo", "foo", "foo") == {
+        "status": "error",
+        "code": 504,
+        "message": "Twelve Data API did not answer in time",
+    }
+
+    requests_mock.get(
+        twelvedata_api_config["timeseries_url"],
+        exc=requests.exceptions.ConnectionError,
+    )
+    assert get_stock_timeseries("foo", "foo", "foo") == {
+        "status": "error",
+        "code": 503,
+        "message": "Twelve Data API could not be reached",
+    }
+    # endregion
+
     # region Should handle status error from Twelve Data API
     api_response = {"status": "error", "code": 400, "message": "foo"}
     requests_mock.get(twelvedata_api_config["timeseries_url"], json=api_response)
@@ -62,6 +115,49 @@ def test_request_stock_time_series(requests_mock):
     }
     # endregion
 
+    # region Should give a wait estimate when API credits are exhausted
+    monkeypatch.setattr(
+        request_twelvedata_api, "credit_scheduler", CreditScheduler(per_minute=2)
+    )
+    api_response = {"status": "error", "code": 429, "message": "foo"}
+    requests_mock.get(twelvedata_api_config["timeseries_url"], json=api_response)
+
+    result = get_stock_timeseries("foo", "foo", "foo")
+    assert result["code"] == 429
+    assert result["message"] == "foo"
+    assert 59 < result["retryAfter"] <= 60
+
+    # The credits of the current minute are considered used
+    requests_mock.reset_mock()
+    result = get_stock_timeseries("foo", "foo", "foo")
+    assert result["code"] == 429
+    assert result["message"].startswith("Twelve Data API credits are exhausted")
+    assert not requests_mock.called
+
+    # Same for an HTTP 429, which is not retried
+    monkeypatch.setattr(
+        request_twelvedata_api, "credit_scheduler", CreditScheduler(per_minute=2)
+    )
+    requests_mock.get(twelvedata_api_config["timeseries_url"], status_code=429)
+    result = get_stock_timeseries("foo", "foo", "foo")
+    assert result["code"] == 429
+    assert 59 < result["retryAfter"] <= 60
+    assert requests_mock.call_count == 1
+
+    monkeypatch.setattr(
+        request_twelvedata_api, "credit_scheduler", CreditScheduler(per_minute=1000)
+    )
+    # endregion
+
+    # region Should handle when Twelve Data API is unavailable
+    requests_mock.get(twelvedata_api_config["timeseries_url"], status_code=502)
+    assert get_stock_timeseries("foo", "foo", "foo") == {
+        "status": "error",
+        "code": 503,
+        "message": "Twelve Data API is unavailable",
+    }
+    # endregion
+
     # region Should handle when data type are not correct
 
     # region Should handle when meta data is not Dict[str, str]
@@ -240,8 +336,14 @@ def test_request_stock_time_series(requests_mock):
 
     requests_mock.get(twelvedata_api_config["timeseries_url"], json=api_response)
 
-    target_df = pd.Series(
-        [148.74001, 148.85001],
+    target_df = pd.DataFrame(
+        {
+            "open": [148.72000, 148.73500],
+            "high": [148.78000, 148.86000],
+            "low": [148.70000, 148.73000],
+            "close": [148.74001, 148.85001],
+            "volume": [274622, 624277],
+        },
         index=pd.Index(
             [
                 pd.to_datetime("2021-09-16 15:58:00"),
@@ -249,8 +351,6 @@ def test_request_stock_time_series(requests_mock):
             ],
             name="datetime",
         ),
-        name="close",
-        dtype="float64",
     )
 
     result = get_stock_timeseries("foo", "foo", "foo")
@@ -268,6 +368,86 @@ def test_request_stock_time_series(requests_mock):
 
     result_df = result["data"]
     assert result_df.equals(target_df)
+
+    assert "start_date" not in requests_mock.last_request.qs
+    # endregion
+
+    # region Should only request bars from start date if given
+    result = get_stock_timeseries("foo", "foo", "foo", "2021-09-16 15:58:00")
+    assert requests_mock.last_request.qs["start_date"] == ["2021-09-16 15:58:00"]
+    assert result["data"].equals(target_df)
+    # endregion
+
+
+def test_request_stocks_time_series(requests_mock, credit_scheduler):
+    meta = {
+        "symbol": "AAPL",
+        "interval": "1min",
+        "currency": "USD",
+        "exchange_timezone": "America/New_York",
+        "exchange": "NASDAQ",
+        "mic_code": "XNAS",
+        "type": "Common Stock",
+    }
+    values = [
+        {
+            "datetime": "2021-09-16 15:59:00",
+            "open": "148.73500",
+            "high": "148.86000",
+            "low": "148.73000",
+            "close": "148.85001",
+            "volume": "624277",
+        },
+    ]
+
+    # region Should handle status error from Twelve Data API
+    api_response = {"status": "error", "code": 401, "message": "foo"}
+    requests_mock.get(twelvedata_api_config["timeseries_url"], json=api_response)
+
+    assert get_stocks_timeseries(["AAPL", "FOO"], "foo", "foo") == {
+        "status": "error",
+        "code": 401,
+        "message": "foo",
+    }
+    # endregion
+
+    # region Should convert each symbol independently
+    api_response = {
+        "AAPL": {"meta": meta, "values": values, "status": "ok"},
+        "FOO": {"status": "error", "code": 400, "message": "foo"},
+    }
+    requests_mock.get(twelvedata_api_config["timeseries_url"], json=api_response)
+
+    result = get_stocks_timeseries(
+        ["AAPL", "FOO", "BAR"], "foo", "foo", "2021-09-16 15:59:00"
+    )
+    assert requests_mock.last_request.qs["symbol"] == ["aapl,foo,bar"]
+    assert requests_mock.last_request.qs["start_date"] == ["2021-09-16 15:59:00"]
+    assert result["status"] == "ok"
+    assert set(result["data"].keys()) == {"AAPL", "FOO", "BAR"}
+
+    assert result["data"]["AAPL"]["status"] == "ok"
+    assert result["data"]["AAPL"]["exchange"] == "NASDAQ"
+    assert result["data"]["AAPL"]["data"]["close"].tolist() == [148.85001]
+
+    assert result["data"]["FOO"] == {"status": "error", "code": 400, "message": "foo"}
+    assert result["data"]["BAR"] == {
+        "status": "error",
+        "code": 500,
+        "message": "No data for BAR, check Twelve Data API",
+    }
+
+    # One API credit per symbol
+    assert credit_scheduler.stats()["granted"] == 2
+    assert credit_scheduler.stats()["windows"][0]["available"] == 1000 - 2 - 3
+    # endregion
+
+    # region Should handle single symbol responses
+    api_response = {"meta": meta, "values": values, "status": "ok"}
+    requests_mock.get(twelvedata_api_config["timeseries_url"], json=api_response)
+
+    result = get_stocks_timeseries(["AAPL"], "foo", "foo")
+    assert result["data"]["AAPL"]["exchange"] == "NASDAQ"
     # endregion
 
 
@@ -400,3 +580,192 @@ def test_get_markets_state(requests_mock):
     assert target_df.equals(response_df)
 
     # endregion
+
+
+def test_read_values_columns():
+    # Should read the values of each key
+    values = [{"open": "1.0", "close": "2.0"}, {"close": "4.0", "open": "3.0"}]
+    assert read_values_columns(values) == {
+        "open": ["1.0", "3.0"],
+        "close": ["2.0", "4.0"],
+    }
+    assert read_values_columns([]) == {}
+
+    # Should refuse values that are not dicts of str with the same keys
+    assert read_values_columns(values + [["1.0", "2.0"]]) is None
+    assert read_values_columns(values + [{"open": "1.0"}]) is None
+    assert read_values_columns(values + [{"open": "1.0", "high": "2.0"}]) is None
+    assert read_values_columns(values + [{"open": "1.0", "close": 2.0}]) is None
+    assert (
+        read_values_columns(values + [{"open": "1.0", "close": "2.0", "low": "1.0"}])
+        is None
+    )
+
+
+def test_parse_stock_timeseries():
+    meta = {
+        "symbol": "AAPL",
+        "interval": "1day",
+        "currency": "USD",
+        "exchange_timezone": "America/New_York",
+        "exchange": "NASDAQ",
+        "mic_code": "XNAS",
+        "type": "Common Stock",
+    }
+    values = [
+        {
+            "datetime": f"2023-06-{day:02d}",
+            "open": "181.50000",
+            "high": "182.23000",
+            "low": "180.63000",
+            "close": f"{180 + day}.5",
+            "volume": "48870700",
+        }
+        for day in [12, 9, 8, 7]
+    ]
+
+    # Should parse dates of daily bars, from the oldest one
+    result = parse_stock_timeseries({"meta": meta, "values": values, "status": "ok"})
+    assert result["status"] == "ok"
+    assert list(result["data"].index) == list(
+        pd.to_datetime(["2023-06-07", "2023-06-08", "2023-06-09", "2023-06-12"])
+    )
+    assert list(result["data"]["close"]) == [187.5, 188.5, 189.5, 192.5]
+    assert result["data"]["volume"].dtype == "int64"
+
+    # Should sort bars that are not in order
+    shuffled = [values[i] for i in [2, 0, 3, 1]]
+    result = parse_stock_timeseries({"meta": meta, "values": shuffled, "status": "ok"})
+    assert list(result["data"]["close"]) == [187.5, 188.5, 189.5, 192.5]
+
+    # Should report the first value that is not of the expected type
+    invalid = values[:3] + [dict(values[3], close=187.5)]
+    assert parse_stock_timeseries(
+        {"meta": meta, "values": invalid, "status": "ok"}
+    ) == {
+        "status": "error",
+        "code": 500,
+        "message": "value of key 'close' of item 3 of list is not an instance of str",
+    }
+
+    # Should report values that are not numbers or dates
+    for key, value in [("close", "foo"), ("volume", "1.5"), ("datetime", "2023-13-07")]:
+        invalid = values[:3] + [dict(values[3], **{key: value})]
+        result = parse_stock_timeseries(
+            {"meta": meta, "values": invalid, "status": "ok"}
+        )
+        assert result["status"] == "error"
+        assert result["code"] == 500
+        assert result["message"].startswith(
+            "Data values are not correct, check Twelve Data API"
+        )
+
+
+def test_lazy_initialization(monkeypatch, tmp_path):
+    monkeypatch.setattr(request_twelvedata_api, "twelvedata_api_config", None)
+    monkeypatch.setattr(request_twelvedata_api, "http_client", None)
+    monkeypatch.setattr(request_twelvedata_api, "credit_scheduler", None)
+    monkeypatch.setattr(request_twelvedata_api, "response_cache", None)
+
+    # Should read the configuration and create the client once, on first use
+    http_client = request_twelvedata_api.get_http_client()
+    assert request_twelvedata_api.twelvedata_api_config == twelvedata_api_config
+    assert request_twelvedata_api.get_http_client() is http_client
+
+    # Should create a credit scheduler of the Basic plan until configured
+    credit_scheduler = request_twelvedata_api.get_credit_scheduler()
+    assert request_twelvedata_api.get_credit_scheduler() is credit_scheduler
+    request_twelvedata_api.configure_credit_scheduler("Grow")
+    assert request_twelvedata_api.get_credit_scheduler() is not credit_scheduler
+
+    # Should cache the responses of the configured URLs
+    request_twelvedata_api.twelvedata_api_config["response_cache"]["directory"] = str(
+        tmp_path
+    )
+    response_cache = request_twelvedata_api.get_response_cache()
+    assert request_twelvedata_api.get_response_cache() is response_cache
+    assert response_cache.directory.endswith(str(tmp_path))
+    assert response_cache.ttls == {
+        twelvedata_api_config["market_url"]: 60,
+        twelvedata_api_config["symbols_url"]: 86400,
+    }
+
+
+def test_cached_requests(requests_mock, credit_scheduler, response_cache):
+    market_url = twelvedata_api_config["market_url"]
+    symbols_url = twelvedata_api_config["symbols_url"]
+    markets = [
+        {
+            "name": "FOO1",
+            "code": "1234",
+            "country": "MOON",
+            "is_market_open": True,
+            "time_to_open": "00:00:00",
+            "time_to_close": "01:00:00",
+            "time_after_open": "04:00:00",
+        }
+    ]
+    stocks = [{"symbol": "FOO", "exchange": "BAR", "access": {"plan": "Basic"}}]
+
+    # Should not cache errors, nor responses which do not pass the checks
+    requests_mock.get(
+        market_url, json={"status": "error", "code": 400, "message": "foo"}
+    )
+    assert get_markets_state("foo")["status"] == "error"
+    requests_mock.get(market_url, json=[{"foo": "bar"}])
+    assert get_markets_state("foo")["status"] == "error"
+
+    # Should use a fresh cached response without request nor API credits
+    requests_mock.get(market_url, json=markets, headers={"ETag": '"abc"'})
+    result = get_markets_state("foo")
+    assert result["status"] == "ok"
+    assert requests_mock.call_count == 3
+
+    assert get_markets_state("bar")["data"].equals(result["data"])
+    assert requests_mock.call_count == 3
+    assert credit_scheduler.stats()["granted"] == 3
+
+    # Should revalidate a stale response, and use it if it was not modified
+    response_cache.ttls[market_url] = 0
+    requests_mock.get(market_url, status_code=304)
+    assert get_markets_state("foo")["data"].equals(result["data"])
+    assert requests_mock.last_request.headers["If-None-Match"] == '"abc"'
+
+    # Should cache the catalogue of symbols parsed once, for any plan
+    requests_mock.get(symbols_url, json={"data": stocks, "status": "ok"})
+    assert get_available_symbols_list("foo", "Basic")["data"] == {"BAR": ["FOO"]}
+    assert get_available_symbols_list("foo", "Pro")["data"] == {}
+    assert requests_mock.call_count == 5
+
+    assert response_cache.stats()["stores"] == 2
+    assert response_cache.stats()["revalidations"] == 1
+    assert response_cache.stats()["parsedHits"] == 3
+
+
+def test_parse_symbols_catalogue(requests_mock):
+    stocks = [
+        {"symbol": "MSFT", "exchange": "NASDAQ", "access": {"plan": "Basic"}},
+        {"symbol": "ADS", "exchange": "XETR", "access": {"plan": "Grow"}},
+        {"symbol": "AAPL", "exchange": "NASDAQ", "access": {"plan": "Basic"}},
+        {"symbol": "IBM", "exchange": "NYSE", "access": {"plan": "Basic"}},
+        {"symbol": "FOO", "exchange": None, "access": {"plan": "Basic"}},
+    ]
+
+    # Should group the symbols by plan then sorted exchanges, in catalogue order
+    assert parse_symbols_catalogue({"data": stocks, "status": "ok"}) == {
+        "Basic": {"NASDAQ": ["MSFT", "AAPL"], "NYSE": ["IBM"]},
+        "Grow": {"XETR": ["ADS"]},
+    }
+    assert parse_symbols_catalogue({"data": [], "status": "ok"}) == {}
+
+    # Should report symbols without the expected fields
+    requests_mock.get(
+        twelvedata_api_config["symbols_url"],
+        json={"data": stocks + [{"symbol": "BAR", "exchange": "NYSE"}]},
+    )
+    result = get_available_symbols_list("foo", "Basic")
+    assert result["status"] == "error"
+    assert result["code"] == 500
+    assert result["message"].startswith(
+        "Symbols are not correct, check Twelve Data API"
+    )
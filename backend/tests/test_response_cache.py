@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""test_response_cache.py: tests
+
+Contains unit tests for src.response_cache.py"""
+
+__author__ = "Paul Rémondeau"
+__copyright__ = "Paul Rémondeau"
+__version__ = "1.0.0"
+__maintainer__ = "Paul Rémondeau"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Production"
+
+# ===============================
+#  Libs
+# ===============================
+
+
+import pytest
+
+import os
+import sys
+import json
+
+import requests
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(parent)
+
+from src.response_cache import ResponseCache
+
+# ===============================
+#  Tests
+# ===============================
+
+STOCKS_URL = "https://api.twelvedata.com/stocks"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_response(body, headers=None):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(body).encode()
+    response.headers.update(headers or {})
+    return response
+
+
+def test_response_cache_ttl(tmp_path):
+    clock = FakeClock()
+    cache = ResponseCache(str(tmp_path), {STOCKS_URL: 60}, clock=clock)
+    body = {"data": [{"symbol": "AAPL"}] * 1000, "status": "ok"}
+
+    # Should miss before the response is stored
+    assert cache.get(STOCKS_URL, {"apikey": "foo"}) is None
+
+    # Should store the response compressed, without the API key in the key
+    cache.put(STOCKS_URL, {"apikey": "foo", "show_plan": True}, make_response(body))
+    assert len(os.listdir(tmp_path)) == 1
+    assert os.path.getsize(tmp_path / os.listdir(tmp_path)[0]) < len(json.dumps(body))
+
+    cached = cache.get(STOCKS_URL, {"show_plan": True, "apikey": "bar"})
+    assert cached.fresh
+    assert cached.status_code == 200
+    assert cached.json() == body
+
+    # Should not mix the responses of other parameters
+    assert cache.get(STOCKS_URL, {"show_plan": False}) is None
+
+    # Should give stale responses once their time to live is over
+    clock.now += 60
+    assert not cache.get(STOCKS_URL, {"show_plan": True}).fresh
+
+    # Should not cache the responses of other URLs
+    cache.put("https://api.twelvedata.com/foo", {}, make_response(body))
+    assert cache.get("https://api.twelvedata.com/foo", {}) is None
+    assert len(os.listdir(tmp_path)) == 1
+
+    # Should read the files of another instance, e.g. after a restart
+    cache = ResponseCache(str(tmp_path), {STOCKS_URL: 3600}, clock=clock)
+    assert cache.get(STOCKS_URL, {"show_plan": True}).json() == body
+
+    assert cache.stats() == {
+        "hits": 1,
+        "staleHits": 0,
+        "misses": 0,
+        "revalidations": 0,
+        "stores": 0,
+        "parsedHits": 0,
+    }
+
+    # Should miss on unreadable files
+    for name in os.listdir(tmp_path):
+        with open(tmp_path / name, "wb") as f:
+            f.write(b"foo")
+
+    assert cache.get(STOCKS_URL, {"show_plan": True}) is None
+
+
+def test_response_cache_revalidation(tmp_path):
+    clock = FakeClock()
+    cache = ResponseCache(str(tmp_path), {STOCKS_URL: 60}, clock=clock)
+
+    # Should not give conditional headers without validators
+    assert cache.revalidation_headers(None) == {}
+    cache.put(STOCKS_URL, {}, make_response({"data": []}))
+    assert cache.revalidation_headers(cache.get(STOCKS_URL)) == {}
+
+    # Should give conditional headers from the validators of the response
+    headers = {"ETag": '"abc"', "Last-Modified": "Mon, 12 Jun 2023 15:59:00 GMT"}
+    cache.put(STOCKS_URL, {}, make_response({"data": [1]}, headers))
+    clock.now += 120
+    cached = cache.get(STOCKS_URL)
+    assert not cached.fresh
+    assert cache.revalidation_headers(cached) == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Mon, 12 Jun 2023 15:59:00 GMT",
+    }
+
+    # Should renew a revalidated response, keeping its body and validators
+    revalidated = cache.revalidate(STOCKS_URL, {}, cached)
+    assert revalidated.fresh
+    cached = cache.get(STOCKS_URL)
+    assert cached.fresh
+    assert cached.json() == {"data": [1]}
+    assert cached.headers["ETag"] == '"abc"'
+
+    assert cache.stats() == {
+        "hits": 2,
+        "staleHits": 1,
+        "misses": 0,
+        "revalidations": 1,
+        "stores": 2,
+        "parsedHits": 0,
+    }
+
+
+def test_response_cache_parse(tmp_path):
+    clock = FakeClock()
+    cache = ResponseCache(str(tmp_path), {STOCKS_URL: 60}, clock=clock)
+    calls = []
+
+    def parse(response):
+        calls.append(response)
+        return response.json()["data"]
+
+    # Should parse a cached response once
+    cache.put(STOCKS_URL, {}, make_response({"data": [1]}))
+    result = cache.parse(STOCKS_URL, {}, cache.get(STOCKS_URL), parse)
+    assert result == [1]
+    assert cache.parse(STOCKS_URL, {}, cache.get(STOCKS_URL), parse) is result
+    assert len(calls) == 1
+
+    # Should keep the result given when storing, and after a revalidation
+    response = make_response({"data": [2]})
+    cache.put(STOCKS_URL, {}, response, parsed=[2])
+    clock.now += 120
+    revalidated = cache.revalidate(STOCKS_URL, {}, cache.get(STOCKS_URL))
+    assert cache.parse(STOCKS_URL, {}, revalidated, parse) == [2]
+    assert len(calls) == 1
+
+    # Should parse again a response stored by another instance
+    other = ResponseCache(str(tmp_path), {STOCKS_URL: 60}, clock=clock)
+    other.put(STOCKS_URL, {}, make_response({"data": [3]}))
+    assert cache.parse(STOCKS_URL, {}, cache.get(STOCKS_URL), parse) == [3]
+    assert len(calls) == 2
+
+    assert cache.stats()["parsedHits"] == 2
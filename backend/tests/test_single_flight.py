@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""test_single_flight.py: tests
+
+Contains unit tests for src.single_flight.py"""
+
+__author__ = "Paul Rémondeau"
+__copyright__ = "Paul Rémondeau"
+__version__ = "1.0.0"
+__maintainer__ = "Paul Rémondeau"
+__email__ = "paulremondeau@yahoo.fr"
+__status__ = "Production"
+
+# ===============================
+#  Libs
+# ===============================
+
+
+import pytest
+
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(parent)
+
+from src.single_flight import SingleFlight
+
+# ===============================
+#  Tests
+# ===============================
+
+
+def wait_for_calls(flights, calls):
+    deadline = time.monotonic() + 5
+    while flights.stats()["calls"] < calls and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_single_flight_shares_run():
+    flights = SingleFlight()
+    runs = []
+
+    def fetch():
+        runs.append(threading.get_ident())
+        # Keep the run in flight until all the calls are made
+        wait_for_calls(flights, 5)
+        return {"status": "ok"}
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [
+            executor.submit(flights.do, ("AAPL", "1day"), fetch) for _ in range(5)
+        ]
+        results = [future.result(timeout=5) for future in futures]
+
+    # Should run once, and give the same result to all the calls
+    assert len(runs) == 1
+    assert all(result is results[0] for result in results)
+    assert flights.stats() == {"calls": 5, "runs": 1, "shared": 4, "inFlight": 0}
+
+    # Should run again once the run is done
+    assert flights.do(("AAPL", "1day"), lambda: "again") == "again"
+    assert flights.stats()["runs"] == 2
+
+
+def test_single_flight_keys_and_errors():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_fetch():
+        started.set()
+        release.wait(timeout=5)
+        raise RuntimeError("No market data for foo")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flights.do, ("AAPL", "1day"), slow_fetch)
+        assert started.wait(timeout=5)
+
+        # Should not share the runs of other keys
+        assert flights.do(("AAPL", "1h"), lambda: "other") == "other"
+        assert flights.stats()["inFlight"] == 1
+
+        # Should give the exception of the run to all its calls
+        follower = executor.submit(flights.do, ("AAPL", "1day"), slow_fetch)
+        wait_for_calls(flights, 3)
+        release.set()
+
+        for future in [leader, follower]:
+            with pytest.raises(RuntimeError, match="No market data for foo"):
+                future.result(timeout=5)
+
+    assert flights.stats() == {"calls": 3, "runs": 2, "shared": 1, "inFlight": 0}
+
+
+def test_single_flight_start_finish():
+    flights = SingleFlight()
+
+    # Should let a caller run the work of several keys at once
+    started = [flights.start(("refresh", symbol, "1day")) for symbol in "AB"]
+    assert all(leader for _, leader in started)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        follower = executor.submit(
+            flights.do, ("refresh", "A", "1day"), lambda: "fetched again"
+        )
+        wait_for_calls(flights, 3)
+
+        for symbol, (flight, _) in zip("AB", started):
+            flights.finish(("refresh", symbol, "1day"), flight, f"{symbol} updated")
+
+        # Should give the result of the run to the calls waiting for it
+        assert follower.result(timeout=5) == "A updated"
+
+    assert flights.stats() == {"calls": 3, "runs": 2, "shared": 1, "inFlight": 0}
+
+    # Should raise the exception of a run to the calls that joined it
+    flight, _ = flights.start("A")
+    joined, leader = flights.start("A")
+    assert not leader
+    flights.finish("A", flight, error=RuntimeError("foo"))
+    with pytest.raises(RuntimeError, match="foo"):
+        joined.wait()
@@ -21,6 +21,7 @@ import pytest
 
 import os
 import sys
+import math
 
 import numpy as np
 import pandas as pd
@@ -32,7 +33,16 @@ sys.path.append(parent)
 from src.stock_stats import (
     evaluate_cumulative_return,
     evaluate_annualized_return,
+    evaluate_annualized_volatility,
+    periods_per_year,
+    n_years_ago_position,
     evaluate_stats_information,
+    evaluate_stats_information_batch,
+    align_series,
+    evaluate_rolling_analytics,
+    evaluate_max_drawdown,
+    evaluate_returns_correlation,
+    evaluate_portfolio_value,
 )
 
 # ===============================
@@ -103,10 +113,106 @@ def test_evaluate_annualized_return():
     # Should work if data is timely wide enough
     assert evaluate_annualized_return(data, n_years=1) == 200.0
 
+    # Should take the last price up to exactly one year ago
+    data = pd.Series(
+        [1, 2, 4],
+        index=pd.to_datetime(["2022-01-02", "2022-01-03", "2023-01-03"]),
+    )
+    assert evaluate_annualized_return(data, n_years=1) == 100.0
+    assert evaluate_annualized_return(data, n_years=1, assume_sorted=True) == 100.0
+
+    # Should not evaluate an empty series
+    assert evaluate_annualized_return(data.iloc[:0], n_years=1) == "-"
+
+
+def test_periods_per_year():
+    # Should count the points of the regular session, the last one possibly shorter
+    assert periods_per_year("1min") == 390 * 252
+    assert periods_per_year("5min") == 78 * 252
+    assert periods_per_year("45min") == 9 * 252
+    assert periods_per_year("1h") == 7 * 252
+    assert periods_per_year("4h") == 2 * 252
+
+    # Should count days, weeks and months
+    assert periods_per_year("1day") == 252
+    assert periods_per_year("1week") == 52
+    assert periods_per_year("1month") == 12
+
+    # Should refuse unknown intervals
+    for time_delta in ["", "day", "0day", "1year", "1 day"]:
+        with pytest.raises(ValueError):
+            periods_per_year(time_delta)
+
+
+def test_n_years_ago_position():
+    data = pd.Series(
+        [10, 1, 2, 4],
+        index=pd.to_datetime(["2022-01-02", "2022-01-03", "2022-06-01", "2023-01-03"]),
+    )
+
+    # Should find the last date up to exactly one year ago
+    assert n_years_ago_position(data, n_years=1) == 1
+    assert n_years_ago_position(data.iloc[[2, 1, 0, 3]], n_years=1) == 1
+
+    # Should give -1 if the data does not go back n_years
+    assert n_years_ago_position(data, n_years=2) == -1
+    assert n_years_ago_position(data.iloc[:0], n_years=1) == -1
+
 
-# TODO : complete this
 def test_evaluate_annualized_volatility():
-    pass
+    # Log returns alternating between r and -r have a standard deviation
+    # of r * sqrt(n / (n - 1)) for an even number n of returns
+    r = 0.01
+    index = pd.bdate_range("2022-01-03", periods=253)
+    data = pd.Series(100 * np.exp(r * (np.arange(253) % 2)), index=index)
+    expected = r * math.sqrt(252 / 251) * math.sqrt(252) * 100
+    assert evaluate_annualized_volatility(data) == round(expected, 2) == 15.91
+    assert evaluate_annualized_volatility(data, assume_sorted=True) == 15.91
+    assert evaluate_annualized_volatility(data.iloc[::-1]) == 15.91
+
+    # Should scale with the number of points per year of the interval
+    assert evaluate_annualized_volatility(data, time_delta="1h") == round(
+        expected * math.sqrt(7), 2
+    )
+    assert evaluate_annualized_volatility(data, time_delta="1week") == round(
+        r * math.sqrt(252 / 251) * math.sqrt(52) * 100, 2
+    )
+
+    # Should not depend on the price level
+    assert evaluate_annualized_volatility(data * 1000) == 15.91
+
+    # Should be zero for a constant growth
+    growth = pd.Series(100 * np.exp(r * np.arange(253)), index=index)
+    assert evaluate_annualized_volatility(growth) == 0.0
+
+    # Should start at the last price up to one year ago
+    data = pd.Series(
+        [10, 1, 2, 4],
+        index=pd.to_datetime(["2022-01-02", "2022-01-03", "2022-06-01", "2023-01-03"]),
+    )
+    expected = np.std(np.log([2, 2]), ddof=1) * math.sqrt(252) * 100
+    assert evaluate_annualized_volatility(data) == round(expected, 2) == 0.0
+    assert evaluate_annualized_volatility(data, n_years_ago=0) == round(
+        np.std(np.log([0.1, 2, 2]), ddof=1) * math.sqrt(252) * 100, 2
+    )
+
+    # Should use all the data if it does not go back n_years
+    assert evaluate_annualized_volatility(data, n_years=2) == round(
+        np.std(np.log([0.1, 2, 2]), ddof=1) * math.sqrt(252) * 100, 2
+    )
+
+    # Should skip missing values
+    data = pd.Series(
+        [10, 1, np.nan, 2, 4],
+        index=pd.to_datetime(
+            ["2022-01-02", "2022-01-03", "2022-03-01", "2022-06-01", "2023-01-03"]
+        ),
+    )
+    assert evaluate_annualized_volatility(data) == 0.0
+
+    # Should not evaluate less than two returns
+    assert np.isnan(evaluate_annualized_volatility(data.iloc[2:]))
+    assert np.isnan(evaluate_annualized_volatility(data.iloc[:0]))
 
 
 def test_evaluate_stats_information():
@@ -128,5 +234,211 @@ def test_evaluate_stats_information():
         "symbol": symbol,
         "cumulativeReturn": -40.0,
         "annualizedCumulativeReturn": 200.0,
-        "annualizedVolatility": 2.41,
+        "annualizedVolatility": 2273.77,
     }
+
+    # Should give the same result once sorted
+    assert evaluate_stats_information(
+        data.sort_index(), symbol, assume_sorted=True
+    ) == evaluate_stats_information(data, symbol)
+
+    # Should not evaluate an empty series
+    result = evaluate_stats_information(data.iloc[:0], symbol)
+    assert result["cumulativeReturn"] == "-"
+    assert result["annualizedCumulativeReturn"] == "-"
+    assert np.isnan(result["annualizedVolatility"])
+
+
+def test_align_series():
+    # Should align the series on the union of their dates
+    first = pd.Series([1.0, 2.0], index=pd.to_datetime(["2023-01-03", "2023-01-02"]))
+    second = pd.Series([3.0], index=pd.to_datetime(["2023-01-04"]))
+    data = align_series({"foo": first, "bar": second})
+    assert list(data.columns) == ["foo", "bar"]
+    assert list(data.index) == list(
+        pd.to_datetime(["2023-01-02", "2023-01-03", "2023-01-04"])
+    )
+    np.testing.assert_array_equal(
+        data.to_numpy(), [[2.0, np.nan], [1.0, np.nan], [np.nan, 3.0]]
+    )
+
+    # Should give an empty DataFrame without series
+    assert align_series({}).empty
+
+
+def test_evaluate_stats_information_batch():
+    # Should give the same stats as evaluate_stats_information for each series
+    rng = np.random.default_rng(0)
+    series = {}
+    for i in range(50):
+        points = int(rng.integers(1, 800))
+        start = pd.Timestamp("2016-02-29") + pd.Timedelta(
+            days=int(rng.integers(0, 400))
+        )
+        index = pd.bdate_range(start, periods=points)
+        series[f"S{i}"] = pd.Series(rng.uniform(1, 100, points), index=index)
+
+    # Leap day one year before the last date
+    series["leap"] = pd.Series(
+        [1.0, 2.0, 4.0],
+        index=pd.to_datetime(["2016-02-28", "2016-02-29", "2017-02-28"]),
+    )
+
+    for time_delta in ["1day", "15min"]:
+        result = evaluate_stats_information_batch(align_series(series), time_delta)
+        expected = [
+            evaluate_stats_information(timeseries, symbol, time_delta=time_delta)
+            for symbol, timeseries in series.items()
+        ]
+        assert len(result) == len(expected)
+        for stats, expected_stats in zip(result, expected):
+            assert list(stats) == list(expected_stats)
+            for key, value in expected_stats.items():
+                if isinstance(value, float) and np.isnan(value):
+                    assert np.isnan(stats[key])
+                else:
+                    assert stats[key] == value
+
+    # Should sort the data
+    data = pd.DataFrame(
+        {"foo": [1, 5, 7, 2, 3]},
+        index=pd.to_datetime([0, 7, 3, 4, 365], unit="d"),
+    )
+    assert evaluate_stats_information_batch(data) == [
+        {
+            "symbol": "foo",
+            "cumulativeReturn": -40.0,
+            "annualizedCumulativeReturn": 200.0,
+            "annualizedVolatility": 2273.77,
+        }
+    ]
+
+    # Should not evaluate series without enough data
+    data = pd.DataFrame(
+        {"foo": [np.nan, 2.0], "bar": [np.nan, np.nan]},
+        index=pd.to_datetime([0, 1], unit="d"),
+    )
+    result = evaluate_stats_information_batch(data)
+    assert result[0]["cumulativeReturn"] == "-"
+    assert result[0]["annualizedCumulativeReturn"] == "-"
+    assert np.isnan(result[0]["annualizedVolatility"])
+    assert result[1]["cumulativeReturn"] == "-"
+    assert evaluate_stats_information_batch(pd.DataFrame()) == []
+
+
+def test_evaluate_rolling_analytics():
+    rng = np.random.default_rng(0)
+    data = pd.Series(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.01, 200))),
+        index=pd.date_range("2023-01-02", periods=200, freq="D"),
+    )
+    window = 10
+    result = evaluate_rolling_analytics(data.iloc[::-1], window)
+
+    # Should sort the data and give the analytics over the last window points
+    assert list(result.index) == list(data.index)
+    log_returns = np.log(data.to_numpy())
+    log_returns = log_returns[1:] - log_returns[:-1]
+    for i in [window, 57, len(data) - 1]:
+        prices = data.to_numpy()[i - window + 1 : i + 1]
+        returns = log_returns[i - window : i]
+        assert result["sma"].iloc[i] == pytest.approx(prices.mean())
+        assert result["volatility"].iloc[i] == pytest.approx(returns.std(ddof=1) * 100)
+        assert result["sharpe"].iloc[i] == pytest.approx(
+            returns.mean() / returns.std(ddof=1)
+        )
+        assert result["drawdown"].iloc[i] == pytest.approx(
+            (prices[-1] / prices.max() - 1) * 100
+        )
+
+    # Should start the exponential moving average on the first price
+    alpha = 2 / (window + 1)
+    ema = data.iloc[0]
+    for price in data.iloc[1:5]:
+        ema = alpha * price + (1 - alpha) * ema
+    assert result["ema"].iloc[4] == pytest.approx(ema)
+
+    # Should not evaluate points without enough history
+    assert result["sma"].iloc[: window - 1].isna().all()
+    assert result["volatility"].iloc[:window].isna().all()
+
+    # Should refuse windows lower than 2
+    with pytest.raises(ValueError):
+        evaluate_rolling_analytics(data, 1)
+
+
+def test_evaluate_max_drawdown():
+    data = pd.Series(
+        [1, 4, 2, 3, 1, 8],
+        index=pd.to_datetime([0, 1, 2, 3, 4, 5], unit="d"),
+    )
+    assert evaluate_max_drawdown(data) == -75.0
+    assert evaluate_max_drawdown(data.iloc[[1, 0]], assume_sorted=False) == 0.0
+
+    # Should not evaluate an empty series
+    assert evaluate_max_drawdown(data.iloc[:0]) == "-"
+
+
+def test_evaluate_returns_correlation():
+    rng = np.random.default_rng(0)
+    common = np.cumsum(rng.normal(0, 0.01, 300))
+    data = pd.DataFrame(
+        {
+            f"S{i}": 100 * np.exp(common + np.cumsum(rng.normal(0, 0.01, 300)))
+            for i in range(5)
+        },
+        index=pd.date_range("2023-01-02", periods=300, freq="D"),
+    )
+    # Series starting later, and with missing values
+    data.iloc[:100, 1] = np.nan
+    data.iloc[rng.integers(0, 300, 30), 2] = np.nan
+    data.iloc[:, 4] = np.nan
+    data.iloc[-2:, 4] = [1.0, 2.0]
+
+    result = evaluate_returns_correlation(data.iloc[::-1])
+
+    # Should compare the log returns of each series on the common dates
+    returns = np.log(data / data.ffill().shift(1))
+    np.testing.assert_allclose(
+        result["correlation"].to_numpy(), returns.corr(min_periods=2).to_numpy()
+    )
+    np.testing.assert_allclose(
+        result["covariance"].to_numpy(), returns.cov(min_periods=2).to_numpy()
+    )
+    observations = returns.notna().astype(int)
+    np.testing.assert_array_equal(
+        result["observations"].to_numpy(), observations.T @ observations
+    )
+    assert list(result["correlation"].index) == list(data.columns)
+
+    # Should not evaluate pairs without enough common returns
+    result = evaluate_returns_correlation(data, min_periods=250)
+    assert np.isnan(result["correlation"].loc["S1", "S0"])
+    assert np.isnan(result["covariance"].loc["S1", "S0"])
+    assert not np.isnan(result["correlation"].loc["S3", "S0"])
+
+
+def test_evaluate_portfolio_value():
+    data = pd.DataFrame(
+        {
+            "foo": [np.nan, 10.0, 20.0, np.nan, 40.0],
+            "bar": [1.0, 1.0, np.nan, 3.0, 2.0],
+        },
+        index=pd.to_datetime([0, 1, 2, 3, 4], unit="d"),
+    )
+
+    # Should start once all the prices are known, carrying prices over missing ones
+    result = evaluate_portfolio_value(data.iloc[::-1], [0.5, 0.5])
+    assert list(result.index) == list(data.index[1:])
+    np.testing.assert_allclose(result.to_numpy(), [100.0, 150.0, 250.0, 300.0])
+
+    # Should normalize the weights
+    np.testing.assert_allclose(
+        evaluate_portfolio_value(data, [3, 1]).to_numpy(),
+        evaluate_portfolio_value(data, [0.75, 0.25]).to_numpy(),
+    )
+
+    # Should give an empty series without common data
+    data.iloc[1:, 1] = np.nan
+    data.iloc[0, 1] = np.nan
+    assert evaluate_portfolio_value(data, [1, 1]).empty
@@ -30,7 +30,12 @@ current = os.path.dirname(os.path.realpath(__file__))
 parent = os.path.dirname(current)
 sys.path.append(parent)
 
-from src.utils import series_to_apexcharts, read_twelvedata_api_config_file
+from src.utils import (
+    series_to_apexcharts,
+    lttb_indices,
+    parse_datetime,
+    read_twelvedata_api_config_file,
+)
 
 # ===============================
 #  Tests
@@ -67,6 +72,112 @@ def test_series_to_apexcharts():
         [3, 2],
     ]
 
+    # Should round values on a half cent as their decimal representation
+    stock_dates = pd.date_range("2023-01-02", periods=4, freq="D", tz="US/Eastern")
+    stock_time_series = [0.125, 1.005, 2.675, np.nan]
+    timeseries = pd.Series(stock_time_series, index=stock_dates)
+    result = series_to_apexcharts(timeseries, performance=False)
+    assert result[:3] == [
+        [1672635600000, 0.12],
+        [1672722000000, 1.0],
+        [1672808400000, 2.67],
+    ]
+    assert np.isnan(result[3][1])
+
+    # Should downsample to max_points, keeping the first and last points
+    stock_dates = pd.date_range("2023-01-02", periods=1000, freq="D")
+    timeseries = pd.Series(np.sin(np.arange(1000) / 50) + 2, index=stock_dates)
+    result = series_to_apexcharts(timeseries, performance=True, max_points=100)
+    full_result = series_to_apexcharts(timeseries, performance=True)
+    assert len(result) == 100
+    assert result[0] == full_result[0]
+    assert result[-1] == full_result[-1]
+    assert all(point in full_result for point in result)
+
+    # Should not downsample short series
+    assert series_to_apexcharts(timeseries, max_points=5000) == full_result
+
+    # Should round to the given number of decimals
+    timeseries = pd.Series([0.123456, 2.5], index=stock_dates[:2])
+    assert series_to_apexcharts(timeseries, performance=False, decimals=4) == [
+        [1672617600000, 0.1235],
+        [1672704000000, 2.5],
+    ]
+
+
+def reference_lttb_indices(x, y, max_points):
+    """Point by point Largest-Triangle-Three-Buckets."""
+    every = (len(x) - 2) / (max_points - 2)
+    indices = [0]
+    previous = 0
+    for bucket in range(max_points - 2):
+        next_start = int((bucket + 1) * every) + 1
+        next_end = min(int((bucket + 2) * every) + 1, len(x))
+        next_x = sum(x[next_start:next_end]) / (next_end - next_start)
+        next_y = sum(y[next_start:next_end]) / (next_end - next_start)
+
+        best_area = -1
+        for i in range(int(bucket * every) + 1, next_start):
+            area = abs(
+                (x[previous] - next_x) * (y[i] - y[previous])
+                - (x[previous] - x[i]) * (next_y - y[previous])
+            )
+            if area > best_area:
+                best_area = area
+                best = i
+
+        indices.append(best)
+        previous = best
+
+    return indices + [len(x) - 1]
+
+
+def test_lttb_indices():
+    rng = np.random.default_rng(0)
+
+    # Should select the same points as the point by point algorithm
+    for n_points, max_points in [(1000, 100), (5000, 500), (997, 13), (10, 3)]:
+        x = np.sort(rng.uniform(0, 1e12, n_points))
+        y = np.cumsum(rng.normal(0, 1, n_points))
+        assert lttb_indices(x, y, max_points).tolist() == reference_lttb_indices(
+            x.tolist(), y.tolist(), max_points
+        )
+
+    # Should keep a peak
+    y = np.zeros(1000)
+    y[537] = 10
+    assert 537 in lttb_indices(np.arange(1000.0), y, 50)
+
+    # Should skip NaN values
+    y = np.arange(10.0)
+    y[1:4] = np.nan
+    assert lttb_indices(np.arange(10.0), y, 4).tolist() == [0, 4, 5, 9]
+
+    # Should refuse less than 3 points
+    with pytest.raises(ValueError):
+        lttb_indices(np.arange(10.0), np.arange(10.0), 2)
+
+
+def test_parse_datetime():
+    # Should read date strings and milliseconds since epoch as naive datetimes
+    assert parse_datetime("2023-01-02") == pd.Timestamp("2023-01-02")
+    assert parse_datetime("2023-01-02T09:30:00") == pd.Timestamp("2023-01-02 09:30")
+    assert parse_datetime("1672651800000") == pd.Timestamp("2023-01-02 09:30")
+    assert parse_datetime("-1000") == pd.Timestamp("1969-12-31 23:59:59")
+
+    # Should round trip with the times given by series_to_apexcharts
+    timeseries = pd.Series([1.0], index=[pd.Timestamp("2023-01-02 09:30")])
+    epoch = series_to_apexcharts(timeseries)[0][0]
+    assert parse_datetime(str(epoch)) == timeseries.index[0]
+
+    # Should refuse other values and timezones
+    for value in ["", "foo", "2023-13-01", "99999999999999999999999"]:
+        with pytest.raises(ValueError):
+            parse_datetime(value)
+
+    with pytest.raises(ValueError):
+        parse_datetime("2023-01-02T09:30:00+01:00")
+
 
 def test_read_twelvedata_api_config_file():
     example_json = {
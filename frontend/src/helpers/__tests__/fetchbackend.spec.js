@@ -42,6 +42,23 @@ describe('fetchBackend', () => {
         })
     })
 
+    it('symbol get pipeline works', () => {
+
+        var mock = new MockAdapter(axios);
+        const data = { "foo": 0 };
+        const symbol = "BAR"
+
+        mock.onGet(apiUrl + "symbols/" + symbol).replyOnce(204) // Does not exists
+        mock.onPost(apiUrl + "symbols").reply(201) // Data created
+        mock.onGet(apiUrl + "symbols/" + symbol).reply(200, data)
+
+
+        fetchBackend("symbols/" + symbol, "get", undefined, {}, { timeDelta: "4h", performance: false }).then(response => {
+
+            expect(response).toStrictEqual({ data: { foo: 0 }, status: 'ok' })
+        })
+    })
+
 
 })
 
@@ -36,7 +36,10 @@ function fetchBackend(endpoint, method, controller, data = {}, params = {}) {
                         return { "data": res.data, "status": "ok" }
                     case 204:
                         // Data does not exists
-                        return fetchBackend(endpoint, 'post', controller, {}, params)
+                        if (endpoint.substring(0, 8) == 'symbols/') {
+                            // New symbol, the backend keeps it fresh once created
+                            return fetchBackend("symbols", 'post', controller, { symbol: endpoint.substring(8), timeDelta: params.timeDelta }, params)
+                        } else { return fetchBackend(endpoint, 'post', controller, {}, params) }
                 }
 
             case 'post':
@@ -83,6 +86,14 @@ function fetchBackend(endpoint, method, controller, data = {}, params = {}) {
                     type: 'error',
                 });
                 return { "status": "error" }
+            } else if (error.response.status == 429) {
+                // API credits exhausted, the message gives the wait before retrying
+                notify({
+                    title: "⏳ " + error.response.data.message,
+                    group: 'Error',
+                    type: 'warn',
+                });
+                return { "status": "error" }
             } else {
                 return { "status": "error" }
             }